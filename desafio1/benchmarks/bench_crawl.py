@@ -0,0 +1,112 @@
+"""
+Crawl + download benchmark (steps 1-2 of main.py) against the local ANS mirror,
+with no network. A cold pass downloads everything into an empty directory; a warm
+pass repeats it with the same HttpCache and files, so listings and ZIPs should be
+revalidated (304) instead of transferred. Faults are injected by the mirror:
+per-request latency, a per-connection bandwidth cap and randomly dropped transfers.
+
+Usage (from desafio1/):
+    python -m src.testing.synthetic_ans --out /tmp/ans_1x --scale 1
+    python -m benchmarks.bench_crawl --dataset /tmp/ans_1x --latency 0.05 --bandwidth-mb 20 --drop-rate 0.3
+    python -m benchmarks.bench_crawl --scale 0.05    # on a temporary dataset
+"""
+import argparse
+import filecmp
+import tempfile
+from pathlib import Path
+
+from src.ingestion.crawler import AccountingCrawler, ActiveOperatorsCrawler
+from src.ingestion.downloader import FileDownloader
+from src.ingestion.http_cache import HttpCache
+from src.testing.ans_mirror import ACCOUNTING_PATH, CADOP_PATH, AnsMirror, build_mirror_tree
+from src.testing.synthetic_ans import SyntheticAnsDataset
+from src.utils.instrumentation import RunReport
+
+# Two years, so the crawler has to walk more than one YYYY/ listing
+_TEMPORARY_QUARTERS = ("3T2024", "4T2024", "1T2025", "2T2025")
+
+
+def run_pass(
+    mirror: AnsMirror, raw_dir: Path, cache: HttpCache, max_files: int, workers: int, crawl_workers: int
+) -> dict:
+    """One crawl + download pass; returns its timings and what the mirror served."""
+    requests_before, drops_before, sent_before = mirror.requests, mirror.drops, mirror.bytes_sent
+    report = RunReport("desafio1")
+
+    with report.stage("crawl") as record:
+        accounting_crawler = AccountingCrawler(
+            mirror.url(ACCOUNTING_PATH), max_files=max_files, cache=cache, max_workers=crawl_workers
+        )
+        cadop_crawler = ActiveOperatorsCrawler(mirror.url(CADOP_PATH), cache=cache)
+        urls = accounting_crawler.get_urls() + cadop_crawler.get_urls()
+        record.rows_out = len(urls)
+
+    with report.stage("download"), FileDownloader(max_workers=workers, cache=cache, report=report) as downloader:
+        downloaded = downloader.download_all(urls, raw_dir)
+
+    seconds = {record.stage: record.wall_seconds for record in report.records if record.file is None}
+    return {
+        "urls": urls,
+        "downloaded": downloaded,
+        "crawl_seconds": seconds["crawl"],
+        "download_seconds": seconds["download"],
+        "requests": mirror.requests - requests_before,
+        "drops": mirror.drops - drops_before,
+        "bytes_sent": mirror.bytes_sent - sent_before,
+    }
+
+
+def print_pass(name: str, result: dict) -> None:
+    megabytes = result["bytes_sent"] / 1024**2
+    rate = megabytes / max(result["download_seconds"], 1e-9)
+    print(
+        f"{name:<6}crawl {result['crawl_seconds']:6.2f}s ({len(result['urls'])} URLs)   "
+        f"download {result['download_seconds']:6.2f}s, {megabytes:7.1f} MB sent ({rate:6.1f} MB/s), "
+        f"{result['requests']} requests, {result['drops']} dropped"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, help="directory written by src.testing.synthetic_ans")
+    parser.add_argument("--scale", type=float, default=0.05, help="scale of the temporary dataset without --dataset")
+    parser.add_argument("--max-files", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--crawl-workers", type=int, default=4, help="year listings fetched in parallel")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every request")
+    parser.add_argument("--bandwidth-mb", type=float, help="MB/s cap per connection")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of file transfers cut midway")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ans_mirror_") as tmp:
+        work_dir = Path(tmp)
+        dataset_dir = args.dataset
+        if dataset_dir is None:
+            dataset_dir = work_dir / "dataset"
+            SyntheticAnsDataset(scale=args.scale, quarters=_TEMPORARY_QUARTERS, txt_quarters=()).write(dataset_dir)
+        build_mirror_tree(dataset_dir, work_dir / "mirror")
+
+        raw_dir = work_dir / "raw"
+        cache = HttpCache(work_dir / "http_cache.json")
+        bandwidth = args.bandwidth_mb * 1024**2 if args.bandwidth_mb else None
+        with AnsMirror(work_dir / "mirror", args.latency, bandwidth, args.drop_rate, args.seed) as mirror:
+            print(
+                f"Mirror: {args.latency}s latency, "
+                f"{f'{args.bandwidth_mb} MB/s' if bandwidth else 'unlimited'} per connection, "
+                f"{args.drop_rate:.0%} of transfers dropped"
+            )
+            cold = run_pass(mirror, raw_dir, cache, args.max_files, args.workers, args.crawl_workers)
+            print_pass("cold", cold)
+            warm = run_pass(mirror, raw_dir, cache, args.max_files, args.workers, args.crawl_workers)
+            print_pass("warm", warm)
+
+        assert len(cold["downloaded"]) == len(cold["urls"]), "files were lost in the cold pass"
+        for path in cold["downloaded"]:
+            assert filecmp.cmp(path, dataset_dir / path.name, shallow=False), f"{path.name} differs from the mirror"
+        assert not list(raw_dir.glob("*.part")), "leftover .part file"
+        print(f"Verified {len(cold['downloaded'])} files byte for byte against the mirror")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compares CSV engines on a synthetic ANS-shaped accounting file.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_csv_engines --rows 500000
+"""
+import argparse
+import functools
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.processing.table_reader import ENGINES, Engine, TableReader
+
+HEADER = '"DATA";"REG_ANS";"CD_CONTA_CONTABIL";"DESCRICAO";"VL_SALDO_INICIAL";"VL_SALDO_FINAL"\n'
+ACCOUNT_ROOTS = ["41", "411", "4111", "31", "32", "21", "1211", "46", "25"]
+
+
+def generate_accounting_file(path: Path, rows: int, seed: int = 42) -> None:
+    """Writes a BOM'd, ';'-delimited, fully quoted file like the ones ANS publishes."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8-sig") as f:
+        f.write(HEADER)
+        for _ in range(rows):
+            account = rng.choice(ACCOUNT_ROOTS) + str(rng.randint(0, 99999))
+            f.write(
+                f'"2025-01-01";"{rng.randint(300000, 420000)}";"{account}";'
+                f'"EVENTOS CONHECIDOS OU AVISADOS";"{rng.randint(0, 10**8)},{rng.randint(0, 99):02d}";'
+                f'"{rng.randint(0, 10**8)},{rng.randint(0, 99):02d}"\n'
+            )
+
+
+def _consume(chunks) -> int:
+    return sum(len(chunk) for chunk in chunks)
+
+
+def bench_legacy(path: Path) -> int:
+    """The original sniffing python-engine read, for reference."""
+    return _consume(pd.read_csv(
+        path, sep=None, engine="python", chunksize=150_000, dtype=str, encoding="utf-8-sig"
+    ))
+
+
+def bench_engine(path: Path, engine: Engine) -> int:
+    return _consume(TableReader(engines=[engine]).read(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "1T2025.csv"
+        generate_accounting_file(path, args.rows)
+        size_mb = path.stat().st_size / 1024**2
+        print(f"Synthetic file: {args.rows:,} rows, {size_mb:.1f} MB")
+
+        cases = [("legacy python (sep=None)", lambda: bench_legacy(path))]
+        cases += [
+            (f"TableReader[{engine}]", functools.partial(bench_engine, path, engine))
+            for engine in TableReader(engines=ENGINES).engines
+        ]
+
+        for name, run in cases:
+            start = time.perf_counter()
+            rows = run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<28} {elapsed:8.2f}s  {rows / elapsed:>12,.0f} rows/s  {size_mb / elapsed:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Rollups answered from the ExpenseCube vs recomputed from the Grupo 41 detail rows.
+The consolidation (stage 5) saves the cube; each cut (by Modalidade, by UF, by year,
+by sub-account under 41, and the per-operator quarterly mean/std of ExpenseAggregator)
+is then computed both ways, timed, and compared to the cent.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_cube --dataset /tmp/ans_1x
+    python -m benchmarks.bench_cube --scale 0.3    # on a temporary dataset
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.processing.factory_processor import ProcessorFactory
+from src.testing.reference import detail_rollup, load_detail
+from src.testing.synthetic_ans import SyntheticAnsDataset
+from src.transformation.expense_cube import ExpenseCube
+from src.transformation.pipeline import ExpenseConsolidationPipeline
+from src.utils.frame_io import PARQUET_AVAILABLE, read_frame
+from src.utils.schema import CONSOLIDATED_DTYPES
+
+from .bench_end_to_end import link_dataset
+
+_TEMPORARY_QUARTERS = ("3T2024", "4T2024", "1T2025", "2T2025")
+
+# name -> (by, account_digits)
+_CUTS = {
+    "Modalidade": (["Modalidade"], None),
+    "UF": (["UF"], None),
+    "Ano": (["Ano"], None),
+    "sub-account": (["CD_CONTA_CONTABIL"], 4),
+    "UF x Ano x Trimestre": (["UF", "Ano", "Trimestre"], None),
+}
+
+
+def assert_same_cents(expected: pd.Series, actual: pd.Series, name: str) -> None:
+    # Compared unrounded: the cube's exact totals can round a mean that falls on half a cent the other way
+    expected, actual = expected.to_numpy("float64", na_value=np.nan), actual.to_numpy("float64", na_value=np.nan)
+    assert np.allclose(expected, actual, rtol=0, atol=0.005, equal_nan=True), f"{name} differs"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, help="directory written by src.testing.synthetic_ans")
+    parser.add_argument("--scale", type=float, default=0.3, help="scale of the temporary dataset without --dataset")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ans_cube_") as tmp:
+        work_dir = Path(tmp)
+        dataset_dir = args.dataset
+        if dataset_dir is None:
+            dataset_dir = work_dir / "dataset"
+            SyntheticAnsDataset(scale=args.scale, quarters=_TEMPORARY_QUARTERS, txt_quarters=()).write(dataset_dir)
+        raw_dir, output_dir = work_dir / "raw", work_dir / "output"
+        link_dataset(dataset_dir, raw_dir)
+        suffix = ".parquet" if PARQUET_AVAILABLE else ".csv"
+        cadop_file = raw_dir / "Relatorio_cadop.csv"
+
+        quarter_files = ProcessorFactory(cache_dir=output_dir / ".cache").process_all_files(
+            raw_dir, output_dir / f"grupo41_consolidado{suffix}"
+        )
+        cube_file = output_dir / f"cubo_despesas{suffix}"
+        consolidator = ExpenseConsolidationPipeline(
+            cache_dir=output_dir / ".cache",
+            intermediate_format=suffix.lstrip("."),
+            chunksize=args.chunksize,
+            exact_sums=True,
+        )
+        consolidator.run_incremental(quarter_files, cadop_file, output_dir / "consolidado_despesas.csv", cube_file)
+
+        operators = ExpenseCube.load_operators(cadop_file)
+        start = time.perf_counter()
+        cube = ExpenseCube.load(cube_file)
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        detail = load_detail(quarter_files, operators)
+        rescan_seconds = time.perf_counter() - start
+        print(f"{len(detail):,} detail rows -> {len(cube):,} cube cells; "
+              f"cube load {load_seconds * 1000:.0f} ms, detail rescan {rescan_seconds:.2f}s")
+
+        for name, (by, account_digits) in _CUTS.items():
+            start = time.perf_counter()
+            from_cube = ExpenseCube.rollup(cube, by, operators, account_digits)
+            cube_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            from_detail = detail_rollup(detail, by, account_digits)
+            detail_seconds = time.perf_counter() - start
+
+            assert len(from_cube) == len(from_detail), f"{name}: group count differs"
+            assert_same_cents(from_detail["sum"], from_cube["ValorDespesas"], f"{name} total")
+            assert (from_detail["count"].to_numpy() == from_cube["Registros"].to_numpy()).all(), f"{name} count differs"
+            assert_same_cents(from_detail["mean"], from_cube["MediaDespesas"], f"{name} mean")
+            assert_same_cents(from_detail["std"], from_cube["DesvioPadraoDespesas"], f"{name} std")
+            print(f"by {name:<22} {len(from_cube):>6,} groups: cube {cube_seconds * 1000:7.1f} ms, "
+                  f"detail groupby {detail_seconds * 1000:7.1f} ms (+ {rescan_seconds:.2f}s rescan)")
+
+        # ExpenseAggregator's metrics over the quarterly totals of each operator
+        start = time.perf_counter()
+        from_cube = ExpenseCube.quarterly_stats(cube, ["CNPJ", "RazaoSocial"], operators)
+        cube_seconds = time.perf_counter() - start
+        consolidated = read_frame(
+            output_dir / f"consolidado_despesas{suffix}", thousands=".", decimal=",", dtype=CONSOLIDATED_DTYPES
+        )
+        expected = consolidated.groupby(["CNPJ", "RazaoSocial"], observed=True)["ValorDespesas"].agg(
+            ["sum", "mean", "std", "count"]
+        ).reset_index()
+        assert len(from_cube) == len(expected), "quarterly stats: group count differs"
+        for column, expected_column in (("TotalDespesas", "sum"), ("MediaDespesasTrimestral", "mean"),
+                                        ("DesvioPadraoDespesas", "std"), ("NumeroTrimestres", "count")):
+            assert_same_cents(expected[expected_column], from_cube[column], f"quarterly {column}")
+        print(f"quarterly stats per operator {len(from_cube):>6,} groups: cube {cube_seconds * 1000:7.1f} ms; "
+              f"matches the consolidated dataset")
+        print("All rollups identical to the cent")
+
+
+if __name__ == "__main__":
+    main()
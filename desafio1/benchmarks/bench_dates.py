@@ -0,0 +1,50 @@
+"""
+pd.to_datetime(format="mixed") vs src.utils.dates.parse_dates on the two date
+columns: DATA (a handful of quarter dates, plain text or categorical) and
+Data_Registro_ANS (thousands of distinct dates in a slash layout).
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_dates --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.dates import parse_dates
+
+
+def _columns(rows: int, seed: int = 42) -> dict[str, pd.Series]:
+    rng = np.random.default_rng(seed)
+    quarters = np.array(["2025-01-01", "2025-04-01", "2025-07-01", "2025-10-01"])
+    data = pd.Series(rng.choice(quarters, size=rows), dtype="str")
+    registrations = pd.date_range("1990-01-01", "2025-12-31").strftime("%d/%m/%Y")
+    return {
+        "DATA (str)": data,
+        "DATA (category)": data.astype("category"),
+        "Data_Registro_ANS": pd.Series(rng.choice(registrations, size=rows), dtype="str"),
+    }
+
+
+def _timed(func, values: pd.Series) -> tuple[pd.Series, float]:
+    start = time.perf_counter()
+    result = func(values)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'column':<20}{'mixed':>10}{'parse_dates':>14}{'speedup':>10}")
+    for name, values in _columns(args.rows).items():
+        expected, mixed = _timed(lambda v: pd.to_datetime(v, format="mixed", errors="coerce"), values)
+        result, fast = _timed(parse_dates, values)
+        pd.testing.assert_series_equal(result, expected)
+        print(f"{name:<20}{mixed * 1000:8.0f}ms{fast * 1000:12.0f}ms{mixed / fast:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
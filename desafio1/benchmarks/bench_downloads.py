@@ -0,0 +1,67 @@
+"""
+Serial vs concurrent FileDownloader against the local ANS mirror (src.testing.ans_mirror),
+plus a resume check after a dropped connection.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_downloads --files 6 --size-mb 8 --latency 0.2
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.ingestion.downloader import FileDownloader
+from src.testing.ans_mirror import ACCOUNTING_PATH, AnsMirror
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds added to every request")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as tmp_dir, AnsMirror(Path(tmp_dir) / "mirror", latency=args.latency) as mirror:
+        year_dir = mirror.root / ACCOUNTING_PATH / "2025"
+        year_dir.mkdir(parents=True)
+        blobs = {f"{q}T2025.zip": os.urandom(size) for q in range(1, args.files + 1)}
+        for name, blob in blobs.items():
+            (year_dir / name).write_bytes(blob)
+        urls = [mirror.url(f"{ACCOUNTING_PATH}2025/{name}") for name in blobs]
+        checksums = {url: hashlib.sha256(blob).hexdigest() for url, blob in zip(urls, blobs.values())}
+
+        serial_dir, concurrent_dir, resume_dir = (Path(tmp_dir) / name for name in ("serial", "concurrent", "resume"))
+
+        with FileDownloader(max_workers=1) as downloader:
+            start = time.perf_counter()
+            for url in urls:
+                downloader.download(url, serial_dir, checksums[url])
+            serial_time = time.perf_counter() - start
+
+        with FileDownloader(max_workers=args.workers) as downloader:
+            start = time.perf_counter()
+            done = downloader.download_all(urls, concurrent_dir, checksums)
+            concurrent_time = time.perf_counter() - start
+        assert len(done) == len(urls), "concurrent download lost files"
+
+        print(f"{len(urls)} files x {args.size_mb} MB, {args.latency}s latency")
+        print(f"serial      {serial_time:7.2f}s")
+        print(f"concurrent  {concurrent_time:7.2f}s  ({args.workers} workers, {serial_time / concurrent_time:.1f}x)")
+
+        # Cut the connection at 80% of the first file; the retry must resume via Range
+        first_name, first_url = next(iter(blobs)), urls[0]
+        mirror.drop_after[f"/{ACCOUNTING_PATH}2025/{first_name}"] = int(size * 0.8)
+        with FileDownloader(max_workers=1) as downloader:
+            result = downloader.download(first_url, resume_dir, checksums[first_url])
+        assert mirror.drops == 1, "the connection was not dropped"
+        assert result is not None and result.read_bytes() == blobs[first_name], "resume produced a corrupt file"
+        assert not list(resume_dir.glob("*.part")), "leftover .part file"
+        print("resume      OK (dropped at 80%, resumed and verified sha256)")
+
+
+if __name__ == "__main__":
+    main()
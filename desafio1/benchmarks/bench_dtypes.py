@@ -0,0 +1,67 @@
+"""
+String dtypes vs the compact schema (categoricals, Int64 codes) on a synthetic
+Grupo 41 file: frame memory after loading, and time of the CADOP join + groupby.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_dtypes --rows 3000000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.transformation.accounting_transformer import AccountingProcessor
+from src.transformation.expense_calculator import ExpenseCalculator
+from src.utils.frame_io import read_frame
+from src.utils.schema import ACCOUNTING_DTYPES, compact_cadop
+
+from .bench_memory import generate_consolidated_file
+
+
+def _frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def _join_and_group(df: pd.DataFrame, df_cadop: pd.DataFrame) -> tuple[pd.DataFrame, float]:
+    calculator = ExpenseCalculator()
+    start = time.perf_counter()
+    result = calculator.calculate_and_consolidate(df, df_cadop)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "grupo41_consolidado.csv"
+        df_cadop = generate_consolidated_file(path, args.rows)
+        print(f"Synthetic file: {args.rows:,} rows, {path.stat().st_size / 1024**2:.1f} MB")
+
+        loaded = {
+            "dtype=str": (read_frame(path, dtype=str), df_cadop.astype(str)),
+            "compact": (
+                read_frame(path, dtype=ACCOUNTING_DTYPES),
+                compact_cadop(df_cadop.reset_index()).set_index("REGISTRO_OPERADORA"),
+            ),
+        }
+
+    results = {}
+    print(f"{'schema':<12}{'loaded frame':>14}{'typed frame':>14}{'join+groupby':>15}")
+    for name, (df, cadop) in loaded.items():
+        typed = AccountingProcessor.transform(df)
+        results[name], seconds = _join_and_group(typed, cadop)
+        print(f"{name:<12}{_frame_mb(df):11.1f} MB{_frame_mb(typed):11.1f} MB{seconds:14.2f}s")
+
+    plain, compact = (
+        frame.astype({"CNPJ": str, "RazaoSocial": str}).reset_index(drop=True)
+        for frame in results.values()
+    )
+    pd.testing.assert_frame_equal(plain, compact, check_dtype=False)
+
+
+if __name__ == "__main__":
+    main()
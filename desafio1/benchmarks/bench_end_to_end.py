@@ -0,0 +1,207 @@
+"""
+End-to-end benchmark on a synthetic ANS dataset, fully offline: desafio1 stages
+3-5 (optional extraction, processing, consolidation) run in this process, then
+all of desafio2 runs in a subprocess. Prints throughput (rows/s, MB/s) and peak
+RSS for every stage and input file; --history appends the run to a JSON-lines
+file, so results can be compared across commits.
+
+Usage (from desafio1/):
+    python -m src.testing.synthetic_ans --out /tmp/ans_1x --scale 1
+    python -m benchmarks.bench_end_to_end --dataset /tmp/ans_1x --history bench_history.jsonl
+    python -m benchmarks.bench_end_to_end --scale 0.1    # on a temporary dataset
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.ingestion.zip_extractor import FileExtractor
+from src.processing.factory_processor import ProcessorFactory
+from src.testing.synthetic_ans import SyntheticAnsDataset
+from src.transformation.pipeline import ExpenseConsolidationPipeline
+from src.utils.frame_io import PARQUET_AVAILABLE
+from src.utils.instrumentation import RunReport, StageRecord
+
+DESAFIO2_DIR = Path(__file__).resolve().parents[2] / "desafio2"
+
+# Top-level stages, whose times add up to the run time
+_DESAFIO1_STAGES = ("extract", "process", "consolidate")
+
+
+def link_dataset(dataset_dir: Path, raw_dir: Path) -> None:
+    """
+    Fills a fresh raw directory with links to the dataset files, so every run starts
+    cold (no CADOP registry yet) and extraction can delete archives safely.
+    """
+    raw_dir.mkdir(parents=True)
+    for path in dataset_dir.iterdir():
+        if path.is_file() and path.suffix in (".zip", ".csv", ".txt"):
+            try:
+                (raw_dir / path.name).symlink_to(path.resolve())
+            except OSError:
+                shutil.copy2(path, raw_dir / path.name)
+
+
+def run_desafio1(raw_dir: Path, output_dir: Path, workers: int, chunksize: int, extract: bool) -> tuple[RunReport, Path]:
+    """Stages 3-5 of desafio1/main.py; returns the report and the file desafio2 should read."""
+    report = RunReport("desafio1")
+    cache_dir = output_dir / ".cache"
+    intermediate_format = "parquet" if PARQUET_AVAILABLE else "csv"
+
+    if extract:
+        with report.stage("extract"):
+            FileExtractor.process_directory(raw_dir)
+
+    factory = ProcessorFactory(max_workers=workers, cache_dir=cache_dir, report=report)
+    with report.stage("process"):
+        quarter_files = factory.process_all_files(
+            input_dir=raw_dir,
+            output_file=output_dir / f"grupo41_consolidado.{intermediate_format}"
+        )
+
+    final_file = output_dir / "consolidado_despesas.csv"
+    consolidator = ExpenseConsolidationPipeline(
+        cache_dir=cache_dir,
+        intermediate_format=intermediate_format,
+        chunksize=chunksize,
+        report=report
+    )
+    with report.stage("consolidate"):
+        consolidator.run_incremental(quarter_files, raw_dir / "Relatorio_cadop.csv", final_file)
+
+    return report, final_file.with_suffix(".parquet") if intermediate_format == "parquet" else final_file
+
+
+def run_desafio2(input_file: Path, cadop_file: Path, work_dir: Path) -> list[StageRecord]:
+    report_file = work_dir / "desafio2_report.json"
+    subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.bench_pipeline",
+            "--input", str(input_file.resolve()),
+            "--cadop", str(cadop_file.resolve()),
+            "--output-dir", str((work_dir / "desafio2").resolve()),
+            "--report", str(report_file.resolve()),
+        ],
+        cwd=DESAFIO2_DIR,
+        env={**os.environ, "PYTHONPATH": str(DESAFIO2_DIR)},
+        check=True,
+    )
+    return [StageRecord(**stage) for stage in json.loads(report_file.read_text())["stages"]]
+
+
+def stage_rows(records: list[tuple[str, StageRecord]], manifest: dict) -> list[dict]:
+    """
+    Throughput per record. Processors do not count rows, and the process stage's own
+    I/O counters miss its pool workers, so both come from the manifest there.
+    """
+    member_rows = {entry["member"]: entry["rows"] for entry in manifest["files"]}
+    rows = []
+    for pipeline, record in records:
+        count = record.rows_in if record.rows_in is not None else record.rows_out
+        bytes_read = record.bytes_read
+        if pipeline == "desafio1" and record.stage == "process":
+            count = member_rows.get(record.file, 0) if record.file else manifest["rows"]
+            bytes_read = record.bytes_read if record.file else manifest["bytes"]
+        if record.failed:
+            count = bytes_read = None
+        seconds = max(record.wall_seconds, 1e-9)
+        rows.append({
+            "pipeline": pipeline,
+            "stage": record.stage,
+            "file": record.file,
+            "wall_seconds": record.wall_seconds,
+            "rows_per_second": count / seconds if count else None,
+            "mb_per_second": bytes_read / 1024**2 / seconds if bytes_read else None,
+            "peak_rss_mb": record.peak_rss_mb,
+            "failed": record.failed,
+        })
+    return rows
+
+
+def print_table(rows: list[dict]) -> None:
+    print(f"{'pipeline':<10}{'stage':<18}{'file':<30}{'time':>9}{'rows/s':>13}{'MB/s':>9}{'peak RSS':>11}")
+    for row in rows:
+        rate = "failed" if row["failed"] else f"{row['rows_per_second']:,.0f}" if row["rows_per_second"] else "-"
+        mb = f"{row['mb_per_second']:.1f}" if row["mb_per_second"] else "-"
+        peak = f"{row['peak_rss_mb']:.0f} MB" if row["peak_rss_mb"] is not None else "-"
+        print(f"{row['pipeline']:<10}{row['stage']:<18}{(row['file'] or '')[:29]:<30}"
+              f"{row['wall_seconds']:8.2f}s{rate:>13}{mb:>9}{peak:>11}")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, help="directory written by src.testing.synthetic_ans")
+    parser.add_argument("--scale", type=float, default=0.1, help="scale of the temporary dataset without --dataset")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--extract", action="store_true", help="extract archives first instead of streaming them")
+    parser.add_argument("--save", type=Path, help="write this run as JSON")
+    parser.add_argument("--history", type=Path, help="append this run to a JSON-lines file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ans_bench_") as tmp:
+        work_dir = Path(tmp)
+        dataset_dir = args.dataset
+        if dataset_dir is None:
+            dataset_dir = work_dir / "dataset"
+            SyntheticAnsDataset(scale=args.scale).write(dataset_dir)
+        manifest = json.loads((dataset_dir / "manifest.json").read_text())
+        print(f"Dataset: scale {manifest['scale']}, {manifest['rows']:,} rows, {manifest['bytes'] / 1024**2:.1f} MB")
+
+        raw_dir = work_dir / "raw"
+        link_dataset(dataset_dir, raw_dir)
+        report, desafio1_output = run_desafio1(
+            raw_dir, work_dir / "output", args.workers, args.chunksize, args.extract
+        )
+        desafio2_records = run_desafio2(desafio1_output, raw_dir / "Relatorio_cadop.csv", work_dir)
+
+    records = [("desafio1", record) for record in report.records] + [("desafio2", record) for record in desafio2_records]
+    rows = stage_rows(records, manifest)
+    print_table(rows)
+
+    wall_seconds = sum(
+        record.wall_seconds for pipeline, record in records
+        if pipeline == "desafio2" or (record.stage in _DESAFIO1_STAGES and record.file is None)
+    )
+    peak_rss_mb = max((record.peak_rss_mb or 0 for _, record in records), default=0)
+    print(
+        f"End to end: {wall_seconds:.2f}s, {manifest['rows'] / wall_seconds:,.0f} rows/s, "
+        f"{manifest['bytes'] / 1024**2 / wall_seconds:.1f} MB/s, peak RSS {peak_rss_mb:.0f} MB"
+    )
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "scale": manifest["scale"],
+        "rows": manifest["rows"],
+        "bytes": manifest["bytes"],
+        "workers": args.workers,
+        "extract": args.extract,
+        "wall_seconds": wall_seconds,
+        "rows_per_second": manifest["rows"] / wall_seconds,
+        "peak_rss_mb": peak_rss_mb,
+        "stages": rows,
+    }
+    if args.save:
+        args.save.write_text(json.dumps(result, indent=2))
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as history:
+            history.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
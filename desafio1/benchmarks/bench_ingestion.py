@@ -0,0 +1,95 @@
+"""
+Staged vs pipelined ingestion (main.py steps 2-4) against the local ANS mirror.
+Staged downloads every file, then processes them all; pipelined processes each
+quarter while the next ones download. Both outputs are compared byte for byte.
+With a link bandwidth that makes downloading about as slow as processing, the
+pipelined time should approach the slower of the two instead of their sum.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_ingestion --dataset /tmp/ans_1x --link-mb 30
+    python -m benchmarks.bench_ingestion --scale 0.3    # on a temporary dataset
+"""
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.ingestion.crawler import AccountingCrawler, ActiveOperatorsCrawler
+from src.ingestion.downloader import FileDownloader
+from src.ingestion.pipelined import PipelinedIngestion
+from src.processing.factory_processor import ProcessorFactory
+from src.testing.ans_mirror import ACCOUNTING_PATH, CADOP_PATH, AnsMirror, build_mirror_tree
+from src.testing.synthetic_ans import SyntheticAnsDataset
+
+_TEMPORARY_QUARTERS = ("3T2024", "4T2024", "1T2025", "2T2025")
+
+
+def run_staged(accounting_urls: list[str], cadop_urls: list[str], work_dir: Path, workers: int) -> tuple[Path, dict]:
+    raw_dir, output_file = work_dir / "raw", work_dir / "grupo41.csv"
+    start = time.perf_counter()
+    with FileDownloader() as downloader:
+        downloader.download_all(accounting_urls + cadop_urls, raw_dir)
+    downloaded = time.perf_counter()
+    ProcessorFactory(max_workers=workers, cache_dir=work_dir / ".cache").process_all_files(raw_dir, output_file)
+    done = time.perf_counter()
+    return output_file, {"download": downloaded - start, "process": done - downloaded, "total": done - start}
+
+
+def run_pipelined(
+    accounting_urls: list[str],
+    cadop_urls: list[str],
+    work_dir: Path,
+    workers: int,
+    max_pending: int,
+) -> tuple[Path, dict]:
+    raw_dir, output_file = work_dir / "raw", work_dir / "grupo41.csv"
+    start = time.perf_counter()
+    with FileDownloader() as downloader:
+        factory = ProcessorFactory(max_workers=workers, cache_dir=work_dir / ".cache")
+        PipelinedIngestion(downloader, factory, max_pending=max_pending).run(
+            accounting_urls, cadop_urls, raw_dir, output_file
+        )
+    return output_file, {"total": time.perf_counter() - start}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, help="directory written by src.testing.synthetic_ans")
+    parser.add_argument("--scale", type=float, default=0.3, help="scale of the temporary dataset without --dataset")
+    parser.add_argument("--max-files", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processing workers")
+    parser.add_argument("--max-pending", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--link-mb", type=float, default=8, help="MB/s shared by all downloads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ans_ingestion_") as tmp:
+        work_dir = Path(tmp)
+        dataset_dir = args.dataset
+        if dataset_dir is None:
+            dataset_dir = work_dir / "dataset"
+            SyntheticAnsDataset(scale=args.scale, quarters=_TEMPORARY_QUARTERS, txt_quarters=()).write(dataset_dir)
+        build_mirror_tree(dataset_dir, work_dir / "mirror")
+
+        with AnsMirror(work_dir / "mirror", args.latency, link_bandwidth=args.link_mb * 1024**2) as mirror:
+            accounting_urls = AccountingCrawler(mirror.url(ACCOUNTING_PATH), max_files=args.max_files).get_urls()
+            cadop_urls = ActiveOperatorsCrawler(mirror.url(CADOP_PATH)).get_urls()
+            print(f"{len(accounting_urls)} quarters + CADOP, {args.link_mb} MB/s link, "
+                  f"{args.workers} processing workers")
+
+            staged_output, staged = run_staged(accounting_urls, cadop_urls, work_dir / "staged", args.workers)
+            print(f"staged     {staged['total']:6.2f}s  (download {staged['download']:.2f}s + process {staged['process']:.2f}s)")
+            pipelined_output, pipelined = run_pipelined(
+                accounting_urls, cadop_urls, work_dir / "pipelined", args.workers, args.max_pending
+            )
+            print(f"pipelined  {pipelined['total']:6.2f}s  ({staged['total'] / pipelined['total']:.2f}x, "
+                  f"max {args.max_pending} pending downloads)")
+
+        assert filecmp.cmp(staged_output, pipelined_output, shallow=False), "pipelined output differs from staged"
+        print("Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Peak memory per consolidation stage on a synthetic Grupo 41 file.
+Save a run with --save and check later ones against it with --compare;
+the script exits with status 1 when a stage's peak grew past --tolerance.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_memory --rows 2000000 --save memory_baseline.json
+    python -m benchmarks.bench_memory --rows 2000000 --compare memory_baseline.json
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.transformation.accounting_transformer import AccountingProcessor
+from src.transformation.expense_calculator import ExpenseCalculator
+from src.transformation.pipeline import ExpenseConsolidationPipeline
+
+from .memory_probe import MemoryProbe
+
+
+def generate_consolidated_file(path: Path, rows: int, operators: int = 1_500, seed: int = 42) -> pd.DataFrame:
+    """
+    Writes a file shaped like grupo41_consolidado.csv and returns the matching
+    cleaned CADOP frame (indexed by REGISTRO_OPERADORA).
+    """
+    rng = np.random.default_rng(seed)
+    registers = np.arange(300_000, 300_000 + operators)
+    dates = np.array(["2025-01-01", "2025-04-01", "2025-07-01", "2025-10-01"])
+    pd.DataFrame({
+        "DATA": rng.choice(dates, size=rows),
+        "REG_ANS": rng.choice(registers, size=rows).astype(str),
+        "CD_CONTA_CONTABIL": rng.choice(["41", "411", "4111", "41111"], size=rows),
+        "VL_SALDO_INICIAL": rng.integers(0, 10**8, size=rows) / 100,
+        "VL_SALDO_FINAL": rng.integers(0, 10**8, size=rows) / 100,
+    }).to_csv(path, sep=";", index=False, encoding="utf-8-sig")
+
+    return pd.DataFrame({
+        "CNPJ": [f"{register:014d}" for register in registers],
+        "Razao_Social": [f"OPERADORA {register} LTDA" for register in registers],
+        "Data_Registro_ANS": "2020-01-01",
+    }, index=pd.Index(registers.astype(str), name="REGISTRO_OPERADORA"))
+
+
+def run_stages(path: Path, df_cadop: pd.DataFrame) -> MemoryProbe:
+    probe = MemoryProbe()
+    calculator = ExpenseCalculator()
+
+    with probe.stage("load (dtype=str)"):
+        df = ExpenseConsolidationPipeline._load_accounting(path)
+    with probe.stage("parse_dates"):
+        df = AccountingProcessor.parse_dates(df)
+    with probe.stage("extract_period"):
+        df = AccountingProcessor.extract_period(df)
+    with probe.stage("ensure_numeric_columns"):
+        df = AccountingProcessor.ensure_numeric_columns(df)
+    with probe.stage("calculate_and_consolidate"):
+        df = calculator.calculate_and_consolidate(df, df_cadop)
+    with probe.stage("brazilian_formatting"):
+        ExpenseConsolidationPipeline()._apply_brazilian_formatting(df)
+    return probe
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--save", type=Path, help="write this run's peaks as JSON")
+    parser.add_argument("--compare", type=Path, help="fail if peaks grew over this saved run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "grupo41_consolidado.csv"
+        df_cadop = generate_consolidated_file(path, args.rows)
+        print(f"Synthetic file: {args.rows:,} rows, {path.stat().st_size / 1024**2:.1f} MB")
+        probe = run_stages(path, df_cadop)
+
+    probe.report()
+    if args.save:
+        probe.save(args.save)
+    if args.compare:
+        failures = probe.regressions(args.compare, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Parsed vs pass-through processing (stage 4) of the same synthetic quarter, as a
+UTF-8 '.csv' and as a latin1 '.txt'. Pass-through copies the selected lines instead
+of parsing them and writing them back with pandas; both partials are then
+consolidated (stage 5) and the results must be identical.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_passthrough --scale 1
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.processing.factory_processor import ProcessorFactory
+from src.processing.source_file import SourceFile
+from src.testing.synthetic_ans import SyntheticAnsDataset
+from src.transformation.pipeline import ExpenseConsolidationPipeline
+
+_QUARTER = "2T2025"
+
+
+def process(source: SourceFile, output_file: Path, passthrough: bool, repeat: int) -> float:
+    """Best-of-N seconds to filter source into a UTF-8 partial, like a pool worker does."""
+    best = float("inf")
+    for _ in range(repeat):
+        processor = ProcessorFactory.create(source, output_file, passthrough=passthrough)
+        start = time.perf_counter()
+        with open(output_file, "w", encoding="utf-8") as output_stream:
+            assert processor.process_with_stream(source, output_stream, True), "no rows written"
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ans_passthrough_") as tmp:
+        work_dir = Path(tmp)
+        dataset = SyntheticAnsDataset(args.scale, quarters=(_QUARTER,), txt_quarters=())
+        cadop_file = work_dir / "Relatorio_cadop.csv"
+        dataset.cadop().to_csv(cadop_file, sep=";", index=False, encoding="utf-8-sig")
+
+        for fmt, txt_quarters in (("csv", ()), ("txt", (_QUARTER,))):
+            (work_dir / fmt).mkdir()
+            dataset.txt_quarters = set(txt_quarters)
+            entry = dataset.write_quarter(work_dir / fmt, _QUARTER, 0)
+            source = SourceFile(work_dir / fmt / entry["name"], entry["member"])
+            size_mb = entry["bytes"] / 1024**2
+
+            consolidated = {}
+            timings = {}
+            for passthrough in (False, True):
+                partial = work_dir / fmt / f"partial_{passthrough}.csv"
+                timings[passthrough] = process(source, partial, passthrough, args.repeat)
+                output_file = work_dir / fmt / f"consolidated_{passthrough}.csv"
+                ExpenseConsolidationPipeline().run(partial, cadop_file, output_file)
+                consolidated[passthrough] = pd.read_csv(output_file, sep=";", dtype=str)
+
+            pd.testing.assert_frame_equal(consolidated[False], consolidated[True])
+            parsed, copied = timings[False], timings[True]
+            print(f"{fmt}  {entry['rows']:,} rows, {size_mb:.0f} MB: parsed {parsed:.2f}s ({size_mb / parsed:.0f} MB/s), "
+                  f"pass-through {copied:.2f}s ({size_mb / copied:.0f} MB/s), {parsed / copied:.2f}x; "
+                  f"consolidated results identical")
+
+
+if __name__ == "__main__":
+    main()
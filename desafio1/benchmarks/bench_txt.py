@@ -0,0 +1,65 @@
+"""
+TXT vs CSV processing throughput on the same synthetic quarter, published once as
+a latin1 '.txt' (CRLF, unquoted) and once as a UTF-8 '.csv' (quoted). Both are
+filtered from the ZIP member into a UTF-8 stream, and the outputs must be identical.
+
+Usage (from desafio1/):
+    python -m benchmarks.bench_txt --scale 1     # 2M rows per file
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.processing.csv_processor import CsvProcessor
+from src.processing.source_file import SourceFile
+from src.processing.txt_processor import TxtProcessor
+from src.testing.synthetic_ans import SyntheticAnsDataset
+
+_QUARTER = "2T2025"
+
+
+def run(processor_class, source: SourceFile, output_file: Path) -> float:
+    processor = processor_class(output_file)
+    start = time.perf_counter()
+    with open(output_file, "w", encoding="utf-8") as output_stream:
+        success = processor.process_with_stream(source, output_stream, True)
+    elapsed = time.perf_counter() - start
+    assert success, f"{processor_class.__name__} wrote no rows"
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ans_txt_") as tmp:
+        work_dir = Path(tmp)
+        sources = {}
+        for fmt, txt_quarters in (("txt", (_QUARTER,)), ("csv", ())):
+            (work_dir / fmt).mkdir()
+            dataset = SyntheticAnsDataset(args.scale, quarters=(_QUARTER,), txt_quarters=txt_quarters)
+            entry = dataset.write_quarter(work_dir / fmt, _QUARTER, 0)
+            sources[fmt] = (SourceFile(work_dir / fmt / entry["name"], entry["member"]), entry)
+
+        rows = sources["txt"][1]["rows"]
+        results = {}
+        for fmt, processor_class in (("txt", TxtProcessor), ("csv", CsvProcessor)):
+            source, entry = sources[fmt]
+            output_file = work_dir / f"out_{fmt}.csv"
+            seconds = min(run(processor_class, source, output_file) for _ in range(args.repeat))
+            results[fmt] = (seconds, output_file)
+            print(f"{fmt}  {seconds:6.2f}s  {rows / seconds:>12,.0f} rows/s  "
+                  f"{entry['bytes'] / 1024**2 / seconds:7.1f} MB/s  ({entry['bytes'] / 1024**2:.0f} MB, {rows:,} rows)")
+
+        txt_output, csv_output = results["txt"][1].read_bytes(), results["csv"][1].read_bytes()
+        assert txt_output == csv_output, "TXT and CSV outputs differ"
+        selected = txt_output.count(b"\n") - 1
+        print(f"TXT/CSV time ratio {results['txt'][0] / results['csv'][0]:.2f}, "
+              f"outputs identical ({selected:,} Grupo 41 rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Keeps the project root on sys.path, so tests import the app as `src....` like main.py does
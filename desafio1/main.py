@@ -1,25 +1,66 @@
 import logging
+import os
 from pathlib import Path
 
 from src.ingestion.crawler import AccountingCrawler, ActiveOperatorsCrawler
 from src.ingestion.downloader import FileDownloader
+from src.ingestion.http_cache import HttpCache
+from src.ingestion.pipelined import PipelinedIngestion
 from src.ingestion.zip_extractor import FileExtractor
 from src.processing.factory_processor import ProcessorFactory
 from src.transformation.pipeline import ExpenseConsolidationPipeline
+from src.utils.frame_io import PARQUET_AVAILABLE
+from src.utils.instrumentation import RunReport
 
 ACCOUNTING_URL = "https://dadosabertos.ans.gov.br/FTP/PDA/demonstracoes_contabeis/"
 CADOP_URL = "https://dadosabertos.ans.gov.br/FTP/PDA/operadoras_de_plano_de_saude_ativas/"
 
+# Typed Parquet between stages when pyarrow is installed; BR-formatted CSV is the final export
+INTERMEDIATE_FORMAT = "parquet" if PARQUET_AVAILABLE else "csv"
+
 RAW_DIR = Path("raw")
 OUTPUT_DIR = Path("output")
-CONSOLIDATED_ACCOUNTING_FILE = OUTPUT_DIR / "grupo41_consolidado.csv"
+CONSOLIDATED_ACCOUNTING_FILE = OUTPUT_DIR / f"grupo41_consolidado.{INTERMEDIATE_FORMAT}"
 FINAL_OUTPUT_FILE = OUTPUT_DIR / "consolidado_despesas.csv"
+# Grupo 41 sums, counts and sums of squares per (REG_ANS, CD_CONTA_CONTABIL, Ano, Trimestre)
+EXPENSE_CUBE_FILE = OUTPUT_DIR / f"cubo_despesas.{INTERMEDIATE_FORMAT}"
+HTTP_CACHE_FILE = RAW_DIR / ".http_cache.json"
+# Year listings fetched in parallel while crawling
+CRAWL_WORKERS = 4
+# Per-quarter intermediate artifacts, reused while their source files are unchanged
+CACHE_DIR = OUTPUT_DIR / ".cache"
+PROCESSING_WORKERS = os.cpu_count() or 1
+# CSV intermediate only: selected source lines are copied instead of re-serialized by pandas
+PASSTHROUGH_PROCESSING = True
+# Rows per chunk in the final consolidation; bounds its memory whatever the number of quarters
+CONSOLIDATION_CHUNKSIZE = 500_000
+# Archives are streamed member by member during processing; extraction is opt-in
+EXTRACT_ARCHIVES = False
+# Process each quarter as soon as it is downloaded instead of after all downloads
+PIPELINED_INGESTION = True
+# Pipelined mode: quarters downloaded but not yet processed at any time (backpressure)
+MAX_PENDING_DOWNLOADS = 2
+# Per-stage and per-file timings, row counts, bytes and peak RSS of every run
+RUN_REPORT_FILE = OUTPUT_DIR / "run_report.json"
+# Optional Prometheus text-format copy, e.g. in a node_exporter textfile collector directory
+PROMETHEUS_FILE: Path | None = None
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
 def main() -> None:
+    report = RunReport("desafio1")
+    try:
+        run_pipeline(report)
+    finally:
+        report.log_summary()
+        report.save_json(RUN_REPORT_FILE)
+        if PROMETHEUS_FILE is not None:
+            report.save_prometheus(PROMETHEUS_FILE)
+
+
+def run_pipeline(report: RunReport) -> None:
     """Orchestrates the full ANS data pipeline using class instances."""
     logger.info("🚀 Starting ANS data pipeline...")
 
@@ -29,47 +70,101 @@ def main() -> None:
 
     # === STEP 1: CRAWLING ===
     logger.info("🔍 Discovering source files...")
-    accounting_crawler = AccountingCrawler(base_url=ACCOUNTING_URL, max_files=3)
-    cadop_crawler = ActiveOperatorsCrawler(base_url=CADOP_URL)
+    http_cache = HttpCache(HTTP_CACHE_FILE)
+    accounting_crawler = AccountingCrawler(
+        base_url=ACCOUNTING_URL, max_files=3, cache=http_cache, max_workers=CRAWL_WORKERS
+    )
+    cadop_crawler = ActiveOperatorsCrawler(base_url=CADOP_URL, cache=http_cache)
     
-    urls = accounting_crawler.get_urls() + cadop_crawler.get_urls()
+    with report.stage("crawl") as record:
+        accounting_urls = accounting_crawler.get_urls()
+        cadop_urls = cadop_crawler.get_urls()
+        urls = accounting_urls + cadop_urls
+        record.rows_out = len(urls)
     logger.info(f"📁 Found {len(urls)} files to download")
 
     if not urls:
         logger.error("❌ No files found. Exiting.")
         return
 
+    factory = ProcessorFactory(
+        max_workers=PROCESSING_WORKERS,
+        cache_dir=CACHE_DIR,
+        report=report,
+        passthrough=PASSTHROUGH_PROCESSING,
+    )
+    with FileDownloader(timeout=(5, 60), cache=http_cache, report=report) as downloader:
+        if PIPELINED_INGESTION:
+            quarter_files = run_pipelined_ingestion(accounting_urls, cadop_urls, downloader, factory, report)
+        else:
+            quarter_files = run_staged_ingestion(urls, downloader, factory, report)
+
+    # === STEP 5: FINAL CONSOLIDATION ===
+    logger.info("📊 Consolidating final dataset...")
+    consolidator = ExpenseConsolidationPipeline(
+        cache_dir=CACHE_DIR,
+        intermediate_format=INTERMEDIATE_FORMAT,
+        chunksize=CONSOLIDATION_CHUNKSIZE,
+        report=report
+    )
+    with report.stage("consolidate"):
+        consolidator.run_incremental(
+            quarter_files=quarter_files,
+            cadop_file=RAW_DIR / "Relatorio_cadop.csv",
+            output_file=FINAL_OUTPUT_FILE,
+            cube_file=EXPENSE_CUBE_FILE
+        )
+    logger.info("✅ Pipeline completed successfully!")
+
+
+def run_pipelined_ingestion(
+    accounting_urls: list[str],
+    cadop_urls: list[str],
+    downloader: FileDownloader,
+    factory: ProcessorFactory,
+    report: RunReport,
+) -> list[Path]:
+    """Steps 2-4 as concurrent stages: each quarter is processed while the next ones download."""
+    logger.info("📥🧹 Downloading and processing accounting data...")
+    ingestion = PipelinedIngestion(
+        downloader, factory, extract=EXTRACT_ARCHIVES, max_pending=MAX_PENDING_DOWNLOADS, report=report
+    )
+    with report.stage("ingest"):
+        quarter_files = ingestion.run(accounting_urls, cadop_urls, RAW_DIR, CONSOLIDATED_ACCOUNTING_FILE)
+    logger.info("✅ Accounting data downloaded and processed")
+    return quarter_files
+
+
+def run_staged_ingestion(
+    urls: list[str],
+    downloader: FileDownloader,
+    factory: ProcessorFactory,
+    report: RunReport,
+) -> list[Path]:
+    """Steps 2-4 one after another, each over every file."""
     # === STEP 2: DOWNLOAD ===
     logger.info("📥 Downloading files...")
-    with FileDownloader(timeout=(5, 60)) as downloader:
-        for url in urls:
-            downloader.download(url, RAW_DIR)
+    with report.stage("download"):
+        downloader.download_all(urls, RAW_DIR)
     logger.info("✅ All downloads completed")
 
-    # === STEP 3: EXTRACTION ===
-    logger.info("📦 Extracting archives...")
-    extractor = FileExtractor()
-    extractor.process_directory(RAW_DIR)
-    logger.info("✅ All archives extracted")
+    # === STEP 3: EXTRACTION (optional) ===
+    if EXTRACT_ARCHIVES:
+        logger.info("📦 Extracting archives...")
+        extractor = FileExtractor()
+        with report.stage("extract"):
+            extractor.process_directory(RAW_DIR)
+        logger.info("✅ All archives extracted")
 
     # === STEP 4: ACCOUNTING PROCESSING ===
     logger.info("🧹 Processing accounting data...")
-    factory = ProcessorFactory()
-    factory.process_all_files(
-        input_dir=RAW_DIR,
-        output_file=CONSOLIDATED_ACCOUNTING_FILE
-    )
+    with report.stage("process"):
+        quarter_files = factory.process_all_files(
+            input_dir=RAW_DIR,
+            output_file=CONSOLIDATED_ACCOUNTING_FILE
+        )
     logger.info("✅ Accounting data processed")
-
-    # === STEP 5: FINAL CONSOLIDATION ===
-    logger.info("📊 Consolidating final dataset...")
-    consolidator = ExpenseConsolidationPipeline()
-    consolidator.run(
-        accounting_file=CONSOLIDATED_ACCOUNTING_FILE,
-        cadop_file=RAW_DIR / "Relatorio_cadop.csv",
-        output_file=FINAL_OUTPUT_FILE
-    )
-    logger.info("✅ Pipeline completed successfully!")
+    return quarter_files
 
 
 if __name__ == "__main__":
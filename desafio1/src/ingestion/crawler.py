@@ -1,33 +1,73 @@
+import html
 import re
 import logging
 import requests
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from .http_cache import HttpCache
 
 logger = logging.getLogger(__name__)
 
+# href of every <a> tag; autoindex pages are flat enough that a full HTML parse is not needed
+_HREF_PATTERN = re.compile(r"""<a\s[^>]*?href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+))""", re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r"^(\d{4})/$")
+_QUARTER_PATTERN = re.compile(r"([1-4])T(\d{4})", re.IGNORECASE)
+
 
 class ANSBaseCrawler(ABC):
     """
     Abstract base class for ANS data crawlers.
-    Provides shared functionality for HTTP requests and HTML parsing.
+    Provides shared functionality for HTTP requests and link extraction.
+    With an HttpCache, listings are fetched conditionally and reused on 304.
+    The session's connection pool holds max_workers connections, for crawlers
+    that fetch listings concurrently.
     """
 
-    def __init__(self, base_url: str, timeout: int = 10) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 10,
+        cache: HttpCache | None = None,
+        max_workers: int = 1,
+    ) -> None:
         self.base_url = base_url.strip().rstrip("/") + "/"
         self.timeout = timeout
-        self.session = requests.Session()  
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-    def _get_soup(self, url: str) -> BeautifulSoup | None:
-        """Fetches a URL and returns a parsed BeautifulSoup object, or None on failure."""
+    def _get_links(self, url: str) -> list[str] | None:
+        """Fetches a listing and returns the href of each of its links, or None on failure."""
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
+            page = self._get_html(url)
         except Exception as e:
             logger.error(f"Failed to fetch {url}: {e}")
             return None
+        return [html.unescape("".join(match.groups(""))) for match in _HREF_PATTERN.finditer(page)]
+
+    def _get_html(self, url: str) -> str:
+        """Returns the page body, served from the cache when the server reports it unchanged."""
+        cached = self.cache.get(url) if self.cache else None
+        headers = self.cache.conditional_headers(url) if self.cache and cached and "body" in cached else {}
+
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if self.cache and cached and "body" in cached and self.cache.is_unchanged(url, response):
+            logger.debug(f"Listing unchanged, using cache: {url}")
+            return cached["body"]
+
+        response.raise_for_status()
+        if self.cache:
+            # is_unchanged compares Content-Length, which is the compressed size for gzipped listings
+            content_length = response.headers.get("Content-Length")
+            size = int(content_length) if content_length is not None else None
+            self.cache.record(url, response, size=size, body=response.text)
+        return response.text
 
     @abstractmethod
     def get_urls(self) -> list[str]:
@@ -38,47 +78,79 @@ class ANSBaseCrawler(ABC):
 class AccountingCrawler(ANSBaseCrawler):
     """
     Crawler specialized in navigating the accounting statements directory structure,
-    which is organized by year (e.g., /2025/).
+    which is organized by year (e.g., /2025/), optionally with quarter subdirectories.
+    With max_workers > 1, year listings are fetched that many at a time, newest first;
+    the selection is the same as a sequential crawl, whatever order responses arrive in.
     """
 
-    def __init__(self, base_url: str, max_files: int = 3) -> None:
-        super().__init__(base_url)
+    def __init__(
+        self,
+        base_url: str,
+        max_files: int = 3,
+        cache: HttpCache | None = None,
+        max_workers: int = 1,
+    ) -> None:
+        super().__init__(base_url, cache=cache, max_workers=max_workers)
         self.max_files = max_files
 
     def get_urls(self) -> list[str]:
-        soup = self._get_soup(self.base_url)
-        if not soup:
+        links = self._get_links(self.base_url)
+        if links is None:
             return []
 
-        year_pattern = re.compile(r"^(\d{4})/$")
-        years = sorted(
-            [int(a["href"][:4]) for a in soup.find_all("a", href=year_pattern)],
-            reverse=True,
-        )
+        years = sorted({int(href[:4]) for href in links if _YEAR_PATTERN.match(href)}, reverse=True)
         return self._collect_zip_urls(years)
 
     def _collect_zip_urls(self, years: list[int]) -> list[str]:
         collected_urls: list[str] = []
-        for year in years:
-            if len(collected_urls) >= self.max_files:
-                break
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for start in range(0, len(years), self.max_workers):
+                if len(collected_urls) >= self.max_files:
+                    break
 
-            year_url = urljoin(self.base_url, f"{year}/")
-            soup = self._get_soup(year_url)
-            if not soup:
-                continue
+                batch = [urljoin(self.base_url, f"{year}/") for year in years[start:start + self.max_workers]]
+                for zip_urls in self._list_zip_urls(executor, batch):
+                    needed = self.max_files - len(collected_urls)
+                    collected_urls.extend(zip_urls[:needed])
 
-            zip_urls = [
-                urljoin(year_url, a["href"])
-                for a in soup.find_all("a", href=True)
-                if a["href"].lower().endswith(".zip")
-            ]
-            zip_urls.sort(reverse=True)  # Prioritize latest quarters (e.g., 4T > 3T)
+        return collected_urls
 
-            needed = self.max_files - len(collected_urls)
-            collected_urls.extend(zip_urls[:needed])
+    def _list_zip_urls(self, executor: Executor, year_urls: list[str]) -> list[list[str]]:
+        """
+        ZIP URLs of each year, newest quarter first, including those in its subdirectories.
+        Listings are fetched in two rounds (years, then subdirectories) so no task waits on the pool.
+        """
+        listings = list(executor.map(self._get_links, year_urls))
+        subdirectories = [
+            [urljoin(year_url, href) for href in links or [] if _is_subdirectory(href)]
+            for year_url, links in zip(year_urls, listings)
+        ]
+        sub_listings = iter(list(executor.map(self._get_links, [url for urls in subdirectories for url in urls])))
 
-        return collected_urls
+        zip_urls_per_year = []
+        for year_url, links, subdirectory_urls in zip(year_urls, listings, subdirectories):
+            zip_urls = _zip_urls(year_url, links or [])
+            for subdirectory_url in subdirectory_urls:
+                zip_urls += _zip_urls(subdirectory_url, next(sub_listings) or [])
+            zip_urls.sort(key=_quarter_key, reverse=True)  # Prioritize latest quarters (e.g., 4T > 3T)
+            zip_urls_per_year.append(zip_urls)
+        return zip_urls_per_year
+
+
+def _is_subdirectory(href: str) -> bool:
+    """Relative links to child directories; excludes the parent directory and sort links."""
+    return href.endswith("/") and not href.startswith(("/", "?", ".", "http:", "https:"))
+
+
+def _zip_urls(listing_url: str, links: list[str]) -> list[str]:
+    return [urljoin(listing_url, href) for href in links if href.lower().endswith(".zip")]
+
+
+def _quarter_key(url: str) -> tuple[int, int, str]:
+    """(year, quarter, name) for names like 3T2025.zip; others sort by name only."""
+    name = url.rsplit("/", 1)[-1]
+    match = _QUARTER_PATTERN.search(name)
+    return (int(match[2]), int(match[1]), name) if match else (0, 0, name)
 
 
 class ActiveOperatorsCrawler(ANSBaseCrawler):
@@ -88,12 +160,11 @@ class ActiveOperatorsCrawler(ANSBaseCrawler):
     """
 
     def get_urls(self) -> list[str]:
-        soup = self._get_soup(self.base_url)
-        if not soup:
+        links = self._get_links(self.base_url)
+        if links is None:
             return []
 
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
+        for href in links:
             if re.search(r"Relatorio_cadop.*\.csv$", href, re.IGNORECASE):
                 full_url = urljoin(self.base_url, href)
                 logger.info(f"CADOP report found: {full_url}")
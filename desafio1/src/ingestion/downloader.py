@@ -1,54 +1,263 @@
+import hashlib
+import os
+import re
+import threading
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
+from urllib.parse import urlsplit
 from requests import Session
+from requests.adapters import HTTPAdapter
+from .http_cache import HttpCache
+from ..utils.instrumentation import RunReport
 
 logger = logging.getLogger(__name__)
 Timeout = Tuple[int, int]
 
+_CONTENT_RANGE_TOTAL = re.compile(r"/(\d+)$")
+
+
+class DownloadIntegrityError(Exception):
+    """Raised when a downloaded file does not match its expected size or checksum."""
+
 
 class FileDownloader:
+    """
+    Downloads files over HTTP into a destination directory.
+    - Data is streamed into a '.part' file and renamed atomically once verified;
+    - An interrupted '.part' is resumed with an HTTP Range request, guarded by If-Range with
+      the ETag/Last-Modified saved next to it ('.part.meta'), so a file changed on the server
+      is downloaded again instead of spliced; without a saved validator it restarts;
+    - Size (Content-Length/Content-Range) and optional SHA-256 are checked before the rename;
+    - download_all runs a bounded thread pool with a per-host connection limit;
+    - With an HttpCache, files already on disk are revalidated with a conditional
+      request and the body is skipped when the server reports them unchanged.
+    - With a RunReport, each download is recorded as a per-file "download" stage.
+    """
+
     def __init__(
         self,
         timeout: Timeout = (5, 60),
         chunk_size: int = 1024 * 1024,  # 1 MB
+        max_workers: int = 4,
+        max_per_host: int = 4,
+        retries: int = 3,
+        cache: HttpCache | None = None,
+        report: RunReport | None = None,
     ) -> None:
         self.timeout = timeout
         self.chunk_size = chunk_size
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max(1, max_per_host)
+        self.retries = max(1, retries)
+        self.cache = cache
+        self.report = report or RunReport(enabled=False)
         self.session: Session = requests.Session()
 
-    def download(self, url: str, dest_dir: Path) -> Optional[Path]:
+        adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots: dict[str, threading.Semaphore] = {}
+        self._host_slots_lock = threading.Lock()
+
+    def download_all(
+        self,
+        urls: list[str],
+        dest_dir: Path,
+        checksums: dict[str, str] | None = None,
+    ) -> list[Path]:
+        """Downloads all URLs concurrently; returns the paths that completed, in input order."""
+        checksums = checksums or {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(
+                lambda url: self.download(url, dest_dir, checksums.get(url)),
+                urls,
+            ))
+        return [path for path in results if path is not None]
+
+    def download(self, url: str, dest_dir: Path, expected_sha256: str | None = None) -> Optional[Path]:
         dest_dir.mkdir(parents=True, exist_ok=True)
 
         filename = url.split("/")[-1]
         dest_path = dest_dir / filename
 
-        try:
-            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+        with self._host_slot(url), self.report.stage("download", file=filename) as record:
+            previous_mtime = dest_path.stat().st_mtime_ns if dest_path.exists() else None
+            downloaded = self._download_with_retries(url, dest_path, expected_sha256)
+            record.failed = downloaded is None
+            if downloaded is not None:
+                # A file left untouched was revalidated, not downloaded again
+                replaced = downloaded.stat().st_mtime_ns != previous_mtime
+                record.bytes_written = downloaded.stat().st_size if replaced else 0
+            return downloaded
+
+    def _download_with_retries(self, url: str, dest_path: Path, expected_sha256: str | None) -> Optional[Path]:
+        for attempt in range(1, self.retries + 1):
+            try:
+                self._fetch(url, dest_path, expected_sha256)
+                return dest_path
+
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+            ) as e:
+                logger.warning(f"Attempt {attempt}/{self.retries} interrupted for {url}: {e}")
+
+            except DownloadIntegrityError as e:
+                logger.warning(f"Attempt {attempt}/{self.retries} failed verification for {url}: {e}")
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"HTTP error while downloading {url}: {e}")
+                return None
+
+            except OSError as e:
+                logger.error(f"File system error while saving {url}: {e}")
+                return None
+
+            except Exception as e:
+                logger.exception(f"Unexpected error while downloading {url}: {e}")
+                return None
+
+        logger.error(f"Giving up on {url} after {self.retries} attempts")
+        return None
+
+    def _fetch(self, url: str, dest_path: Path, expected_sha256: str | None) -> str:
+        """
+        Streams url into '<dest>.part' (resuming it if present), verifies it and
+        renames it to dest_path. Returns the SHA-256 hex digest of the file.
+        """
+        part_path = dest_path.with_name(dest_path.name + ".part")
+        meta_path = dest_path.with_name(dest_path.name + ".part.meta")
+        validator = self._resume_validator(part_path, meta_path)
+        # Identity encoding keeps byte offsets and Content-Length meaningful for Range
+        headers = {"Accept-Encoding": "identity"}
+        offset = 0
+        if validator:
+            offset = part_path.stat().st_size
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+
+        cached = self._cached_entry(url, dest_path, offset, expected_sha256)
+        if cached and self.cache:
+            headers.update(self.cache.conditional_headers(url))
+
+        hasher = None
+        with self.session.get(url, stream=True, timeout=self.timeout, headers=headers) as response:
+            if cached and self.cache and self.cache.is_unchanged(url, response):
+                logger.info(f"Up to date, skipped: {dest_path.name}")
+                return cached["sha256"]
+
+            if offset and response.status_code == 416:
+                # Range not satisfiable: the previous attempt already got every byte
+                expected_size = self._total_size(response, offset)
+            else:
                 response.raise_for_status()
+                if offset and response.status_code != 206:
+                    logger.info(f"Server ignored Range or {dest_path.name} changed; restarting")
+                    offset = 0
+                if not offset:
+                    self._save_validator(meta_path, response)
+                expected_size = self._total_size(response, offset)
 
-                with open(dest_path, "wb") as f:
+                hasher = self._hash_file(part_path) if offset else hashlib.sha256()
+                with open(part_path, "ab" if offset else "wb") as f:
                     for chunk in response.iter_content(chunk_size=self.chunk_size):
                         if chunk:
                             f.write(chunk)
+                            hasher.update(chunk)
 
-            logger.info(f"Download completed: {filename}")
-            return dest_path
+        if hasher is None:
+            hasher = self._hash_file(part_path)
 
-        except requests.exceptions.Timeout as e:
-            logger.error(f"Timeout while downloading {url}: {e}")
+        actual_size = part_path.stat().st_size
+        if expected_size is not None and actual_size != expected_size:
+            if actual_size > expected_size:
+                self._discard_part(part_path, meta_path)
+            # Short read: keep the .part so the next attempt resumes from here
+            raise DownloadIntegrityError(f"size {actual_size} != expected {expected_size}")
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"HTTP error while downloading {url}: {e}")
+        digest = hasher.hexdigest()
+        if expected_sha256 and digest != expected_sha256.lower():
+            self._discard_part(part_path, meta_path)
+            raise DownloadIntegrityError(f"sha256 {digest} != expected {expected_sha256}")
 
-        except OSError as e:
-            logger.error(f"File system error while saving {url}: {e}")
+        os.replace(part_path, dest_path)
+        meta_path.unlink(missing_ok=True)
+        if self.cache:
+            self.cache.record(url, response, size=actual_size, sha256=digest)
+        logger.info(f"Download completed: {dest_path.name} (sha256={digest[:12]}…)")
+        return digest
 
-        except Exception as e:
-            logger.exception(f"Unexpected error while downloading {url}: {e}")
+    def _cached_entry(
+        self,
+        url: str,
+        dest_path: Path,
+        offset: int,
+        expected_sha256: str | None,
+    ) -> dict | None:
+        """Cache entry for a complete local copy of url, if it can be revalidated."""
+        if self.cache is None or offset or not dest_path.exists():
+            return None
+        entry = self.cache.get(url)
+        if entry is None or entry.get("size") != dest_path.stat().st_size or "sha256" not in entry:
+            return None
+        if expected_sha256 and entry["sha256"] != expected_sha256.lower():
+            return None
+        return entry
 
-        return None
+    @staticmethod
+    def _resume_validator(part_path: Path, meta_path: Path) -> str | None:
+        """Validator for If-Range when part_path can be resumed; None means download from scratch."""
+        if not part_path.exists() or not part_path.stat().st_size or not meta_path.exists():
+            return None
+        return meta_path.read_text(encoding="utf-8").strip() or None
+
+    @staticmethod
+    def _save_validator(meta_path: Path, response: requests.Response) -> None:
+        """Saves the strong ETag (or Last-Modified) of a fresh download, for a later If-Range."""
+        etag = response.headers.get("ETag")
+        validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified")
+        if validator:
+            meta_path.write_text(validator, encoding="utf-8")
+        else:
+            meta_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _discard_part(part_path: Path, meta_path: Path) -> None:
+        part_path.unlink()
+        meta_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _total_size(response: requests.Response, offset: int) -> int | None:
+        """Full file size announced by the server, if any."""
+        content_range = response.headers.get("Content-Range")
+        if content_range:
+            match = _CONTENT_RANGE_TOTAL.search(content_range)
+            return int(match.group(1)) if match else None
+        content_length = response.headers.get("Content-Length")
+        return offset + int(content_length) if content_length is not None else None
+
+    def _hash_file(self, path: Path) -> "hashlib._Hash":
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(self.chunk_size):
+                hasher.update(block)
+        return hasher
+
+    @contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        """Limits the number of simultaneous downloads against the same host."""
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.setdefault(host, threading.Semaphore(self.max_per_host))
+        with slot:
+            yield
 
     def close(self) -> None:
         self.session.close()
@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCache:
+    """
+    Persistent manifest of HTTP validators per URL (ETag, Last-Modified, size, SHA-256),
+    used to send conditional requests and skip unchanged listings and files.
+    Small bodies (directory listings) can be stored too, so a 304 can be served locally.
+    """
+
+    def __init__(self, manifest_file: Path) -> None:
+        self.manifest_file = manifest_file
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = self._load()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if not self.manifest_file.exists():
+            return {}
+        try:
+            return json.loads(self.manifest_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable HTTP cache {self.manifest_file}: {e}")
+            return {}
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(url)
+            return dict(entry) if entry else None
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously seen URL."""
+        entry = self.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, url: str, response: requests.Response) -> bool:
+        """
+        True when the server answered 304, or when it sent the full body but
+        its validators and Content-Length match what was cached.
+        """
+        if response.status_code == 304:
+            return True
+
+        entry = self.get(url)
+        if entry is None or response.status_code != 200:
+            return False
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        content_length = response.headers.get("Content-Length")
+        return (
+            content_length is not None
+            and int(content_length) == entry.get("size")
+            and (etag is None or etag == entry.get("etag"))
+            and (last_modified is None or last_modified == entry.get("last_modified"))
+        )
+
+    def record(self, url: str, response: requests.Response, size: int | None, **extra: Any) -> None:
+        """Stores the validators of a 200 response and persists the manifest."""
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": size,
+            **extra,
+        }
+        with self._lock:
+            self._entries[url] = entry
+            self._save()
+
+    def _save(self) -> None:
+        """Writes the manifest atomically (caller holds the lock)."""
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+        tmp_file.write_text(json.dumps(self._entries, indent=1), encoding="utf-8")
+        os.replace(tmp_file, self.manifest_file)
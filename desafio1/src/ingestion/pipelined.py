@@ -0,0 +1,121 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator
+
+from .downloader import FileDownloader
+from .zip_extractor import FileExtractor
+from ..processing.factory_processor import ProcessorFactory
+from ..utils.instrumentation import RunReport
+
+logger = logging.getLogger(__name__)
+
+
+class PipelinedIngestion:
+    """
+    Runs download → (extract) → process as concurrent stages joined by a queue,
+    instead of waiting for every download before the first file is processed:
+    quarter N is filtered by the ProcessorFactory's workers while quarter N+1 and
+    the other files (e.g. CADOP) are still downloading.
+    - Backpressure: at most max_pending source downloads are in flight or waiting
+      to be processed; the next one starts only when one of them has been processed.
+    - keep_raw=False deletes each source file once processed, so max_pending also caps
+      the raw files on disk (the next run downloads them again instead of revalidating).
+    - With extract=True, archives are extracted in the download threads before being queued.
+    """
+
+    def __init__(
+        self,
+        downloader: FileDownloader,
+        factory: ProcessorFactory,
+        extract: bool = False,
+        max_pending: int = 2,
+        keep_raw: bool = True,
+        report: RunReport | None = None,
+    ) -> None:
+        self.downloader = downloader
+        self.factory = factory
+        self.extract = extract
+        self.max_pending = max(1, max_pending)
+        self.keep_raw = keep_raw
+        self.report = report or RunReport(enabled=False)
+
+    def run(self, source_urls: list[str], other_urls: list[str], raw_dir: Path, output_file: Path) -> list[Path]:
+        """
+        Downloads other_urls alongside the pipeline and feeds source_urls, in order,
+        through processing into output_file. Returns ProcessorFactory.process_files' partials.
+        """
+        ready: queue.Queue[Path | None] = queue.Queue()
+        slots = threading.Semaphore(self.max_pending)
+        stop = threading.Event()
+        # Files of one download share a counter; its slot is freed when all are processed
+        owners: dict[Path, list[int]] = {}
+        owners_lock = threading.Lock()
+
+        def fetch(url: str) -> None:
+            files = self._fetch(url, raw_dir)
+            if not files:
+                slots.release()
+                return
+            remaining = [len(files)]
+            with owners_lock:
+                owners.update((file_path, remaining) for file_path in files)
+            for file_path in files:
+                ready.put(file_path)
+
+        def processed(file_path: Path) -> None:
+            with owners_lock:
+                remaining = owners.pop(file_path)
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if not self.keep_raw:
+                file_path.unlink(missing_ok=True)
+            if last:
+                slots.release()
+
+        def feed(executor: ThreadPoolExecutor) -> None:
+            try:
+                futures = [executor.submit(self.downloader.download, url, raw_dir) for url in other_urls]
+                for url in source_urls:
+                    slots.acquire()
+                    if stop.is_set():
+                        break
+                    futures.append(executor.submit(fetch, url))
+                wait(futures)
+            finally:
+                ready.put(None)
+
+        with ThreadPoolExecutor(max_workers=self.downloader.max_workers) as executor:
+            feeder = threading.Thread(target=feed, args=(executor,), daemon=True)
+            try:
+                return self.factory.process_files(self._drain(ready, feeder), output_file, on_done=processed)
+            finally:
+                # Unblock the feeder if processing stopped early
+                stop.set()
+                for _ in source_urls:
+                    slots.release()
+                if feeder.ident is not None:
+                    feeder.join()
+
+    def _fetch(self, url: str, raw_dir: Path) -> list[Path]:
+        """Downloads url and, when extracting, unpacks it; returns the files to process."""
+        downloaded = self.downloader.download(url, raw_dir)
+        if downloaded is None:
+            return []
+        if not self.extract or downloaded.suffix.lower() != ".zip":
+            return [downloaded]
+        with self.report.stage("extract", file=downloaded.name):
+            return FileExtractor.extract(downloaded, raw_dir)
+
+    @staticmethod
+    def _drain(ready: "queue.Queue[Path | None]", feeder: threading.Thread) -> Iterator[Path]:
+        """
+        Yields queued files until the end marker. Downloads start on the first pull,
+        once the factory has started its worker processes.
+        """
+        feeder.start()
+        while (file_path := ready.get()) is not None:
+            logger.debug(f"Ready for processing: {file_path.name}")
+            yield file_path
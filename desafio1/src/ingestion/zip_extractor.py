@@ -1,5 +1,5 @@
-import shutil
 import logging
+import zipfile
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -9,9 +9,17 @@ class FileExtractor:
     def process_directory(directory: Path) -> None:
         """Extract all files from a given folder"""
         for zip_path in directory.glob("*.zip"):
-            try:
-                shutil.unpack_archive(zip_path, directory)
-                logger.info(f"Extracted: {zip_path.name}")
-                zip_path.unlink()
-            except Exception as e:
-                logger.error(f"Error during extraction: {zip_path.name}: {e}")
+            FileExtractor.extract(zip_path, directory)
+
+    @staticmethod
+    def extract(zip_path: Path, directory: Path) -> list[Path]:
+        """Extracts one archive into directory and deletes it; returns the extracted files."""
+        try:
+            with zipfile.ZipFile(zip_path) as archive:
+                extracted = [Path(archive.extract(info, directory)) for info in archive.infolist() if not info.is_dir()]
+            logger.info(f"Extracted: {zip_path.name}")
+            zip_path.unlink()
+        except Exception as e:
+            logger.error(f"Error during extraction: {zip_path.name}: {e}")
+            return []
+        return extracted
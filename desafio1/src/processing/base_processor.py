@@ -1,46 +1,182 @@
+import io
 import pandas as pd
 import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import TextIO
+from typing import Iterable, Iterator, TextIO
+from .prefix_filter import AccountPrefixFilter
+from .source_file import SourceFile
+from .table_reader import SourceFormat, TableReader, normalize_column
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
 
 logger = logging.getLogger(__name__)
 
+_NUMERIC_COLUMNS = ("VL_SALDO_INICIAL", "VL_SALDO_FINAL")
+
 
 class BaseProcessor(ABC):
     """
     Base class for tabular file processors.
     Provides common infrastructure for:
     - Extension validation,
-    - Filtering by accounting account prefix ('41'),
-    - Efficient streaming output to CSV.
+    - Reading plain files or ZIP members as streams (see SourceFile),
+    - Chunked reading with the fastest available CSV engine,
+    - Filtering by accounting account prefixes ('41' by default), pushed down
+      to the raw lines before any DataFrame is built,
+    - Efficient streaming output to CSV, or to typed Parquet.
+    - Optionally (passthrough=True), CSV output copies the selected source lines
+      instead of parsing and re-serializing them (see _copy_target_lines).
     """
 
-    def __init__(self, output_file: Path, target_extension: str) -> None:
+    def __init__(
+        self,
+        output_file: Path,
+        target_extension: str,
+        default_encoding: str = "utf-8-sig",
+        account_prefixes: Iterable[str] = ("41",),
+        passthrough: bool = False,
+    ) -> None:
         self.output_file = output_file
         self.target_extension = target_extension.lower()
-        self._TARGET_ACCOUNT_PREFIX = "41"
+        self.account_prefixes = tuple(account_prefixes)
+        self.passthrough = passthrough
+        self.reader = TableReader(default_encoding=default_encoding)
+        self.prefix_filter = AccountPrefixFilter(self.account_prefixes)
 
     @abstractmethod
     def process_with_stream(
         self, 
-        file_path: Path, 
+        source: SourceFile | Path, 
         output_stream: TextIO, 
         write_header: bool
     ) -> bool:
         """
         Processa um arquivo e escreve no stream fornecido.
         Deve ser implementado por subclasses.
+        Retorna se alguma linha foi escrita; erros de leitura são propagados.
         """
         raise NotImplementedError
 
-    def _check_extension(self, file_path: Path) -> bool:
+    def process_to_parquet(self, source: SourceFile | Path, output_file: Path) -> bool:
+        """
+        Writes the target rows of a source to a Parquet file, chunk by chunk.
+        Balances are stored as float64 so later stages skip re-parsing them.
+        Returns whether any row was written; read errors are raised.
+        """
+        if pa is None or pq is None:
+            raise RuntimeError("Parquet output requires pyarrow")
+        if not self._check_extension(source):
+            return False
+
+        writer = None
+        schema = None
+        try:
+            for filtered_df in self._iter_target_chunks(source):
+                filtered_df = filtered_df.assign(**{
+                    col: pd.to_numeric(filtered_df[col], errors="coerce")
+                    for col in _NUMERIC_COLUMNS if col in filtered_df.columns
+                })
+                if writer is None:
+                    schema = pa.schema([
+                        (col, pa.float64() if col in _NUMERIC_COLUMNS else pa.string())
+                        for col in filtered_df.columns
+                    ])
+                    writer = pq.ParquetWriter(output_file, schema)
+                assert schema is not None
+                writer.write_table(pa.Table.from_pandas(filtered_df, schema=schema, preserve_index=False))
+            return writer is not None
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _check_extension(self, source: SourceFile | Path) -> bool:
         """Check if the file has the expected extension."""
-        return file_path.suffix.lower() == self.target_extension
+        return source.suffix.lower() == self.target_extension
+
+    def _iter_target_chunks(self, source: SourceFile | Path) -> Iterator[pd.DataFrame]:
+        """
+        Yields the non-empty target chunks of a file or archive member.
+        Non-matching lines are dropped by the prefix filter while scanning the raw bytes,
+        so only the selected rows are ever parsed into DataFrames.
+        """
+        if isinstance(source, Path):
+            source = SourceFile(source)
+
+        with source.open() as raw_stream:
+            fmt = self.reader.detect(raw_stream)
+            raw_stream.seek(0)
+            for buffer in self.prefix_filter.filter_stream(raw_stream, fmt):
+                for chunk in self.reader.read(buffer, fmt):
+                    filtered_df = self._extract_target_rows(chunk)
+                    if not filtered_df.empty:
+                        yield filtered_df
+
+    def _copy_target_lines(self, source: SourceFile | Path, output_stream: TextIO, write_header: bool) -> bool | None:
+        """
+        Pass-through output: the lines selected by the prefix filter are written as
+        they are in the source, with every source column, without building DataFrames.
+        Only the encoding (to the stream's), CRLF line endings and the header names
+        (normalized) change; batches are transcoded at once, or copied as bytes when
+        both sides are plain UTF-8. A batch with a line whose field count does not
+        match the header (malformed, or a quoted ';') is parsed instead, keeping the
+        same columns. Returns None, without writing, for sources not delimited by ';'.
+        """
+        if isinstance(source, Path):
+            source = SourceFile(source)
+
+        with source.open() as raw_stream:
+            fmt = self.reader.detect(raw_stream)
+            if fmt.delimiter != ";":
+                return None
+            raw_stream.seek(0)
+
+            delimiters_per_line = len(fmt.columns) - 1
+            # Byte copies skip the text layer; not with utf-8-sig streams, whose encoder adds the BOM itself
+            binary_stream = getattr(output_stream, "buffer", None) if (
+                fmt.encoding in ("utf-8", "utf-8-sig") and getattr(output_stream, "encoding", None) == "utf-8"
+            ) else None
+
+            any_saved = False
+            for buffer in self.prefix_filter.filter_stream(raw_stream, fmt):
+                if write_header:
+                    output_stream.write(";".join(normalize_column(col) for col in fmt.columns) + "\n")
+                    write_header = False
+
+                data = buffer.getvalue()
+                body = data[data.index(b"\n") + 1:].replace(b"\r\n", b"\n")
+                if not body.endswith(b"\n"):
+                    body += b"\n"
+                if not self._fields_match(body, delimiters_per_line):
+                    self._save_parsed_lines(buffer, fmt, output_stream)
+                elif binary_stream is not None:
+                    output_stream.flush()
+                    binary_stream.write(body)
+                else:
+                    output_stream.write(body.decode(fmt.encoding))
+                any_saved = True
+            return any_saved
+
+    @staticmethod
+    def _fields_match(body: bytes, delimiters_per_line: int) -> bool:
+        """True when every line of body has exactly delimiters_per_line ';' (checked per line,
+        so a short line and a long one in the same batch do not cancel each other out)."""
+        return all(line.count(b";") == delimiters_per_line for line in body[:-1].split(b"\n"))
+
+    def _save_parsed_lines(self, buffer: io.BytesIO, fmt: SourceFormat, output_stream: TextIO) -> None:
+        """Pass-through fallback for one batch: parsed with every column, bad lines skipped."""
+        reader = TableReader(columns=None, chunksize=self.reader.chunksize, engines=self.reader.engines)
+        for chunk in reader.read(buffer, fmt):
+            self._save_chunk_to_stream(self._extract_target_rows(chunk), output_stream, False)
 
     def _extract_target_rows(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Filter rows where the column 'CD_CONTA_CONTABIL' starts with '41'.
+        Filter rows where the column 'CD_CONTA_CONTABIL' starts with one of the account prefixes.
         Returns a new DataFrame (never modifies the original).
         """
         if "CD_CONTA_CONTABIL" not in df.columns:
@@ -48,7 +184,7 @@ class BaseProcessor(ABC):
             return pd.DataFrame()
 
         account_col = df["CD_CONTA_CONTABIL"].fillna("").astype(str).str.strip()
-        mask = account_col.str.startswith(self._TARGET_ACCOUNT_PREFIX, na=False)
+        mask = account_col.str.startswith(self.account_prefixes, na=False)
         return df.loc[mask]
 
     def _save_chunk_to_stream(self, df: pd.DataFrame, output_stream: TextIO, write_header: bool) -> None:
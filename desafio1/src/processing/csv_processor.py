@@ -1,48 +1,37 @@
 from typing import override
 from .base_processor import BaseProcessor
+from .source_file import SourceFile
 from pathlib import Path
 import logging
-import pandas as pd
-from typing import TextIO
+from typing import Iterable, TextIO
 
 logger = logging.getLogger(__name__)
 
 
 class CsvProcessor(BaseProcessor):
-    def __init__(self, output_file: Path):
-        super().__init__(output_file, target_extension=".csv")
+    def __init__(self, output_file: Path, account_prefixes: Iterable[str] = ("41",), passthrough: bool = False):
+        super().__init__(
+            output_file, target_extension=".csv", account_prefixes=account_prefixes, passthrough=passthrough
+        )
 
     @override
     def process_with_stream(
         self, 
-        file_path: Path, 
+        source: SourceFile | Path, 
         output_stream: TextIO, 
         write_header: bool
     ) -> bool:
-        if not self._check_extension(file_path):
+        if not self._check_extension(source):
             return False
 
         any_saved = False
-        try:
-            reader = pd.read_csv(
-                file_path,
-                sep=None,
-                engine='python',
-                chunksize=150_000,
-                dtype=str,
-                encoding='utf-8-sig'
-            )
-            
-            for chunk in reader:
-                chunk.columns = [c.upper().strip() for c in chunk.columns]
-                filtered_df = self._extract_target_rows(chunk)
-
-                if not filtered_df.empty:
-                    self._save_chunk_to_stream(filtered_df, output_stream, write_header)
-                    if write_header:
-                        write_header = False  
-                    any_saved = True
-            return any_saved
-        except Exception as e:
-            logger.error(f"Erro no CSV {file_path.name}: {e}")
-            return False
+        if self.passthrough:
+            copied = self._copy_target_lines(source, output_stream, write_header)
+            if copied is not None:
+                return copied
+        for filtered_df in self._iter_target_chunks(source):
+            self._save_chunk_to_stream(filtered_df, output_stream, write_header)
+            if write_header:
+                write_header = False
+            any_saved = True
+        return any_saved
@@ -1,8 +1,21 @@
 from pathlib import Path
+from typing import Callable, Iterable, TextIO
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
 from .base_processor import BaseProcessor
 from .csv_processor import CsvProcessor
+from .source_file import SourceFile
 from .txt_processor import TxtProcessor
+from ..utils.artifact_cache import ArtifactCache
+from ..utils.frame_io import is_parquet
+from ..utils.instrumentation import RunReport, StageRecord
 import logging
+import os
+import pandas as pd
+import shutil
+import tempfile
+import threading
+import zipfile
 
 logger = logging.getLogger(__name__)
 
@@ -11,38 +24,398 @@ _PROCESSOR_REGISTRY = {
     ".txt": TxtProcessor,
 }
 
+
+def _process_to_partial(
+    source: SourceFile,
+    partial_file: Path,
+    account_prefixes: tuple[str, ...],
+    passthrough: bool = False,
+) -> bool:
+    """
+    Worker entry point: filters a single source into its own partial CSV.
+    Each partial carries its own header, which is dropped during the merge.
+    A '.parquet' partial is written as typed Parquet instead of CSV.
+    The partial is written under a temporary name and renamed when complete,
+    so an interrupted run never leaves a truncated artifact behind.
+    A source without target rows gets an empty partial; when processing fails,
+    the error is raised and no partial is left, so the source is retried next time.
+    """
+    processor = ProcessorFactory.create(source, partial_file, account_prefixes, passthrough)
+    tmp_file = partial_file.with_name(partial_file.name + ".tmp")
+    try:
+        if is_parquet(partial_file):
+            success = processor.process_to_parquet(source, tmp_file)
+        else:
+            with open(tmp_file, "w", encoding="utf-8") as partial_stream:
+                success = processor.process_with_stream(source, partial_stream, True)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+    if not success:
+        # An empty partial means "no rows", and is cached like any other
+        tmp_file.write_bytes(b"")
+    os.replace(tmp_file, partial_file)
+    return success
+
+
+def _measured_partial(
+    source: SourceFile,
+    partial_file: Path,
+    account_prefixes: tuple[str, ...],
+    passthrough: bool = False,
+) -> tuple[bool, StageRecord]:
+    """_process_to_partial as a "process" stage of its own, measured inside the worker."""
+    with RunReport().stage("process", file=source.name) as record:
+        success = _process_to_partial(source, partial_file, account_prefixes, passthrough)
+        record.bytes_read = source.size()
+        record.bytes_written = partial_file.stat().st_size
+    return success, record
+
+
 class ProcessorFactory:
+    """
+    With passthrough=True, CSV outputs get the selected source lines copied as they are
+    (every source column, transcoded to UTF-8) instead of re-serialized by pandas.
+    Parquet outputs are always built from parsed chunks.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        account_prefixes: Iterable[str] = ("41",),
+        cache_dir: Path | None = None,
+        report: RunReport | None = None,
+        passthrough: bool = False,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.account_prefixes = tuple(account_prefixes)
+        self.cache_dir = cache_dir
+        self.report = report or RunReport(enabled=False)
+        self.passthrough = passthrough
+
     @staticmethod
-    def create(file_path: Path, output_file: Path) -> BaseProcessor:
-        ext = file_path.suffix.lower()
+    def create(
+        source: SourceFile | Path,
+        output_file: Path,
+        account_prefixes: Iterable[str] = ("41",),
+        passthrough: bool = False,
+    ) -> BaseProcessor:
+        ext = source.suffix.lower()
         processor_class = _PROCESSOR_REGISTRY.get(ext)
         if processor_class is None:
             raise ValueError(f"We need to include a proper processor to: {ext}")
-        return processor_class(output_file)
+        return processor_class(output_file, account_prefixes=account_prefixes, passthrough=passthrough)
 
-    
-    def process_all_files(self, input_dir: Path, output_file: Path) -> None:
-        """Process all files in input_dir and consolidate into a single output file."""
+    def process_all_files(self, input_dir: Path, output_file: Path) -> list[Path]:
+        """
+        Process all files in input_dir and consolidate into a single output file.
+        ZIP archives are read member by member as streams, without extraction.
+        A '.parquet' output_file produces typed Parquet instead of CSV.
+
+        With a cache_dir, every source is filtered into a persistent partial keyed by
+        its fingerprint, and only new or changed sources are processed again.
+        Returns those per-source partials (an empty list when caching is off).
+        With a RunReport, every processed source is recorded as a per-file "process" stage.
+        """
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        
+
         if output_file.exists():
             output_file.unlink()
 
+        sources = self._collect_sources(input_dir)
+        suffix = output_file.suffix.lower()
+
+        if self.cache_dir is not None:
+            partials = self._build_cached_partials(sources, suffix)
+            self._merge_partials(partials, output_file)
+            return partials
+
+        # Pass-through partials may differ in columns from parsed ones; the merge aligns them
+        if (self.max_workers > 1 and len(sources) > 1) or is_parquet(output_file) or self.passthrough:
+            with tempfile.TemporaryDirectory(dir=output_file.parent, prefix=".partials_") as tmp_dir:
+                partial_files = [
+                    self._temporary_partial(Path(tmp_dir), index, source, suffix)
+                    for index, source in enumerate(sources)
+                ]
+                partials = self._build_partials(sources, partial_files)
+                self._merge_partials(partials, output_file)
+            return []
+
         with open(output_file, "w", encoding="utf-8-sig") as output_stream:
             header_written = False
-            for file_path in input_dir.iterdir():
-                if not file_path.is_file() or file_path.suffix.lower() not in _PROCESSOR_REGISTRY:
-                    continue
-
+            for source in sources:
                 try:
-                    processor = self.create(file_path, output_file)
-                    success = processor.process_with_stream(
-                        file_path, 
-                        output_stream, 
-                        not header_written
-                    )
+                    with self.report.stage("process", file=source.name) as record:
+                        processor = self.create(source, output_file, self.account_prefixes, self.passthrough)
+                        success = processor.process_with_stream(
+                            source,
+                            output_stream,
+                            not header_written
+                        )
+                        record.bytes_read = source.size()
                     if success and not header_written:
                         header_written = True
                 except Exception as e:
-                    logger.error("Something went wrong during the processing") 
-                    pass
+                    logger.error(f"Something went wrong during the processing of {source.name}: {e}")
+        return []
+
+    @staticmethod
+    def _collect_sources(input_dir: Path) -> list[SourceFile]:
+        """
+        Returns the processable files and archive members, sorted so the output order is deterministic.
+        """
+        sources: list[SourceFile] = []
+        for file_path in input_dir.iterdir():
+            if file_path.is_file():
+                sources.extend(ProcessorFactory._sources_of(file_path))
+        return sorted(sources)
+
+    @staticmethod
+    def _sources_of(file_path: Path) -> list[SourceFile]:
+        """The file itself when it is processable, the processable members of a ZIP, or nothing."""
+        suffix = file_path.suffix.lower()
+        if suffix in _PROCESSOR_REGISTRY:
+            return [SourceFile(file_path)]
+        if suffix == ".zip":
+            try:
+                return SourceFile.from_archive(file_path, _PROCESSOR_REGISTRY)
+            except zipfile.BadZipFile as e:
+                logger.error(f"Invalid archive {file_path.name}: {e}")
+        return []
+
+    def process_files(
+        self,
+        files: Iterable[Path],
+        output_file: Path,
+        on_done: Callable[[Path], None] | None = None,
+    ) -> list[Path]:
+        """
+        Pipelined counterpart of process_all_files for files that arrive over time
+        (e.g. from a download queue): the sources of each file are submitted to the
+        worker pool as soon as the iterator yields it, instead of after a full listing.
+        on_done(file) is called, possibly from another thread, once every source of that
+        file has been filtered (or failed), so the caller can release or delete it.
+        The worker pool is started before the first file is pulled from the iterator.
+        Partials are merged in sorted source order, so the output does not depend on
+        arrival order; returns the same partials as process_all_files.
+        """
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if output_file.exists():
+            output_file.unlink()
+
+        suffix = output_file.suffix.lower()
+        cache = ArtifactCache(self.cache_dir, "partials", suffix=suffix) if self.cache_dir is not None else None
+        partial_key = self._partial_key(suffix)
+        sources: list[SourceFile] = []
+        partial_files: list[Path] = []
+        outcomes: list[bool | Future] = []
+        reused = 0
+
+        with ExitStack() as stack:
+            if cache is None:
+                tmp_dir = Path(stack.enter_context(
+                    tempfile.TemporaryDirectory(dir=output_file.parent, prefix=".partials_")
+                ))
+            else:
+                tmp_dir = None
+            executor = None
+            if self.max_workers > 1:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=self.max_workers))
+                # Start the workers before pulling the first file: producers usually start
+                # their threads then, and forking a multi-threaded process can deadlock a worker
+                executor.submit(os.getpid).result()
+
+            for file_path in files:
+                pending = []
+                for source in self._sources_of(file_path):
+                    if cache is not None:
+                        partial_file = cache.path_for(source.fingerprint(), partial_key)
+                    else:
+                        assert tmp_dir is not None
+                        partial_file = self._temporary_partial(tmp_dir, len(sources), source, suffix)
+                    sources.append(source)
+                    partial_files.append(partial_file)
+                    if cache is not None and partial_file.exists():
+                        outcomes.append(True)
+                        reused += 1
+                        continue
+                    started = self._start_partials([source], [partial_file], executor)
+                    outcomes.extend(started)
+                    pending.extend(outcome for outcome in started if isinstance(outcome, Future))
+                self._notify_when_done(file_path, pending, on_done)
+
+            # Merged in sorted source order, like process_all_files
+            order = sorted(range(len(sources)), key=sources.__getitem__)
+            partials = self._finish_partials(
+                [sources[i] for i in order], [partial_files[i] for i in order], [outcomes[i] for i in order]
+            )
+
+            if cache is not None:
+                logger.info(f"{reused} sources unchanged, {len(sources) - reused} processed")
+                cache.prune(keep=set(partial_files))
+                partials = self._non_empty([partial_files[i] for i in order])
+            self._merge_partials(partials, output_file)
+
+        return partials if cache is not None else []
+
+    def _partial_key(self, suffix: str) -> str:
+        """Cache key part for the processing options that change a partial's content."""
+        prefixes_key = ",".join(self.account_prefixes)
+        # Unchanged without pass-through, so existing partials stay valid
+        return f"{prefixes_key}|passthrough" if self.passthrough and suffix == ".csv" else prefixes_key
+
+    @staticmethod
+    def _notify_when_done(file_path: Path, futures: list[Future], on_done: Callable[[Path], None] | None) -> None:
+        """Calls on_done(file_path) once all futures are done, or right away when there are none."""
+        if on_done is None:
+            return
+        if not futures:
+            on_done(file_path)
+            return
+
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def finished(_: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                on_done(file_path)
+
+        for future in futures:
+            future.add_done_callback(finished)
+
+    def _build_cached_partials(self, sources: list[SourceFile], suffix: str) -> list[Path]:
+        """Reuses the cached partial of every unchanged source and builds the missing ones."""
+        assert self.cache_dir is not None
+        cache = ArtifactCache(self.cache_dir, "partials", suffix=suffix)
+        partial_key = self._partial_key(suffix)
+        partial_files = [cache.path_for(source.fingerprint(), partial_key) for source in sources]
+
+        missing = [
+            (source, partial_file)
+            for source, partial_file in zip(sources, partial_files)
+            if not partial_file.exists()
+        ]
+        logger.info(f"{len(sources) - len(missing)} sources unchanged, {len(missing)} to process")
+        if missing:
+            self._build_partials([source for source, _ in missing], [partial for _, partial in missing])
+
+        cache.prune(keep=set(partial_files))
+        return self._non_empty(partial_files)
+
+    @staticmethod
+    def _non_empty(partial_files: list[Path]) -> list[Path]:
+        # Empty partials mark sources without target rows; they stay cached but aren't merged
+        return [partial_file for partial_file in partial_files if partial_file.exists() and partial_file.stat().st_size]
+
+    @staticmethod
+    def _temporary_partial(tmp_dir: Path, index: int, source: SourceFile, suffix: str) -> Path:
+        return tmp_dir / f"{index:04d}_{Path(source.name).stem}{suffix}"
+
+    def _build_partials(self, sources: list[SourceFile], partial_files: list[Path]) -> list[Path]:
+        """
+        Filters every source into its own partial CSV, in a process pool when
+        max_workers > 1. Returns the partials that received rows, in source order.
+        """
+        workers = min(self.max_workers, len(sources))
+        if workers <= 1:
+            return self._finish_partials(sources, partial_files, self._start_partials(sources, partial_files, None))
+
+        logger.info(f"Processing {len(sources)} files with {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = self._start_partials(sources, partial_files, executor)
+            return self._finish_partials(sources, partial_files, outcomes)
+
+    def _start_partials(
+        self,
+        sources: list[SourceFile],
+        partial_files: list[Path],
+        executor: ProcessPoolExecutor | None,
+    ) -> list[bool | Future]:
+        """
+        Builds each partial right away, recorded as a "process" stage, and returns its success;
+        with an executor, submits it instead and returns the future (see _finish_partials).
+        """
+        outcomes: list[bool | Future] = []
+        for source, partial_file in zip(sources, partial_files):
+            if executor is not None:
+                outcomes.append(
+                    executor.submit(_measured_partial, source, partial_file, self.account_prefixes, self.passthrough)
+                )
+                continue
+            try:
+                with self.report.stage("process", file=source.name) as record:
+                    outcomes.append(_process_to_partial(source, partial_file, self.account_prefixes, self.passthrough))
+                    record.bytes_read = source.size()
+                    record.bytes_written = partial_file.stat().st_size
+            except Exception as e:
+                logger.error(f"Something went wrong during the processing of {source.name}: {e}")
+                outcomes.append(False)
+        return outcomes
+
+    def _finish_partials(
+        self,
+        sources: list[SourceFile],
+        partial_files: list[Path],
+        outcomes: list[bool | Future],
+    ) -> list[Path]:
+        """Waits for the submitted partials and records their stages; returns the successful partials, in order."""
+        built: list[Path] = []
+        for source, partial_file, outcome in zip(sources, partial_files, outcomes):
+            if isinstance(outcome, Future):
+                try:
+                    outcome, record = outcome.result()
+                    self.report.add(record)
+                except Exception as e:
+                    logger.error(f"Something went wrong during the processing of {source.name}: {e}")
+                    outcome = False
+            if outcome:
+                built.append(partial_file)
+        return built
+
+    @staticmethod
+    def _merge_partials(partial_files: list[Path], output_file: Path) -> None:
+        """Concatenates partial CSVs into output_file, keeping only the first header."""
+        if is_parquet(output_file):
+            ProcessorFactory._merge_parquet_partials(partial_files, output_file)
+            return
+
+        with open(output_file, "w", encoding="utf-8-sig") as output_stream:
+            header = None
+            for partial_file in partial_files:
+                with open(partial_file, encoding="utf-8") as partial_stream:
+                    partial_header = partial_stream.readline()
+                    if header is None:
+                        header = partial_header
+                        output_stream.write(header)
+                    elif partial_header != header:
+                        # Pass-through and parsed partials differ in columns: align to the first one
+                        ProcessorFactory._append_aligned(partial_file, header, output_stream)
+                        continue
+                    shutil.copyfileobj(partial_stream, output_stream)
+
+    @staticmethod
+    def _append_aligned(partial_file: Path, header: str, output_stream: TextIO) -> None:
+        """Appends a partial CSV reordered to the header's columns; missing ones are left empty."""
+        columns = header.rstrip("\n").split(";")
+        for chunk in pd.read_csv(partial_file, sep=";", dtype=str, keep_default_na=False, chunksize=500_000):
+            chunk.reindex(columns=columns).to_csv(output_stream, sep=";", index=False, header=False)
+
+    @staticmethod
+    def _merge_parquet_partials(partial_files: list[Path], output_file: Path) -> None:
+        """Appends the row groups of every Parquet partial into output_file, in order."""
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for partial_file in partial_files:
+                partial = pq.ParquetFile(partial_file)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_file, partial.schema_arrow)
+                for batch in partial.iter_batches():
+                    writer.write_batch(batch)
+        finally:
+            if writer is not None:
+                writer.close()
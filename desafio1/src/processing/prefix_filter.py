@@ -0,0 +1,76 @@
+import io
+import logging
+import re
+from typing import BinaryIO, Iterable, Iterator
+
+from .table_reader import SourceFormat, normalize_column
+
+logger = logging.getLogger(__name__)
+
+_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+class AccountPrefixFilter:
+    """
+    Pushdown filter that runs on raw line bytes, before any DataFrame is built.
+    Only rows whose account column starts with one of the prefixes are kept,
+    so parsing cost and memory scale with the selected rows, not the file size.
+
+    Works for any ASCII-compatible encoding (utf-8, latin1). Rows with quoted
+    line breaks before the account column are not supported and are dropped.
+    The stream is scanned in large blocks by one compiled regex, not line by line.
+    """
+
+    def __init__(
+        self,
+        prefixes: Iterable[str],
+        column: str = "CD_CONTA_CONTABIL",
+        batch_lines: int = 150_000,
+    ) -> None:
+        self.prefixes = tuple(prefix.encode("ascii") for prefix in prefixes)
+        self.column = normalize_column(column)
+        self.batch_lines = batch_lines
+
+    def column_index(self, fmt: SourceFormat) -> int | None:
+        for index, name in enumerate(fmt.columns):
+            if normalize_column(name) == self.column:
+                return index
+        return None
+
+    def filter_stream(self, stream: BinaryIO, fmt: SourceFormat) -> Iterator[io.BytesIO]:
+        """
+        Yields in-memory CSV buffers, each made of the original header line
+        followed by up to `batch_lines` matching rows, in the source encoding.
+        """
+        index = self.column_index(fmt)
+        if index is None:
+            logger.debug(f"Column '{self.column}' not found — skipping.")
+            return
+
+        header = stream.readline().removeprefix(b"\xef\xbb\xbf")
+        pattern = self._line_pattern(fmt.delimiter.encode("ascii"), index)
+        batch: list[bytes] = []
+        tail = b""
+
+        while True:
+            block = stream.read(_BLOCK_SIZE)
+            # Scan complete lines only; each one is anchored on the newline before it
+            data = tail + block if block else tail + (b"\n" if tail else b"")
+            cut = data.rfind(b"\n") + 1
+            batch.extend(pattern.findall(b"\n" + data[:cut]))
+            tail = data[cut:]
+
+            while len(batch) >= self.batch_lines or (not block and batch):
+                lines, batch = batch[:self.batch_lines], batch[self.batch_lines:]
+                yield io.BytesIO(header + b"\n".join(lines) + b"\n")
+            if not block:
+                return
+
+    def _line_pattern(self, delimiter: bytes, index: int) -> re.Pattern[bytes]:
+        """
+        Matches, after a newline, a line whose field `index` starts with one of the prefixes
+        once leading quotes and spaces are skipped; captures the line without its newline.
+        """
+        prefixes = b"|".join(re.escape(prefix) for prefix in self.prefixes)
+        other_field = b"[^%s\n]*%s" % (re.escape(delimiter), re.escape(delimiter))
+        return re.compile(b"\n((?:%s){%d}[\" ]*(?:%s)[^\n]*)" % (other_field, index, prefixes))
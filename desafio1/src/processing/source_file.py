@@ -0,0 +1,69 @@
+import io
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterable, Iterator
+
+from ..utils.artifact_cache import file_fingerprint
+
+_ZIP_READ_BUFFER = 1024 * 1024  # 1 MB
+
+
+@dataclass(frozen=True, order=True)
+class SourceFile:
+    """
+    A processable input: either a file on disk or a member inside a ZIP archive.
+    Archive members are read as decompressed streams, never extracted to disk.
+    """
+    path: Path
+    member: str | None = None
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name if self.member else self.path.name
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.name).suffix.lower()
+
+    def size(self) -> int:
+        """Bytes a processor reads: the file size, or the uncompressed size of the member."""
+        if self.member is None:
+            return self.path.stat().st_size
+        with zipfile.ZipFile(self.path) as archive:
+            return archive.getinfo(self.member).file_size
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the source content without reading it: size + mtime for plain files,
+        CRC-32 + size of the member for archives (stable across re-downloads).
+        """
+        if self.member is None:
+            return file_fingerprint(self.path)
+        with zipfile.ZipFile(self.path) as archive:
+            info = archive.getinfo(self.member)
+        return f"{self.path.name}!{self.member}:{info.file_size}:{info.CRC:08x}"
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """Opens the source as a seekable binary stream."""
+        if self.member is None:
+            with open(self.path, "rb") as stream:
+                yield stream
+            return
+
+        with zipfile.ZipFile(self.path) as archive, archive.open(self.member) as member_stream:
+            # ZipExtFile.readline is pure Python; buffering gives C-speed line iteration
+            yield io.BufferedReader(member_stream, buffer_size=_ZIP_READ_BUFFER)  # type: ignore[arg-type]
+
+    @staticmethod
+    def from_archive(zip_path: Path, suffixes: Iterable[str]) -> list["SourceFile"]:
+        """Lists the archive members whose extension is in `suffixes`."""
+        suffixes = {suffix.lower() for suffix in suffixes}
+        with zipfile.ZipFile(zip_path) as archive:
+            return [
+                SourceFile(zip_path, info.filename)
+                for info in archive.infolist()
+                if not info.is_dir() and PurePosixPath(info.filename).suffix.lower() in suffixes
+            ]
@@ -0,0 +1,195 @@
+import csv
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Literal
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; the C engine is used instead
+    pa = None
+    pa_csv = None
+
+logger = logging.getLogger(__name__)
+
+# Columns consumed downstream by the Grupo 41 consolidation
+PIPELINE_COLUMNS = (
+    "DATA",
+    "REG_ANS",
+    "CD_CONTA_CONTABIL",
+    "VL_SALDO_INICIAL",
+    "VL_SALDO_FINAL",
+)
+
+Engine = Literal["pyarrow", "c", "python"]
+ENGINES: tuple[Engine, ...] = ("pyarrow", "c", "python")
+
+_SAMPLE_SIZE = 64 * 1024
+_CANDIDATE_DELIMITERS = ";,\t|"
+_PYARROW_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SourceFormat:
+    """Layout of a delimited source file, detected once from a small sample."""
+    delimiter: str
+    encoding: str
+    columns: tuple[str, ...]
+
+
+def normalize_column(name: str) -> str:
+    return name.upper().strip()
+
+
+def detect_format(sample: bytes, default_encoding: str = "utf-8-sig") -> SourceFormat:
+    """
+    Detects encoding, delimiter and header from the first bytes of a file.
+    - A UTF-8 BOM means 'utf-8-sig';
+    - Pure ASCII samples keep the caller's default encoding;
+    - Otherwise UTF-8 is tried before falling back to latin1.
+    """
+    if sample.startswith(b"\xef\xbb\xbf"):
+        encoding = "utf-8-sig"
+    elif sample.isascii():
+        encoding = default_encoding
+    else:
+        try:
+            # Trim to the last full line so a split multi-byte char doesn't fail the check
+            sample[: sample.rfind(b"\n") + 1 or len(sample)].decode("utf-8")
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding = "latin1"
+
+    text = sample.decode(encoding, errors="replace")
+    lines = text.splitlines()[:20]
+    header = lines[0] if lines else ""
+
+    try:
+        delimiter = csv.Sniffer().sniff("\n".join(lines), delimiters=_CANDIDATE_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = max(_CANDIDATE_DELIMITERS, key=header.count)
+
+    columns = tuple(next(csv.reader([header], delimiter=delimiter), []))
+    return SourceFormat(delimiter=delimiter, encoding=encoding, columns=columns)
+
+
+class TableReader:
+    """
+    Reads delimited ANS files in chunks with the fastest engine available.
+    The format is detected once per file; the full parse then runs on
+    pyarrow, the pandas C engine or, as a last resort, the python engine,
+    loading only the requested columns (as strings, with normalized names).
+    """
+
+    def __init__(
+        self,
+        columns: Iterable[str] | None = PIPELINE_COLUMNS,
+        chunksize: int = 150_000,
+        default_encoding: str = "utf-8-sig",
+        engines: Iterable[Engine] = ENGINES,
+    ) -> None:
+        self.columns = tuple(columns) if columns is not None else None
+        self.chunksize = chunksize
+        self.default_encoding = default_encoding
+        self.engines: tuple[Engine, ...] = tuple(
+            engine for engine in engines
+            if engine != "pyarrow" or pa_csv is not None
+        )
+
+    def detect(self, source: Path | BinaryIO) -> SourceFormat:
+        """Detects the format of a file, or of a stream from its current position."""
+        if isinstance(source, Path):
+            with open(source, "rb") as f:
+                sample = f.read(_SAMPLE_SIZE)
+        else:
+            sample = source.read(_SAMPLE_SIZE)
+        return detect_format(sample, self.default_encoding)
+
+    def read(self, source: Path | BinaryIO, fmt: SourceFormat | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Yields string-typed chunks, falling back to slower engines if one fails upfront.
+        In-memory sources (e.g. pre-filtered buffers) must come with their format.
+        """
+        if fmt is None:
+            if not isinstance(source, Path):
+                raise ValueError("A SourceFormat is required to read from a stream")
+            fmt = self.detect(source)
+
+        name = source.name if isinstance(source, Path) else getattr(source, "name", "<stream>")
+        usecols = self._resolve_usecols(fmt)
+        if not usecols:
+            logger.debug(f"None of the requested columns found in {name}")
+            return
+
+        for engine in self.engines:
+            produced = False
+            try:
+                if not isinstance(source, Path):
+                    source.seek(0)
+                for chunk in self._read_with_engine(engine, source, fmt, usecols):
+                    produced = True
+                    yield self._normalize_chunk(chunk)
+                return
+            except Exception as e:
+                if produced:
+                    raise
+                logger.warning(f"Engine '{engine}' failed on {name}, falling back: {e}")
+
+        raise ValueError(f"No CSV engine could parse {name}")
+
+    def _resolve_usecols(self, fmt: SourceFormat) -> list[str]:
+        if self.columns is None:
+            return list(fmt.columns)
+        return [col for col in fmt.columns if normalize_column(col) in self.columns]
+
+    def _normalize_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk.columns = [normalize_column(c) for c in chunk.columns]
+        if self.columns is not None:
+            chunk = chunk[[col for col in self.columns if col in chunk.columns]]
+        return chunk
+
+    def _read_with_engine(
+        self,
+        engine: Engine,
+        source: Path | BinaryIO,
+        fmt: SourceFormat,
+        usecols: list[str],
+    ) -> Iterator[pd.DataFrame]:
+        if engine == "pyarrow":
+            yield from self._read_with_pyarrow(source, fmt, usecols)
+            return
+
+        yield from pd.read_csv(
+            source,
+            sep=fmt.delimiter,
+            encoding=fmt.encoding,
+            engine=engine,
+            usecols=usecols,
+            chunksize=self.chunksize,
+            dtype=str,
+            on_bad_lines="skip",
+        )
+
+    @staticmethod
+    def _read_with_pyarrow(source: Path | BinaryIO, fmt: SourceFormat, usecols: list[str]) -> Iterator[pd.DataFrame]:
+        assert pa is not None and pa_csv is not None
+        # pyarrow strips the BOM by itself and only knows plain codec names
+        encoding = "utf8" if fmt.encoding in ("utf-8", "utf-8-sig") else fmt.encoding
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(encoding=encoding, block_size=_PYARROW_BLOCK_SIZE),
+            parse_options=pa_csv.ParseOptions(
+                delimiter=fmt.delimiter,
+                invalid_row_handler=lambda _row: "skip",
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=usecols,
+                column_types={col: pa.string() for col in usecols},
+                strings_can_be_null=True,
+            ),
+        )
+        for batch in reader:
+            yield batch.to_pandas()
@@ -1,8 +1,9 @@
 from typing import override
 from .base_processor import BaseProcessor
+from .source_file import SourceFile
 from pathlib import Path
 import logging
-import pandas as pd
+from typing import Iterable, TextIO
 
 logger = logging.getLogger(__name__)
 
@@ -10,36 +11,43 @@ logger = logging.getLogger(__name__)
 class TxtProcessor(BaseProcessor):
     """Processador para arquivos TXT da ANS (delimitados por ';')."""
 
-    def __init__(self, output_file: Path) -> None:
-        super().__init__(output_file, target_extension=".txt")
-
-    def process(self, file_path: Path) -> bool:
-        """Processa um arquivo TXT em chunks, filtrando e salvando apenas o Grupo 41."""
-        if not self._check_extension(file_path):
+    def __init__(
+        self,
+        output_file: Path,
+        account_prefixes: Iterable[str] = ("41",),
+        passthrough: bool = False,
+    ) -> None:
+        super().__init__(
+            output_file,
+            target_extension=".txt",
+            default_encoding="latin1",
+            account_prefixes=account_prefixes,
+            passthrough=passthrough,
+        )
+
+    @override
+    def process_with_stream(
+        self,
+        source: SourceFile | Path,
+        output_stream: TextIO,
+        write_header: bool
+    ) -> bool:
+        """
+        Filtra o Grupo 41 e escreve no stream fornecido, chunk a chunk.
+        As linhas são filtradas nos bytes latin1 e só os lotes selecionados são
+        decodificados; o stream de saída recebe o texto já em UTF-8.
+        Com passthrough, as linhas selecionadas são copiadas sem passar pelo pandas.
+        """
+        if not self._check_extension(source):
             return False
 
         any_saved = False
-        try:
-            reader = pd.read_csv(
-                file_path,
-                sep=";",
-                encoding="latin1",
-                chunksize=150_000,
-                dtype=str,
-                on_bad_lines="skip",  
-                engine="python",     
-            )
-
-            for chunk in reader:
-                chunk.columns = [col.upper().strip() for col in chunk.columns]
-
-                filtered_df = self._extract_target_rows(chunk)
-
-                if not filtered_df.empty:
-                    any_saved = True
-
-            return any_saved
-
-        except Exception as e:
-            logger.error(f"Error during the processing of TXT {file_path.name}: {e}")
-            return False
+        if self.passthrough:
+            copied = self._copy_target_lines(source, output_stream, write_header)
+            if copied is not None:
+                return copied
+        for filtered_df in self._iter_target_chunks(source):
+            self._save_chunk_to_stream(filtered_df, output_stream, write_header)
+            write_header = False
+            any_saved = True
+        return any_saved
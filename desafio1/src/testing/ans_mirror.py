@@ -0,0 +1,311 @@
+"""
+Local stand-in for dadosabertos.ans.gov.br, for crawler/downloader tests and
+benchmarks without network. Serves a fixture directory tree the way the ANS
+Apache server does: directories as 'Index of' pages (YYYY/ folders, zip files),
+files with Range (and If-Range), ETag and Last-Modified support. Faults can be injected:
+- latency: seconds added before every response;
+- bandwidth: bytes/s cap per connection;
+- link_bandwidth: bytes/s cap shared by all connections, like a client's link;
+- drop_rate: share of file transfers cut at a random point (seeded);
+- drop_after: one-shot cut of a given path after N bytes.
+"""
+import html
+import random
+import shutil
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path, PurePosixPath
+from urllib.parse import quote, unquote, urlsplit
+
+ACCOUNTING_PATH = "FTP/PDA/demonstracoes_contabeis/"
+CADOP_PATH = "FTP/PDA/operadoras_de_plano_de_saude_ativas/"
+
+_SEND_BLOCK = 64 * 1024
+
+
+def build_mirror_tree(dataset_dir: Path, root: Path) -> None:
+    """
+    Lays out a src.testing.synthetic_ans dataset like the ANS site:
+    quarter ZIPs under demonstracoes_contabeis/YYYY/, the CADOP report under
+    operadoras_de_plano_de_saude_ativas/. Files are linked, or copied where
+    links are not available.
+    """
+    for path in sorted(dataset_dir.iterdir()):
+        if path.suffix == ".zip":
+            year = path.stem.split("T")[-1]
+            target = root / ACCOUNTING_PATH / year / path.name
+        elif path.name.startswith("Relatorio_cadop"):
+            target = root / CADOP_PATH / path.name
+        else:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            target.symlink_to(path.resolve())
+        except OSError:
+            shutil.copy2(path, target)
+
+
+class AnsMirror:
+    """
+    The server runs in a background thread while the mirror is open:
+
+        with AnsMirror(root, latency=0.05) as mirror:
+            AccountingCrawler(mirror.url(ACCOUNTING_PATH)).get_urls()
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        latency: float = 0.0,
+        bandwidth: float | None = None,
+        drop_rate: float = 0.0,
+        seed: int = 0,
+        link_bandwidth: float | None = None,
+    ) -> None:
+        self.root = root
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.link_bandwidth = link_bandwidth
+        self.drop_rate = drop_rate
+        self.drop_after: dict[str, int] = {}  # URL path -> bytes sent before the connection is cut (once)
+        self.requests = 0
+        self.drops = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._link_free_at = 0.0
+        self._server: ThreadingHTTPServer | None = None
+
+    def start(self) -> "AnsMirror":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _MirrorHandler)
+        self._server.daemon_threads = True
+        self._server.mirror = self  # type: ignore[attr-defined]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def url(self, path: str = "") -> str:
+        assert self._server is not None, "the mirror is not running"
+        return f"http://127.0.0.1:{self._server.server_address[1]}/{path}"
+
+    def __enter__(self) -> "AnsMirror":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _resolve(self, url_path: str) -> Path | None:
+        parts = PurePosixPath(unquote(url_path)).parts[1:]
+        if ".." in parts:
+            return None
+        path = self.root.joinpath(*parts)
+        return path if path.exists() else None
+
+    def _cut_point(self, url_path: str, length: int) -> int | None:
+        """Where to drop this transfer, if it is to be dropped."""
+        with self._lock:
+            cut = self.drop_after.pop(url_path, None)
+            if cut is None and length and self._random.random() < self.drop_rate:
+                cut = self._random.randrange(length)
+            if cut is not None:
+                self.drops += 1
+            return cut
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def _link_delay(self, size: int) -> float:
+        """Seconds to wait before sending size more bytes through the shared link."""
+        if not self.link_bandwidth:
+            return 0.0
+        with self._lock:
+            now = time.perf_counter()
+            start = max(now, self._link_free_at)
+            self._link_free_at = start + size / self.link_bandwidth
+            return self._link_free_at - now
+
+    def _count_sent(self, size: int) -> None:
+        with self._lock:
+            self.bytes_sent += size
+
+
+def _index_page(url_path: str, directory: Path) -> bytes:
+    """An Apache 'Index of' page, the layout the ANS crawlers parse."""
+    title = html.escape(f"Index of {unquote(url_path).rstrip('/') or '/'}")
+    rows = []
+    if url_path != "/":
+        parent = str(PurePosixPath(url_path).parent).rstrip("/") + "/"
+        rows.append(
+            f'<tr><td valign="top"><img src="/icons/back.gif" alt="[PARENTDIR]"></td>'
+            f'<td><a href="{parent}">Parent Directory</a></td><td>&nbsp;</td><td align="right">  - </td><td>&nbsp;</td></tr>'
+        )
+    for entry in sorted(directory.iterdir(), key=lambda item: item.name):
+        stat = entry.stat()
+        is_dir = entry.is_dir()
+        name = entry.name + ("/" if is_dir else "")
+        modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(stat.st_mtime))
+        size = "  - " if is_dir else _human_size(stat.st_size)
+        icon = '<img src="/icons/folder.gif" alt="[DIR]">' if is_dir else '<img src="/icons/compressed.gif" alt="[   ]">'
+        rows.append(
+            f'<tr><td valign="top">{icon}</td><td><a href="{quote(name)}">{html.escape(name)}</a></td>'
+            f'<td align="right">{modified}  </td><td align="right">{size}</td><td>&nbsp;</td></tr>'
+        )
+    page = (
+        '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">\n'
+        f"<html>\n <head>\n  <title>{title}</title>\n </head>\n <body>\n<h1>{title}</h1>\n  <table>\n"
+        '   <tr><th valign="top"><img src="/icons/blank.gif" alt="[ICO]"></th><th><a href="?C=N;O=D">Name</a></th>'
+        '<th><a href="?C=M;O=A">Last modified</a></th><th><a href="?C=S;O=A">Size</a></th>'
+        '<th><a href="?C=D;O=A">Description</a></th></tr>\n'
+        '   <tr><th colspan="5"><hr></th></tr>\n'
+        + "\n".join(rows)
+        + '\n   <tr><th colspan="5"><hr></th></tr>\n</table>\n</body></html>\n'
+    )
+    return page.encode("utf-8")
+
+
+def _human_size(size: int) -> str:
+    """Apache's short sizes: 512, 4.0K, 38M."""
+    value = float(size)
+    for unit in ("", "K", "M", "G"):
+        if value < 1024 or unit == "G":
+            break
+        value /= 1024
+    if not unit:
+        return str(size)
+    return f"{value:.1f}{unit}" if value < 10 else f"{value:.0f}{unit}"
+
+
+class _MirrorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    @property
+    def mirror(self) -> AnsMirror:
+        return self.server.mirror  # type: ignore[attr-defined]
+
+    def _serve(self, send_body: bool) -> None:
+        self.mirror._count_request()
+        time.sleep(self.mirror.latency)
+        url_path = urlsplit(self.path).path
+        path = self.mirror._resolve(url_path)
+        if path is None:
+            self.send_error(404)
+            return
+
+        if path.is_dir():
+            if not url_path.endswith("/"):
+                self.send_response(301)
+                self.send_header("Location", url_path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send_bytes(_index_page(url_path, path), "text/html;charset=UTF-8", send_body)
+            return
+
+        self._send_file(url_path, path, send_body)
+
+    def _send_bytes(self, body: bytes, content_type: str, send_body: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_file(self, url_path: str, path: Path, send_body: bool) -> None:
+        stat = path.stat()
+        size = stat.st_size
+        etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+        if self._not_modified(etag, stat.st_mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if if_range is not None and if_range not in (etag, last_modified):
+            range_header = None  # the client's partial copy is stale: send the whole file
+        if range_header and range_header.startswith("bytes="):
+            first, _, last = range_header.removeprefix("bytes=").partition("-")
+            start = int(first or 0)
+            end = min(int(last), size - 1) if last else size - 1
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        length = end - start + 1
+        self.send_header("Content-Type", "application/zip" if path.suffix == ".zip" else "text/csv")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        if not send_body:
+            return
+
+        cut = self.mirror._cut_point(url_path, length)
+        self._stream(path, start, length, cut)
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in (tag.strip() for tag in if_none_match.split(","))
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _stream(self, path: Path, start: int, length: int, cut: int | None) -> None:
+        """Sends length bytes from start, throttled to the bandwidth caps and cut at `cut`."""
+        bandwidth = self.mirror.bandwidth
+        limit = length if cut is None else cut
+        sent = 0
+        began = time.perf_counter()
+        with open(path, "rb") as source:
+            source.seek(start)
+            while sent < limit:
+                block = source.read(min(_SEND_BLOCK, limit - sent))
+                if not block:
+                    break
+                time.sleep(self.mirror._link_delay(len(block)))
+                self.wfile.write(block)
+                sent += len(block)
+                if bandwidth:
+                    ahead = sent / bandwidth - (time.perf_counter() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        self.mirror._count_sent(sent)
+
+        if cut is not None:
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
@@ -0,0 +1,32 @@
+"""
+Reference results recomputed straight from the Grupo 41 detail rows, for checking
+the ExpenseCube rollups in tests and benchmarks.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from ..transformation.accounting_transformer import AccountingProcessor
+from ..utils.frame_io import read_frame
+from ..utils.schema import ACCOUNTING_DTYPES, to_centavos, to_int_codes
+
+
+def load_detail(quarter_files: list[Path], operators: pd.DataFrame) -> pd.DataFrame:
+    """The rescan: every Grupo 41 row with its expense and operator attributes."""
+    frames = []
+    for quarter_file in quarter_files:
+        df = AccountingProcessor.transform(read_frame(quarter_file, dtype=ACCOUNTING_DTYPES))
+        expense = (to_centavos(df["VL_SALDO_FINAL"]) - to_centavos(df["VL_SALDO_INICIAL"])).astype("float64") / 100
+        frames.append(df[["CD_CONTA_CONTABIL", "Ano", "Trimestre"]].assign(
+            REG_ANS=to_int_codes(df["REG_ANS"]), ValorDespesas=expense
+        ).dropna(subset=["ValorDespesas"]))
+    detail = pd.concat(frames, ignore_index=True)
+    return detail.merge(operators, left_on="REG_ANS", right_index=True, how="left")
+
+
+def detail_rollup(detail: pd.DataFrame, by: list[str], account_digits: int | None) -> pd.DataFrame:
+    """The plain groupby a cube rollup must match: sum, count, mean and std per group."""
+    if account_digits is not None:
+        detail = detail.assign(CD_CONTA_CONTABIL=detail["CD_CONTA_CONTABIL"].astype("str").str[:account_digits])
+    grouped = detail.groupby(by, dropna=False, observed=True)["ValorDespesas"]
+    return grouped.agg(["sum", "count", "mean", "std"]).reset_index()
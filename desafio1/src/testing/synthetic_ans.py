@@ -0,0 +1,246 @@
+"""
+Reproducible synthetic ANS dataset, shaped like what the pipelines download:
+- one ZIP per quarter ('1T2025.zip'), holding either a UTF-8 '.csv' with quoted
+  fields or a latin1 '.txt' with CRLF line endings;
+- Relatorio_cadop.csv covering most reporting operators, with some inactive
+  ones missing, CNPJs shared by two registrations and invalid check digits;
+- manifest.json with the rows and bytes of every file.
+
+scale=1 is about the size of a recent real quarter; the number of operators
+grows with the scale too. The same seed and arguments always give the same bytes.
+
+Usage (from desafio1/):
+    python -m src.testing.synthetic_ans --out /tmp/ans_1x --scale 1
+    python -m src.testing.synthetic_ans --out /tmp/ans_10x --scale 10 --txt 2T2025 3T2025
+"""
+import argparse
+import csv
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Rows of one quarter and reporting operators at scale=1
+REAL_QUARTER_ROWS = 2_000_000
+REAL_OPERATORS = 1_100
+
+ACCOUNTING_COLUMNS = ["DATA", "REG_ANS", "CD_CONTA_CONTABIL", "DESCRICAO", "VL_SALDO_INICIAL", "VL_SALDO_FINAL"]
+CADOP_COLUMNS = [
+    "REGISTRO_OPERADORA", "CNPJ", "Razao_Social", "Nome_Fantasia", "Modalidade",
+    "Logradouro", "Cidade", "UF", "CEP", "Data_Registro_ANS",
+]
+
+_CHUNK_ROWS = 500_000
+_FIRST_REGISTER = 300_000
+
+# Account groups and row weights: about 12% of the rows fall under Grupo 41
+_ACCOUNT_GROUPS = {
+    "1": ("ATIVO CIRCULANTE", 0.22),
+    "12": ("APLICAÇÕES FINANCEIRAS", 0.08),
+    "2": ("PASSIVO CIRCULANTE", 0.18),
+    "23": ("PROVISÕES TÉCNICAS DE OPERAÇÕES DE ASSISTÊNCIA À SAÚDE", 0.07),
+    "3": ("CONTRAPRESTAÇÕES EFETIVAS DE PLANO DE ASSISTÊNCIA À SAÚDE", 0.13),
+    "41": ("EVENTOS INDENIZÁVEIS LÍQUIDOS / SINISTROS RETIDOS", 0.12),
+    "43": ("DESPESAS DE COMERCIALIZAÇÃO", 0.06),
+    "46": ("DESPESAS ADMINISTRATIVAS", 0.09),
+    "6": ("RESULTADO FINANCEIRO LÍQUIDO", 0.05),
+}
+_ACCOUNTS_PER_GROUP = 120
+
+_MODALIDADES = ["Medicina de Grupo", "Cooperativa Médica", "Odontologia de Grupo", "Autogestão", "Seguradora Especializada em Saúde", "Filantropia"]
+_UFS = ["SP", "RJ", "MG", "RS", "PR", "SC", "BA", "PE", "GO", "CE", "DF", "ES", "PA", "MT", "MS"]
+_CITIES = ["SÃO PAULO", "RIO DE JANEIRO", "BELO HORIZONTE", "PORTO ALEGRE", "CURITIBA", "FLORIANÓPOLIS", "SALVADOR", "RECIFE"]
+
+
+def quarter_start(quarter: str) -> str:
+    """'2T2025' → '2025-04-01', the DATA of every row of that quarter."""
+    number, year = quarter.split("T")
+    return f"{year}-{3 * (int(number) - 1) + 1:02d}-01"
+
+
+def cnpj_check_digits(bases: np.ndarray) -> np.ndarray:
+    """Appends the two check digits to (n, 12) digit arrays; returns (n, 14)."""
+    digits = bases
+    for weights in ([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]):
+        remainder = (digits * np.array(weights)).sum(axis=1) % 11
+        digit = np.where(remainder < 2, 0, 11 - remainder)
+        digits = np.column_stack([digits, digit])
+    return digits
+
+
+class SyntheticAnsDataset:
+    """Generates the dataset for one scale and seed; see the module docstring."""
+
+    def __init__(
+        self,
+        scale: float = 1.0,
+        quarters: tuple[str, ...] = ("1T2025", "2T2025", "3T2025"),
+        txt_quarters: tuple[str, ...] = ("2T2025",),
+        seed: int = 42,
+    ) -> None:
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        self.scale = scale
+        self.quarters = quarters
+        self.txt_quarters = set(txt_quarters)
+        self.seed = seed
+        self.rows_per_quarter = round(REAL_QUARTER_ROWS * scale)
+        self.operators = max(50, round(REAL_OPERATORS * scale))
+        self.registers = np.arange(_FIRST_REGISTER, _FIRST_REGISTER + self.operators)
+        self.accounts, self.descriptions, self.account_weights = self._chart_of_accounts()
+
+    def write(self, out_dir: Path) -> dict:
+        """Writes every quarter ZIP, Relatorio_cadop.csv and manifest.json into out_dir."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {"scale": self.scale, "seed": self.seed, "files": []}
+        for index, quarter in enumerate(self.quarters):
+            manifest["files"].append(self.write_quarter(out_dir, quarter, index))
+
+        cadop = self.cadop()
+        cadop_file = out_dir / "Relatorio_cadop.csv"
+        cadop.to_csv(cadop_file, sep=";", index=False, encoding="utf-8-sig")
+        manifest["cadop"] = {"name": cadop_file.name, "rows": len(cadop), "bytes": cadop_file.stat().st_size}
+        manifest["rows"] = sum(entry["rows"] for entry in manifest["files"])
+        manifest["bytes"] = sum(entry["bytes"] for entry in manifest["files"])
+
+        (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        return manifest
+
+    def write_quarter(self, out_dir: Path, quarter: str, index: int) -> dict:
+        txt = quarter in self.txt_quarters
+        member = f"{quarter}.{'txt' if txt else 'csv'}"
+        zip_path = out_dir / f"{quarter}.zip"
+        options = (
+            {"encoding": "latin1", "quoting": csv.QUOTE_NONE, "lineterminator": "\r\n"} if txt
+            else {"encoding": "utf-8-sig", "quoting": csv.QUOTE_ALL, "lineterminator": "\n"}
+        )
+
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            # A fixed timestamp keeps the archive bytes reproducible
+            year, month, day = map(int, quarter_start(quarter).split("-"))
+            info = zipfile.ZipInfo(member, date_time=(year, month, day, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, "w", force_zip64=True) as raw_member:
+                text = io.TextIOWrapper(raw_member, encoding=options["encoding"], newline="")
+                for chunk_index, start in enumerate(range(0, self.rows_per_quarter, _CHUNK_ROWS)):
+                    rows = min(_CHUNK_ROWS, self.rows_per_quarter - start)
+                    self._accounting_chunk(quarter, rows, (self.seed, index, chunk_index)).to_csv(
+                        text,
+                        sep=";",
+                        index=False,
+                        header=start == 0,
+                        quoting=options["quoting"],
+                        lineterminator=options["lineterminator"],
+                        float_format="%.2f",
+                    )
+                text.flush()
+                text.detach()
+
+        return {
+            "name": zip_path.name,
+            "member": member,
+            "rows": self.rows_per_quarter,
+            "bytes": info.file_size,
+            "zip_bytes": zip_path.stat().st_size,
+        }
+
+    def cadop(self) -> pd.DataFrame:
+        """
+        Active operators: ~92% of the reporting ones plus some that do not report;
+        ~2% of the CNPJs also appear on an older registration, ~3% have wrong check digits.
+        """
+        rng = np.random.default_rng((self.seed, 10_000))
+        active = self.registers[rng.random(self.operators) < 0.92]
+        extra = np.arange(self.registers[-1] + 1, self.registers[-1] + 1 + self.operators // 10)
+        registers = np.concatenate([active, extra])
+        count = len(registers)
+
+        digits = cnpj_check_digits(rng.integers(0, 10, size=(count, 12)))
+        invalid = rng.random(count) < 0.03
+        digits[invalid, 13] = (digits[invalid, 13] + 1) % 10
+        cnpjs = ["".join(map(str, row)) for row in digits]
+
+        df = pd.DataFrame({
+            "REGISTRO_OPERADORA": registers.astype(str),
+            "CNPJ": cnpjs,
+            "Razao_Social": [f"OPERADORA DE SAÚDE {register} LTDA" for register in registers],
+            "Nome_Fantasia": [f"SAÚDE {register}" for register in registers],
+            "Modalidade": rng.choice(_MODALIDADES, size=count),
+            "Logradouro": "AVENIDA PAULISTA",
+            "Cidade": rng.choice(_CITIES, size=count),
+            "UF": rng.choice(_UFS, size=count, p=self._uf_weights()),
+            "CEP": rng.integers(10**7, 10**8, size=count).astype(str),
+            "Data_Registro_ANS": self._dates(rng, count, "1999-01-01", "2024-12-31"),
+        })
+
+        # An older registration of the same CNPJ, which select_current must discard
+        shared = df.sample(frac=0.02, random_state=self.seed).assign(
+            REGISTRO_OPERADORA=lambda frame: (frame["REGISTRO_OPERADORA"].astype(int) + 500_000).astype(str),
+            Razao_Social=lambda frame: frame["Razao_Social"] + " (ANTIGA)",
+            Data_Registro_ANS="1998-06-30",
+        )
+        return pd.concat([df, shared], ignore_index=True)[CADOP_COLUMNS]
+
+    def _accounting_chunk(self, quarter: str, rows: int, seed: tuple[int, ...]) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        accounts = rng.choice(len(self.accounts), size=rows, p=self.account_weights)
+        initial = np.round(rng.lognormal(11, 2, size=rows) * rng.choice([1, -1], size=rows, p=[0.93, 0.07]), 2)
+        final = np.round(initial * rng.normal(1.05, 0.2, size=rows), 2)
+        # A few blank balances, as in the published files
+        final[rng.random(rows) < 0.001] = np.nan
+        return pd.DataFrame({
+            "DATA": quarter_start(quarter),
+            "REG_ANS": rng.choice(self.registers, size=rows).astype(str),
+            "CD_CONTA_CONTABIL": self.accounts[accounts],
+            "DESCRICAO": self.descriptions[accounts],
+            "VL_SALDO_INICIAL": initial,
+            "VL_SALDO_FINAL": final,
+        }, columns=ACCOUNTING_COLUMNS)
+
+    def _chart_of_accounts(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Distinct account codes under every group, with the group's row weight split among them."""
+        rng = np.random.default_rng((self.seed, 20_000))
+        accounts, descriptions, weights = [], [], []
+        for prefix, (description, weight) in _ACCOUNT_GROUPS.items():
+            lengths = rng.integers(0, 8, size=_ACCOUNTS_PER_GROUP)
+            codes = sorted({prefix + "".join(map(str, rng.integers(0, 10, size=length))) for length in lengths})
+            accounts += codes
+            descriptions += [description] * len(codes)
+            weights += [weight / len(codes)] * len(codes)
+        weights = np.array(weights)
+        return np.array(accounts), np.array(descriptions), weights / weights.sum()
+
+    @staticmethod
+    def _uf_weights() -> np.ndarray:
+        weights = np.linspace(3, 1, len(_UFS))
+        return weights / weights.sum()
+
+    @staticmethod
+    def _dates(rng: np.random.Generator, count: int, start: str, end: str) -> np.ndarray:
+        days = (pd.Timestamp(end) - pd.Timestamp(start)).days
+        offsets = rng.integers(0, days, size=count)
+        return (pd.Timestamp(start) + pd.to_timedelta(offsets, unit="D")).strftime("%Y-%m-%d").to_numpy()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = one real quarter; up to 50")
+    parser.add_argument("--quarters", nargs="+", default=["1T2025", "2T2025", "3T2025"])
+    parser.add_argument("--txt", nargs="*", default=["2T2025"], help="quarters published as latin1 .txt")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dataset = SyntheticAnsDataset(args.scale, tuple(args.quarters), tuple(args.txt), args.seed)
+    manifest = dataset.write(args.out)
+    print(
+        f"{len(manifest['files'])} quarters, {manifest['rows']:,} rows, "
+        f"{manifest['bytes'] / 1024**2:.1f} MB uncompressed; CADOP {manifest['cadop']['rows']:,} rows → {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
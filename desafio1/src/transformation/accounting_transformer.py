@@ -1,31 +1,45 @@
 import pandas as pd
 import logging
 
+from ..utils.dates import parse_dates
+from ..utils.schema import to_money
+
 logger = logging.getLogger(__name__)
 
 
 class AccountingProcessor:
+    """
+    Parses accounting rows into typed columns.
+    Each step returns a new frame built with DataFrame.assign, so untouched columns
+    are shared with the input (Copy-on-Write) instead of being copied.
+    """
+
+    @classmethod
+    def transform(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """parse_dates → extract_period → ensure_numeric_columns as one chain."""
+        return (
+            df.pipe(cls.parse_dates)
+            .pipe(cls.extract_period)
+            .pipe(cls.ensure_numeric_columns)
+        )
+
     @staticmethod
     def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df["DATA"] = pd.to_datetime(df["DATA"], format="mixed", errors="coerce")
-        invalid = df["DATA"].isna().sum()
-        if invalid:
-            logger.warning(f"Invalid data formats was found: {invalid}")
-            df = df.dropna(subset=["DATA"])
+        df = df.assign(DATA=parse_dates(df["DATA"]))
+        invalid = df["DATA"].isna()
+        if invalid.any():
+            logger.warning(f"Invalid data formats was found: {invalid.sum()}")
+            df = df[~invalid]
         return df
 
     @staticmethod
     def extract_period(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df["Ano"] = df["DATA"].dt.year
-        df["Trimestre"] = df["DATA"].dt.quarter
-        return df
+        return df.assign(Ano=df["DATA"].dt.year, Trimestre=df["DATA"].dt.quarter)
 
     @staticmethod
     def ensure_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        for col in ["VL_SALDO_INICIAL", "VL_SALDO_FINAL"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-        return df
+        return df.assign(**{
+            col: to_money(df[col])
+            for col in ["VL_SALDO_INICIAL", "VL_SALDO_FINAL"]
+            if col in df.columns
+        })
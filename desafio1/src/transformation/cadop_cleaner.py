@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-import pandas as pd
 import logging
 from typing import TYPE_CHECKING
 
+from ..utils.cadop_registry import CadopRegistry, select_current
+from ..utils.schema import compact_cadop
+
 if TYPE_CHECKING:
     from pandas import DataFrame
 
 logger = logging.getLogger(__name__)
 
+_REQUIRED_COLUMNS = ["REGISTRO_OPERADORA", "CNPJ", "Razao_Social", "Data_Registro_ANS"]
+
 
 class CadopCleaner:
     """
@@ -19,18 +23,15 @@ class CadopCleaner:
         Returns a DataFrame with:
         - One record per (CNPJ).
         - The most recent Company Name (Razão Social) based on ANS registration date.
+        - Compact dtypes: Int64 REGISTRO_OPERADORA index, categorical CNPJ and Razao_Social.
         """        
-        required_cols = ["REGISTRO_OPERADORA", "CNPJ", "Razao_Social", "Data_Registro_ANS"]
-        df: DataFrame = df_cadop[required_cols].copy()
-
-        df["Data_Registro_ANS"] = pd.to_datetime(
-            df["Data_Registro_ANS"], format="mixed", errors="coerce"
-        )
-        df = df.dropna(subset=["Data_Registro_ANS"])
-
-        df = df.sort_values("Data_Registro_ANS", ascending=False)
+        return self._finalize(select_current(df_cadop[_REQUIRED_COLUMNS]))
 
-        df_unique = df.drop_duplicates(subset=["CNPJ"], keep="first")
+    def load(self, registry: CadopRegistry) -> DataFrame:
+        """Same result as clean(), read from the CADOP registry store instead of the CSV."""
+        return self._finalize(registry.current_operators()[_REQUIRED_COLUMNS])
 
-        logger.info(f"Cleaned CADOP: {len(df_unique)} unique operators by CNPJ")    
-        return df_unique.set_index("REGISTRO_OPERADORA")
+    @staticmethod
+    def _finalize(df_unique: DataFrame) -> DataFrame:
+        logger.info(f"Cleaned CADOP: {len(df_unique)} unique operators by CNPJ")
+        return compact_cadop(df_unique).set_index("REGISTRO_OPERADORA")
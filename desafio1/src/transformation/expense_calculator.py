@@ -1,11 +1,24 @@
 import pandas as pd
 import logging
 
+from ..utils.schema import to_centavos, to_int_codes, with_category
+
 logger = logging.getLogger(__name__)
 
+_ACCOUNTING_COLUMNS = ["REG_ANS", "Ano", "Trimestre", "VL_SALDO_INICIAL", "VL_SALDO_FINAL"]
+
 
 class ExpenseCalculator:
-    """Calculates net expenses and consolidates by period."""
+    """
+    Calculates net expenses and consolidates by period.
+    The join runs on Int64 registration codes and the groupby on the categorical
+    CNPJ/Razao_Social columns of the compact CADOP. With exact_sums, expenses are
+    summed as Int64 centavos and converted back to reais only at the end.
+    """
+
+    def __init__(self, exact_sums: bool = False) -> None:
+        self.exact_sums = exact_sums
+
     def calculate_and_consolidate(
         self,
         df_contabil: pd.DataFrame,
@@ -28,9 +41,13 @@ class ExpenseCalculator:
 
     def _merge_data(self, df_contabil: pd.DataFrame, df_cadop: pd.DataFrame) -> pd.DataFrame:
         """Realiza join e trata operadoras não encontradas."""
-        df_contabil = df_contabil.copy()
-        df_contabil["REG_ANS"] = df_contabil["REG_ANS"].astype(str).str.strip()
-        df_cadop.index = df_cadop.index.astype(str).str.strip()
+        # Only the columns used downstream take part in the join, so it is the only full copy
+        df_contabil = df_contabil[_ACCOUNTING_COLUMNS].assign(
+            REG_ANS=to_int_codes(df_contabil["REG_ANS"])
+        )
+        df_cadop = df_cadop[["CNPJ", "Razao_Social"]].set_axis(
+            pd.Index(to_int_codes(df_cadop.index.to_series()))
+        )
 
         merged = df_contabil.merge(
             df_cadop,
@@ -42,6 +59,8 @@ class ExpenseCalculator:
         missing = merged["CNPJ"].isna()
         if  missing.any():
             logger.warning(f"Operadoras not found: {missing.sum()}")
+            merged["CNPJ"] = with_category(merged["CNPJ"], "00.000.000/0000-00")
+            merged["Razao_Social"] = with_category(merged["Razao_Social"], "NAO_ENCONTRADO")
             merged.loc[missing, "CNPJ"] = "00.000.000/0000-00"
             merged.loc[missing, "Razao_Social"] = "NAO_ENCONTRADO"
 
@@ -49,12 +68,15 @@ class ExpenseCalculator:
 
     def _calculate_expenses(self, df: pd.DataFrame): 
         """Calcula despesa líquida por registro."""
-        df = df.copy()
-        df["ValorDespesas"] = df["VL_SALDO_FINAL"] - df["VL_SALDO_INICIAL"]
+        if self.exact_sums:
+            expenses = to_centavos(df["VL_SALDO_FINAL"]) - to_centavos(df["VL_SALDO_INICIAL"])
+        else:
+            expenses = df["VL_SALDO_FINAL"] - df["VL_SALDO_INICIAL"]
+        df = df.assign(ValorDespesas=expenses)
 
         valid = df["ValorDespesas"].notna()
         logger.info(f"valid registers found: {valid.sum()}/{len(df)}")
-        return df[valid].copy()
+        return df[valid]
 
     def _consolidate_by_period(self, df: pd.DataFrame):
         """
@@ -64,10 +86,13 @@ class ExpenseCalculator:
         grouped = df.groupby(
             ["CNPJ", "Razao_Social", "Ano", "Trimestre"],
             as_index=False,
-            dropna=False
+            dropna=False,
+            observed=True
         ).agg({
             "ValorDespesas": "sum"
         })
+        if self.exact_sums:
+            grouped["ValorDespesas"] = grouped["ValorDespesas"].astype("float64") / 100
 
         result = grouped.rename(columns={"Razao_Social": "RazaoSocial"})
         result = result[["CNPJ", "RazaoSocial", "Trimestre", "Ano", "ValorDespesas"]]
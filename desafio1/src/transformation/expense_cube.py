@@ -0,0 +1,172 @@
+import logging
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .accounting_transformer import AccountingProcessor
+from ..utils.cadop_registry import CadopRegistry
+from ..utils.frame_io import iter_frames, read_frame
+from ..utils.schema import ACCOUNTING_DTYPES, CUBE_DTYPES, compact_cadop, to_centavos, to_int_codes, with_category
+
+logger = logging.getLogger(__name__)
+
+CUBE_KEYS = ["REG_ANS", "CD_CONTA_CONTABIL", "Ano", "Trimestre"]
+CUBE_MEASURES = ["SomaCentavos", "Registros", "SomaQuadrados"]
+# Operator attributes a rollup can group by, besides the cube keys
+OPERATOR_COLUMNS = ["CNPJ", "RazaoSocial", "Modalidade", "UF"]
+
+
+class ExpenseCube:
+    """
+    Pre-aggregated Grupo 41 expenses at the (REG_ANS, CD_CONTA_CONTABIL, Ano, Trimestre) grain.
+    Each cell keeps the exact sum in centavos, the row count and the sum of squares (in reais²)
+    of the expenses (VL_SALDO_FINAL - VL_SALDO_INICIAL). All three are additive, so cubes built
+    per file or per chunk are merged by summing, and any coarser cut (by operator attribute,
+    year, account prefix...) is answered from the cube without rescanning the accounting data.
+    """
+
+    def __init__(self, chunksize: int | None = None) -> None:
+        self.chunksize = chunksize
+
+    def build(self, accounting_file: Path) -> pd.DataFrame:
+        """Cube of one accounting file, whole or in chunks of self.chunksize rows."""
+        if self.chunksize is None:
+            return self.summarize(read_frame(accounting_file, dtype=ACCOUNTING_DTYPES))
+
+        cells: list[pd.DataFrame] = []
+        pending_rows = 0
+        for chunk in iter_frames(accounting_file, self.chunksize, dtype=ACCOUNTING_DTYPES):
+            cells.append(self.summarize(chunk))
+            pending_rows += len(cells[-1])
+            if pending_rows >= self.chunksize:
+                cells = [self.merge(cells)]
+                pending_rows = len(cells[0])
+        return self.merge(cells)
+
+    @staticmethod
+    def summarize(df_contabil: pd.DataFrame) -> pd.DataFrame:
+        """Cube cells of raw accounting rows; rows without a valid date or balance are left out."""
+        df = AccountingProcessor.transform(df_contabil)
+        centavos = to_centavos(df["VL_SALDO_FINAL"]) - to_centavos(df["VL_SALDO_INICIAL"])
+        valid = centavos.notna()
+        reais = centavos[valid].astype("float64") / 100
+
+        cells = df.loc[valid, ["CD_CONTA_CONTABIL", "Ano", "Trimestre"]].assign(
+            REG_ANS=to_int_codes(df.loc[valid, "REG_ANS"]),
+            SomaCentavos=centavos[valid],
+            Registros=1,
+            SomaQuadrados=reais * reais,
+        )
+        return ExpenseCube._sum_cells(cells)
+
+    @staticmethod
+    def merge(cubes: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """Sums cubes cell by cell, e.g. the per-quarter cubes of the incremental consolidation."""
+        cubes = [cube for cube in cubes if not cube.empty]
+        if not cubes:
+            return pd.DataFrame(columns=CUBE_KEYS + CUBE_MEASURES)
+        return ExpenseCube._sum_cells(pd.concat(cubes, ignore_index=True))
+
+    @staticmethod
+    def load(cube_file: Path) -> pd.DataFrame:
+        return read_frame(cube_file, dtype=CUBE_DTYPES)
+
+    @staticmethod
+    def load_operators(cadop_file: Path) -> pd.DataFrame:
+        """Current CADOP record per CNPJ, indexed by Int64 registration code, for rollups."""
+        df_cadop = compact_cadop(CadopRegistry(cadop_file).current_operators())
+        df_cadop = df_cadop.rename(columns={"Razao_Social": "RazaoSocial"})
+        return df_cadop.set_index("REGISTRO_OPERADORA")[OPERATOR_COLUMNS]
+
+    @staticmethod
+    def rollup(
+        cube: pd.DataFrame,
+        by: list[str],
+        operators: pd.DataFrame | None = None,
+        account_digits: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Total, count, mean and sample standard deviation of the expense rows per `by` group.
+        `by` mixes cube keys and, given load_operators(), OPERATOR_COLUMNS; with account_digits,
+        CD_CONTA_CONTABIL is cut to its first digits (e.g. 4 for the sub-accounts of 41).
+        """
+        cells = ExpenseCube._with_attributes(cube, by, operators, account_digits)
+        grouped = cells.groupby(by, as_index=False, dropna=False, observed=True)[CUBE_MEASURES].sum()
+
+        count = grouped["Registros"].astype("float64")
+        total = grouped["SomaCentavos"].astype("float64") / 100
+        # Sample variance from the power sums; clipped at 0 against float cancellation
+        variance = ((grouped["SomaQuadrados"] - total * total / count) / (count - 1)).clip(lower=0)
+
+        return grouped[by].assign(
+            ValorDespesas=total,
+            Registros=grouped["Registros"],
+            MediaDespesas=total / count,
+            DesvioPadraoDespesas=np.sqrt(variance.where(count > 1)),
+        )
+
+    @staticmethod
+    def quarterly_stats(
+        cube: pd.DataFrame,
+        by: list[str],
+        operators: pd.DataFrame | None = None,
+        unit: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Metrics over quarterly totals, the way ExpenseAggregator computes them: the cube is summed
+        per (by, unit, Ano, Trimestre), then each `by` group gets the total, mean, sample standard
+        deviation and number of those quarterly totals. The unit defaults to the operator (CNPJ,
+        as in the consolidated dataset); e.g. by=["RazaoSocial", "UF"] matches the aggregator's cut.
+        """
+        if unit is None:
+            unit = ["CNPJ"]
+        keys = list(dict.fromkeys([*by, *unit, "Ano", "Trimestre"]))
+        quarters = ExpenseCube._with_attributes(cube, keys, operators, None).groupby(
+            keys, as_index=False, dropna=False, observed=True
+        )["SomaCentavos"].sum()
+        quarters["ValorDespesas"] = quarters["SomaCentavos"].astype("float64") / 100
+
+        grouped = quarters.groupby(by, dropna=False, observed=True)["ValorDespesas"]
+        result = grouped.agg(["sum", "mean", "std", "count"]).reset_index()
+        return result.rename(columns={
+            "sum": "TotalDespesas",
+            "mean": "MediaDespesasTrimestral",
+            "std": "DesvioPadraoDespesas",
+            "count": "NumeroTrimestres",
+        })
+
+    @staticmethod
+    def _with_attributes(
+        cube: pd.DataFrame,
+        columns: list[str],
+        operators: pd.DataFrame | None,
+        account_digits: int | None,
+    ) -> pd.DataFrame:
+        """Cube cells with the operator attributes among columns joined on REG_ANS."""
+        unknown = set(columns) - set(CUBE_KEYS) - set(OPERATOR_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot roll up by: {sorted(unknown)}")
+
+        if account_digits is not None:
+            cube = cube.assign(CD_CONTA_CONTABIL=cube["CD_CONTA_CONTABIL"].astype("str").str[:account_digits])
+
+        attributes = [col for col in OPERATOR_COLUMNS if col in columns]
+        if not attributes:
+            return cube
+        if operators is None:
+            raise ValueError(f"Rolling up by {attributes} requires the CADOP operators")
+
+        cells = cube.merge(operators[attributes], left_on="REG_ANS", right_index=True, how="left")
+        # Same placeholders as the consolidation for operators missing from CADOP
+        missing = ~cells["REG_ANS"].isin(operators.index)
+        for col, placeholder in (("CNPJ", "00.000.000/0000-00"), ("RazaoSocial", "NAO_ENCONTRADO")):
+            if col in attributes and missing.any():
+                cells[col] = with_category(cells[col], placeholder)
+                cells.loc[missing, col] = placeholder
+        return cells
+
+    @staticmethod
+    def _sum_cells(cells: pd.DataFrame) -> pd.DataFrame:
+        return cells.groupby(CUBE_KEYS, as_index=False, dropna=False, observed=True)[CUBE_MEASURES].sum()
@@ -5,76 +5,240 @@ import logging
 from .cadop_cleaner import CadopCleaner
 from .accounting_transformer import AccountingProcessor
 from .expense_calculator import ExpenseCalculator
+from .expense_cube import ExpenseCube
 from .output_manager import OutputManager
+from ..utils.artifact_cache import ArtifactCache, file_fingerprint
+from ..utils.cadop_registry import CadopRegistry
+from ..utils.formatting import format_brl
+from ..utils.frame_io import intermediate_suffix, iter_frames, read_frame, write_frame
+from ..utils.instrumentation import RunReport
+from ..utils.schema import ACCOUNTING_DTYPES, CONSOLIDATED_DTYPES, to_centavos
 
 logger = logging.getLogger(__name__)
 
+_GROUP_KEYS = ["CNPJ", "RazaoSocial", "Trimestre", "Ano"]
+
 
 class ExpenseConsolidationPipeline:
-    
+    """
+    Consolidates Grupo 41 accounting rows into expenses per operator and quarter.
+    With intermediate_format='parquet', cached aggregates are stored as Parquet and a
+    typed copy of the final dataset is written next to the BR-formatted CSV,
+    for downstream stages to load without re-parsing formatted strings.
+    With a chunksize, accounting files are consolidated chunk by chunk and only the
+    partial sums per group are kept, so memory no longer grows with the input size.
+    With exact_sums, expenses are summed as integer centavos instead of floats.
+    With a RunReport, each accounting file, the CADOP load, the merge and the export
+    are recorded as stages, with their row counts.
+    Given a cube_file, the ExpenseCube of the accounting rows is saved there as well,
+    for later rollups that do not rescan the accounting data.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        intermediate_format: str = "csv",
+        chunksize: int | None = None,
+        exact_sums: bool = False,
+        report: RunReport | None = None
+    ) -> None:
+        if chunksize is not None and chunksize <= 0:
+            raise ValueError("chunksize must be a positive number of rows")
+        self.cache_dir = cache_dir
+        self.intermediate_format = intermediate_format
+        self.intermediate_suffix = intermediate_suffix(intermediate_format)
+        self.chunksize = chunksize
+        self.exact_sums = exact_sums
+        self.report = report or RunReport(enabled=False)
+
     def _apply_brazilian_formatting(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Aplica formatação brasileira às colunas numéricas monetárias.
         Converte valores float para string no formato BR (ex: 1351.00 → "1.351,00")
         """
-        df = df.copy()
-        
-        if "ValorDespesas" in df.columns:
-            df["ValorDespesas"] = pd.to_numeric(df["ValorDespesas"], errors="coerce")
-            
-            df["ValorDespesas"] = df["ValorDespesas"].apply(
-                lambda x: (
-                    f"{abs(x):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                    if pd.notna(x) else ""
-                )
-            ).apply(lambda x: f"-{x}" if x.startswith("-") else x)  
-        return df
+        if "ValorDespesas" not in df.columns:
+            return df
+        return df.assign(ValorDespesas=format_brl(df["ValorDespesas"]))
 
     def run(
         self,
         accounting_file: Path,
         cadop_file: Path,
-        output_file: Path
+        output_file: Path,
+        cube_file: Path | None = None
     ) -> None:
         """Execute the complete consolidation pipeline."""
         logger.info("Starting consolidation...")
 
-        # Load data
-        df_contabil = pd.read_csv(
-            accounting_file,
-            sep=";",
-            encoding="utf-8-sig",
-            dtype=str
-        )
-        df_cadop = pd.read_csv(
-            cadop_file,
-            sep=";",
-            encoding="utf-8-sig",
-            dtype=str,
-            on_bad_lines="skip",
-            skip_blank_lines=True
-        )
-        
-        logger.info(f"Data loaded: {len(df_contabil)} accounting, {len(df_cadop)} CADOP")
-
-        cadop_cleaner = CadopCleaner()
-        df_cadop_clean = cadop_cleaner.clean(df_cadop)
-
-        
-        acc_processor = AccountingProcessor()
-        df_contabil = acc_processor.parse_dates(df_contabil)
-        df_contabil = acc_processor.extract_period(df_contabil)
-        df_contabil = acc_processor.ensure_numeric_columns(df_contabil)
-
-        
-        calculator = ExpenseCalculator()
-        df_final = calculator.calculate_and_consolidate(df_contabil, df_cadop_clean)
-
-        df_final = self._apply_brazilian_formatting(df_final)
-
-        output_file.parent.mkdir(exist_ok=True)
-        output_manager = OutputManager(output_file)
-        output_manager.export_to_csv(df_final)
-        output_manager.compress_to_zip()
+        df_cadop_clean = self._load_cadop(cadop_file)
+        logger.info(f"CADOP loaded: {len(df_cadop_clean)} operators")
+
+        df_final = self._consolidate_file(accounting_file, df_cadop_clean)
+        self._export(df_final, output_file)
+        if cube_file is not None:
+            self._save_cube([self._build_cube(accounting_file)], cube_file)
 
         logger.info("Consolidation completed successfully!")
+
+    def run_incremental(
+        self,
+        quarter_files: list[Path],
+        cadop_file: Path,
+        output_file: Path,
+        cube_file: Path | None = None
+    ) -> None:
+        """
+        Consolidates per-quarter accounting files, reusing the cached aggregate of
+        every quarter whose file (and the CADOP report) did not change.
+        Sums are additive, so merging per-quarter aggregates equals aggregating everything.
+        """
+        if self.cache_dir is None:
+            raise ValueError("run_incremental requires a cache_dir")
+
+        logger.info("Starting incremental consolidation...")
+        cache = ArtifactCache(self.cache_dir, "aggregates", suffix=self.intermediate_suffix)
+        cadop_key = file_fingerprint(cadop_file)
+        mode_key = ["centavos"] if self.exact_sums else []
+        aggregate_files = [
+            cache.path_for(file_fingerprint(quarter_file), cadop_key, *mode_key)
+            for quarter_file in quarter_files
+        ]
+
+        df_cadop_clean: pd.DataFrame | None = None
+        rebuilt = 0
+        for quarter_file, aggregate_file in zip(quarter_files, aggregate_files):
+            if aggregate_file.exists():
+                continue
+            if df_cadop_clean is None:
+                df_cadop_clean = self._load_cadop(cadop_file)
+            df_quarter = self._consolidate_file(quarter_file, df_cadop_clean)
+            write_frame(df_quarter, aggregate_file)
+            rebuilt += 1
+
+        cache.prune(keep=set(aggregate_files))
+        logger.info(f"Quarters aggregated: {rebuilt} rebuilt, {len(quarter_files) - rebuilt} reused from cache")
+
+        df_final = self._merge_aggregates(aggregate_files)
+        self._export(df_final, output_file)
+        if cube_file is not None:
+            self._save_cube(self._quarter_cubes(quarter_files), cube_file)
+
+        logger.info("Consolidation completed successfully!")
+
+    def _consolidate_file(self, accounting_file: Path, df_cadop_clean: pd.DataFrame) -> pd.DataFrame:
+        """Consolidates one accounting file, whole or in chunks of self.chunksize rows."""
+        with self.report.stage("consolidate", file=accounting_file.name) as record:
+            record.bytes_read = accounting_file.stat().st_size
+            if self.chunksize is None:
+                df_contabil = self._load_accounting(accounting_file)
+                logger.info(f"Accounting loaded: {len(df_contabil)} rows")
+                record.rows_in = len(df_contabil)
+                df_final = self._consolidate(df_contabil, df_cadop_clean)
+            else:
+                record.rows_in, df_final = self._consolidate_chunks(accounting_file, df_cadop_clean)
+            record.rows_out = len(df_final)
+        return df_final
+
+    def _consolidate_chunks(self, accounting_file: Path, df_cadop_clean: pd.DataFrame) -> tuple[int, pd.DataFrame]:
+        """Consolidates chunk by chunk; returns the number of rows read and the summed result."""
+        assert self.chunksize is not None
+
+        partials: list[pd.DataFrame] = []
+        pending_rows = 0
+        total_rows = 0
+        for chunk in iter_frames(accounting_file, self.chunksize, dtype=ACCOUNTING_DTYPES):
+            total_rows += len(chunk)
+            partial = self._consolidate(chunk, df_cadop_clean)
+            partials.append(partial)
+            pending_rows += len(partial)
+            # Fold the partial sums whenever they add up to a chunk, to keep them bounded too
+            if pending_rows >= self.chunksize:
+                partials = [self._sum_aggregates(partials)]
+                pending_rows = len(partials[0])
+
+        logger.info(f"Accounting consolidated in chunks of {self.chunksize:,} rows: {total_rows:,} rows")
+        return total_rows, self._sum_aggregates(partials)
+
+    def _quarter_cubes(self, quarter_files: list[Path]) -> list[pd.DataFrame]:
+        """Per-quarter cubes, cached by quarter file only: they do not depend on CADOP."""
+        assert self.cache_dir is not None
+        cache = ArtifactCache(self.cache_dir, "cubes", suffix=self.intermediate_suffix)
+        cube_files = [cache.path_for(file_fingerprint(quarter_file)) for quarter_file in quarter_files]
+
+        for quarter_file, cube_file in zip(quarter_files, cube_files):
+            if not cube_file.exists():
+                write_frame(self._build_cube(quarter_file), cube_file)
+        cache.prune(keep=set(cube_files))
+        return [ExpenseCube.load(cube_file) for cube_file in cube_files]
+
+    def _build_cube(self, accounting_file: Path) -> pd.DataFrame:
+        with self.report.stage("build_cube", file=accounting_file.name) as record:
+            cube = ExpenseCube(self.chunksize).build(accounting_file)
+            record.rows_out = len(cube)
+        return cube
+
+    def _save_cube(self, cubes: list[pd.DataFrame], cube_file: Path) -> None:
+        with self.report.stage("save_cube", file=cube_file.name) as record:
+            record.rows_in = sum(len(cube) for cube in cubes)
+            cube = ExpenseCube.merge(cubes)
+            write_frame(cube, cube_file)
+            record.rows_out = len(cube)
+        logger.info(f"Expense cube saved: {cube_file} ({len(cube):,} cells)")
+
+    @staticmethod
+    def _load_accounting(accounting_file: Path) -> pd.DataFrame:
+        return read_frame(accounting_file, dtype=ACCOUNTING_DTYPES)
+
+    def _load_cadop(self, cadop_file: Path) -> pd.DataFrame:
+        with self.report.stage("load_cadop", file=cadop_file.name) as record:
+            df_cadop_clean = CadopCleaner().load(CadopRegistry(cadop_file))
+            record.rows_out = len(df_cadop_clean)
+        return df_cadop_clean
+
+    def _consolidate(self, df_contabil: pd.DataFrame, df_cadop_clean: pd.DataFrame) -> pd.DataFrame:
+        df_contabil = AccountingProcessor.transform(df_contabil)
+
+        calculator = ExpenseCalculator(exact_sums=self.exact_sums)
+        return calculator.calculate_and_consolidate(df_contabil, df_cadop_clean)
+
+    def _merge_aggregates(self, aggregate_files: list[Path]) -> pd.DataFrame:
+        """Re-sums per-quarter aggregates, in case one period spans several files."""
+        with self.report.stage("merge_aggregates") as record:
+            frames = [read_frame(aggregate_file, dtype=CONSOLIDATED_DTYPES) for aggregate_file in aggregate_files]
+            record.rows_in = sum(len(frame) for frame in frames)
+            df_final = self._sum_aggregates(frames)
+            record.rows_out = len(df_final)
+        return df_final
+
+    def _sum_aggregates(self, frames: list[pd.DataFrame]) -> pd.DataFrame:
+        """Combines partial sums per (CNPJ, RazaoSocial, Ano, Trimestre); sums are additive."""
+        if not frames:
+            return pd.DataFrame(columns=[*_GROUP_KEYS, "ValorDespesas"])
+
+        merged = pd.concat(frames, ignore_index=True)
+        if self.exact_sums:
+            merged["ValorDespesas"] = to_centavos(merged["ValorDespesas"])
+
+        result = merged.groupby(
+            ["CNPJ", "RazaoSocial", "Ano", "Trimestre"],
+            as_index=False,
+            dropna=False,
+            observed=True
+        ).agg({"ValorDespesas": "sum"})[_GROUP_KEYS + ["ValorDespesas"]]
+        if self.exact_sums:
+            result["ValorDespesas"] = result["ValorDespesas"].astype("float64") / 100
+        return result
+
+    def _export(self, df_final: pd.DataFrame, output_file: Path) -> None:
+        with self.report.stage("export", file=output_file.name) as record:
+            record.rows_in = record.rows_out = len(df_final)
+            if self.intermediate_format == "parquet":
+                write_frame(df_final, output_file.with_suffix(".parquet"))
+
+            df_final = self._apply_brazilian_formatting(df_final)
+
+            output_file.parent.mkdir(exist_ok=True)
+            output_manager = OutputManager(output_file)
+            output_manager.export_to_csv(df_final)
+            output_manager.compress_to_zip()
+            record.bytes_written = output_file.stat().st_size
@@ -0,0 +1,37 @@
+import hashlib
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Bump when the content of cached artifacts changes shape
+CACHE_VERSION = "1"
+
+
+def file_fingerprint(path: Path) -> str:
+    """Cheap fingerprint of a file on disk: size + modification time."""
+    stat = path.stat()
+    return f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class ArtifactCache:
+    """
+    Directory of intermediate artifacts addressed by a hash of their inputs' fingerprints.
+    An artifact whose key parts are unchanged is reused as is; anything else is rebuilt.
+    """
+
+    def __init__(self, cache_dir: Path, namespace: str, suffix: str = ".csv") -> None:
+        self.directory = cache_dir / namespace
+        self.suffix = suffix
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, *key_parts: str) -> Path:
+        digest = hashlib.sha1("|".join((CACHE_VERSION, *key_parts)).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest[:20]}{self.suffix}"
+
+    def prune(self, keep: set[Path]) -> None:
+        """Removes artifacts not referenced by the current run."""
+        for artifact in self.directory.glob(f"*{self.suffix}"):
+            if artifact not in keep:
+                artifact.unlink()
+                logger.debug(f"Pruned stale artifact: {artifact.name}")
@@ -0,0 +1,75 @@
+"""
+Date parsing for ANS columns (DATA, Data_Registro_ANS).
+ANS files use only a couple of layouts and very few distinct dates, so each
+distinct value is parsed once, with explicit formats detected from a sample,
+and the result is mapped back to the rows.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Layouts tried during detection, in order. Ambiguous slash dates resolve
+# month-first, as the previous format="mixed" parsing did.
+DATE_FORMATS = (
+    "ISO8601",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+)
+
+SAMPLE_SIZE = 1_000
+
+
+def detect_formats(values: pd.Series, sample_size: int = SAMPLE_SIZE) -> list[str]:
+    """The DATE_FORMATS that parse at least one value of a sample of values."""
+    sample = values.dropna().head(sample_size)
+    return [
+        date_format
+        for date_format in DATE_FORMATS
+        if pd.to_datetime(sample, format=date_format, errors="coerce").notna().any()
+    ]
+
+
+def parse_unique_dates(values: pd.Series) -> pd.Series:
+    """
+    Parses distinct text dates: each detected layout is applied with its explicit
+    format; what none of them matched falls back to format="mixed".
+    Values that are not dates become NaT.
+    """
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+    for date_format in detect_formats(values):
+        pending = parsed.isna()
+        parsed[pending] = pd.to_datetime(values[pending], format=date_format, errors="coerce")
+
+    leftover = parsed.isna() & values.notna()
+    if leftover.any():
+        logger.debug(f"{leftover.sum()} dates outside the detected layouts, parsing as mixed")
+        parsed[leftover] = pd.to_datetime(values[leftover], format="mixed", errors="coerce")
+    return parsed
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Drop-in for pd.to_datetime(values, format="mixed", errors="coerce"):
+    only the distinct values are parsed, then expanded back to every row.
+    Categorical text stays categorical when it has no missing values and every
+    category is a distinct date, as with pd.to_datetime.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        uniques, codes = values.cat.categories, values.cat.codes.to_numpy()
+    else:
+        codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        return pd.to_datetime(values, format="mixed", errors="coerce")
+
+    parsed = parse_unique_dates(pd.Series(uniques, dtype=object))
+    if isinstance(values.dtype, pd.CategoricalDtype) and (codes >= 0).all() and parsed.notna().all() and parsed.is_unique:
+        return values.cat.rename_categories(list(parsed))
+
+    # Missing values have code -1, which takes the trailing NaT
+    parsed = np.append(parsed.to_numpy(), np.datetime64("NaT", "us"))
+    return pd.Series(parsed.take(codes), index=values.index, name=values.name)
@@ -0,0 +1,19 @@
+from pathlib import Path
+
+import pytest
+
+from src.testing.synthetic_ans import SyntheticAnsDataset
+
+
+@pytest.fixture(scope="session")
+def dataset() -> SyntheticAnsDataset:
+    """Three small quarters (the second one as a latin1 '.txt') and their CADOP report."""
+    return SyntheticAnsDataset(scale=0.002, quarters=("1T2025", "2T2025", "3T2025"), txt_quarters=("2T2025",))
+
+
+@pytest.fixture(scope="session")
+def raw_dir(dataset: SyntheticAnsDataset, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """The dataset written once for the whole session: copy it before changing it."""
+    out_dir = tmp_path_factory.mktemp("raw")
+    dataset.write(out_dir)
+    return out_dir
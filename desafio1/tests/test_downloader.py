@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src.testing.ans_mirror import ACCOUNTING_PATH, AnsMirror
+from src.ingestion.downloader import FileDownloader
+
+_NAME = "1T2025.zip"
+_URL_PATH = f"/{ACCOUNTING_PATH}2025/{_NAME}"
+
+
+@pytest.fixture
+def mirror(tmp_path: Path):
+    year_dir = tmp_path / "mirror" / ACCOUNTING_PATH / "2025"
+    year_dir.mkdir(parents=True)
+    (year_dir / _NAME).write_bytes(os.urandom(256 * 1024))
+    with AnsMirror(tmp_path / "mirror") as running:
+        yield running
+
+
+def _remote(mirror: AnsMirror) -> Path:
+    return mirror.root / ACCOUNTING_PATH / "2025" / _NAME
+
+
+def _etag(path: Path) -> str:
+    stat = path.stat()
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _download(mirror: AnsMirror, dest_dir: Path) -> Path | None:
+    with FileDownloader(chunk_size=16 * 1024, max_workers=1, retries=2) as downloader:
+        return downloader.download(mirror.url(_URL_PATH.lstrip("/")), dest_dir)
+
+
+def test_dropped_download_resumes_with_range(mirror: AnsMirror, tmp_path: Path) -> None:
+    blob = _remote(mirror).read_bytes()
+    mirror.drop_after[_URL_PATH] = len(blob) // 2
+
+    result = _download(mirror, tmp_path / "raw")
+
+    assert result is not None and result.read_bytes() == blob
+    assert mirror.requests == 2
+    assert mirror.bytes_sent <= len(blob) + 64 * 1024  # the second request only sent the rest
+    assert sorted(path.name for path in (tmp_path / "raw").iterdir()) == [_NAME]
+
+
+def test_complete_part_is_finished_on_416(mirror: AnsMirror, tmp_path: Path) -> None:
+    remote = _remote(mirror)
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    (raw_dir / f"{_NAME}.part").write_bytes(remote.read_bytes())
+    (raw_dir / f"{_NAME}.part.meta").write_text(_etag(remote))
+
+    result = _download(mirror, raw_dir)
+
+    assert result is not None and result.read_bytes() == remote.read_bytes()
+    assert mirror.bytes_sent == 0
+    assert sorted(path.name for path in raw_dir.iterdir()) == [_NAME]
+
+
+@pytest.mark.parametrize("validator", ['"stale-etag"', None])
+def test_part_is_restarted_when_stale_or_unvalidated(mirror: AnsMirror, tmp_path: Path, validator: str | None) -> None:
+    remote = _remote(mirror)
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    # Half of an older version of the file
+    (raw_dir / f"{_NAME}.part").write_bytes(os.urandom(remote.stat().st_size // 2))
+    if validator is not None:
+        (raw_dir / f"{_NAME}.part.meta").write_text(validator)
+
+    result = _download(mirror, raw_dir)
+
+    assert result is not None and result.read_bytes() == remote.read_bytes()
+    assert mirror.requests == 1
+    assert sorted(path.name for path in raw_dir.iterdir()) == [_NAME]
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processing.factory_processor import ProcessorFactory
+from src.testing.reference import detail_rollup, load_detail
+from src.transformation.expense_cube import ExpenseCube
+from src.transformation.pipeline import ExpenseConsolidationPipeline
+from src.utils.frame_io import read_frame
+from src.utils.schema import CONSOLIDATED_DTYPES
+
+
+def _assert_close(expected: pd.Series, actual: pd.Series) -> None:
+    # Not compared after rounding: the cube's exact totals can flip a mean that falls on half a cent
+    np.testing.assert_allclose(
+        actual.to_numpy("float64", na_value=np.nan), expected.to_numpy("float64", na_value=np.nan), rtol=1e-9, atol=1e-6
+    )
+
+
+@pytest.fixture(scope="module")
+def consolidated(raw_dir: Path, tmp_path_factory: pytest.TempPathFactory) -> tuple[list[Path], Path]:
+    """Per-quarter partials and the output directory of an incremental run that saved the cube."""
+    output_dir = tmp_path_factory.mktemp("output")
+    quarter_files = ProcessorFactory(cache_dir=output_dir / ".cache").process_all_files(
+        raw_dir, output_dir / "grupo41_consolidado.csv"
+    )
+    ExpenseConsolidationPipeline(cache_dir=output_dir / ".cache", chunksize=1_000, exact_sums=True).run_incremental(
+        quarter_files, raw_dir / "Relatorio_cadop.csv", output_dir / "consolidado_despesas.csv",
+        output_dir / "cubo_despesas.csv",
+    )
+    return quarter_files, output_dir
+
+
+@pytest.mark.parametrize(("by", "account_digits"), [
+    (["Modalidade"], None),
+    (["UF"], None),
+    (["REG_ANS", "Ano", "Trimestre"], None),
+    (["CD_CONTA_CONTABIL"], 4),
+    (["UF", "Ano", "Trimestre"], None),
+])
+def test_rollup_matches_groupby_on_detail_rows(
+    raw_dir: Path, consolidated: tuple[list[Path], Path], by: list[str], account_digits: int | None
+) -> None:
+    quarter_files, output_dir = consolidated
+    operators = ExpenseCube.load_operators(raw_dir / "Relatorio_cadop.csv")
+    cube = ExpenseCube.load(output_dir / "cubo_despesas.csv")
+
+    from_cube = ExpenseCube.rollup(cube, by, operators, account_digits)
+    from_detail = detail_rollup(load_detail(quarter_files, operators), by, account_digits)
+
+    assert len(from_cube) == len(from_detail) > 1
+    assert from_cube[by].astype(str).equals(from_detail[by].astype(str))
+    assert from_cube["Registros"].tolist() == from_detail["count"].tolist()
+    _assert_close(from_detail["sum"], from_cube["ValorDespesas"])
+    _assert_close(from_detail["mean"], from_cube["MediaDespesas"])
+    _assert_close(from_detail["std"], from_cube["DesvioPadraoDespesas"])
+
+
+def test_quarterly_stats_match_the_consolidated_dataset(raw_dir: Path, consolidated: tuple[list[Path], Path]) -> None:
+    _, output_dir = consolidated
+    operators = ExpenseCube.load_operators(raw_dir / "Relatorio_cadop.csv")
+    cube = ExpenseCube.load(output_dir / "cubo_despesas.csv")
+
+    from_cube = ExpenseCube.quarterly_stats(cube, ["CNPJ", "RazaoSocial"], operators)
+    df = read_frame(output_dir / "consolidado_despesas.csv", thousands=".", decimal=",", dtype=CONSOLIDATED_DTYPES)
+    expected = df.groupby(["CNPJ", "RazaoSocial"], observed=True)["ValorDespesas"].agg(
+        ["sum", "mean", "std", "count"]
+    ).reset_index()
+
+    assert len(from_cube) == len(expected) > 1
+    for column, expected_column in (("TotalDespesas", "sum"), ("MediaDespesasTrimestral", "mean"),
+                                    ("DesvioPadraoDespesas", "std"), ("NumeroTrimestres", "count")):
+        _assert_close(expected[expected_column], from_cube[column])
+
+
+def test_cube_does_not_depend_on_chunking(raw_dir: Path, consolidated: tuple[list[Path], Path]) -> None:
+    quarter_files, _ = consolidated
+    whole = ExpenseCube().build(quarter_files[0])
+    chunked = ExpenseCube(chunksize=50).build(quarter_files[0])
+
+    pd.testing.assert_frame_equal(
+        chunked.astype({"CD_CONTA_CONTABIL": str}), whole.astype({"CD_CONTA_CONTABIL": str}), check_exact=False
+    )
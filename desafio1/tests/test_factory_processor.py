@@ -0,0 +1,112 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.testing.synthetic_ans import SyntheticAnsDataset
+from src.processing.base_processor import BaseProcessor
+from src.processing.factory_processor import ProcessorFactory
+from src.transformation.pipeline import ExpenseConsolidationPipeline
+from src.utils.instrumentation import RunReport
+
+
+def _process_stages(report: RunReport) -> list[str]:
+    return sorted(record.file for record in report.records if record.stage == "process" and record.file is not None)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+@pytest.mark.parametrize("cached", [False, True])
+def test_pipelined_processing_matches_listing(raw_dir: Path, tmp_path: Path, max_workers: int, cached: bool) -> None:
+    runs = {}
+    for mode in ("listing", "pipelined"):
+        report = RunReport()
+        factory = ProcessorFactory(
+            max_workers=max_workers, cache_dir=tmp_path / mode / ".cache" if cached else None, report=report
+        )
+        output_file = tmp_path / mode / "grupo41.csv"
+        if mode == "listing":
+            partials = factory.process_all_files(raw_dir, output_file)
+        else:
+            # Arrival order must not matter
+            partials = factory.process_files(reversed(sorted(raw_dir.iterdir())), output_file)
+        runs[mode] = (output_file.read_bytes(), [partial.name for partial in partials], _process_stages(report))
+
+    assert runs["pipelined"] == runs["listing"]
+    output, partials, stages = runs["listing"]
+    assert output.count(b"\n") > 1
+    assert len(partials) == (3 if cached else 0)
+    assert stages == ["1T2025.csv", "2T2025.txt", "3T2025.csv", "Relatorio_cadop.csv"]
+
+
+def _mtimes(directory: Path) -> dict[Path, int]:
+    return {path: path.stat().st_mtime_ns for path in directory.rglob("*") if path.is_file()}
+
+
+def test_partial_cache_reprocesses_only_changed_sources(
+    dataset: SyntheticAnsDataset, raw_dir: Path, tmp_path: Path
+) -> None:
+    raw_copy, output_dir = tmp_path / "raw", tmp_path / "output"
+    shutil.copytree(raw_dir, raw_copy)
+    cache_dir = output_dir / ".cache"
+    cadop_file = raw_copy / "Relatorio_cadop.csv"
+
+    def run() -> tuple[list[Path], list[str]]:
+        report = RunReport()
+        partials = ProcessorFactory(cache_dir=cache_dir, report=report).process_all_files(
+            raw_copy, output_dir / "grupo41_consolidado.csv"
+        )
+        ExpenseConsolidationPipeline(cache_dir=cache_dir).run_incremental(
+            partials, cadop_file, output_dir / "consolidado_despesas.csv"
+        )
+        return partials, _process_stages(report)
+
+    first_partials, first_stages = run()
+    first_output = (output_dir / "consolidado_despesas.csv").read_bytes()
+    cached = _mtimes(cache_dir)
+
+    # Nothing changed: every partial and aggregate is reused untouched
+    partials, stages = run()
+    assert (partials, stages) == (first_partials, [])
+    assert _mtimes(cache_dir) == cached
+    assert (output_dir / "consolidado_despesas.csv").read_bytes() == first_output
+
+    # A new version of one quarter: only its partial and aggregate are rebuilt, the stale ones pruned
+    changed = SyntheticAnsDataset(dataset.scale, dataset.quarters, tuple(dataset.txt_quarters), seed=dataset.seed + 1)
+    changed.write_quarter(raw_copy, "2T2025", 1)
+    partials, stages = run()
+    assert stages == ["2T2025.txt"]
+    assert [partials[0], partials[2]] == [first_partials[0], first_partials[2]]
+    assert partials[1] != first_partials[1] and not first_partials[1].exists()
+    unchanged = {path: mtime for path, mtime in _mtimes(cache_dir).items() if cached.get(path) == mtime}
+    assert len(unchanged) == len(cached) - 2
+
+    # Same result as a full rebuild
+    ExpenseConsolidationPipeline().run(output_dir / "grupo41_consolidado.csv", cadop_file, tmp_path / "full.csv")
+    assert (output_dir / "consolidado_despesas.csv").read_bytes() == (tmp_path / "full.csv").read_bytes()
+
+
+def test_failed_source_is_not_cached(raw_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    raw_copy, output_file = tmp_path / "raw", tmp_path / "output" / "grupo41.csv"
+    shutil.copytree(raw_dir, raw_copy)
+    cache_dir = tmp_path / "output" / ".cache"
+    iter_target_chunks = BaseProcessor._iter_target_chunks
+
+    def failing(self, source):
+        if source.name == "2T2025.txt":
+            raise OSError("connection reset")
+        return iter_target_chunks(self, source)
+
+    # A transient read error: the source is left out, and nothing is cached for it
+    with monkeypatch.context() as patch:
+        patch.setattr(BaseProcessor, "_iter_target_chunks", failing)
+        partials = ProcessorFactory(cache_dir=cache_dir).process_all_files(raw_copy, output_file)
+    assert len(partials) == 2
+    assert not list(cache_dir.rglob("*.tmp"))
+
+    # The next run retries it and reuses the others
+    report = RunReport()
+    partials = ProcessorFactory(cache_dir=cache_dir, report=report).process_all_files(raw_copy, output_file)
+    assert len(partials) == 3
+    assert _process_stages(report) == ["2T2025.txt"]
+    ProcessorFactory().process_all_files(raw_copy, tmp_path / "full.csv")
+    assert output_file.read_bytes() == (tmp_path / "full.csv").read_bytes()
@@ -0,0 +1,50 @@
+import io
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.processing.csv_processor import CsvProcessor
+
+_HEADER = "DATA;REG_ANS;CD_CONTA_CONTABIL;DESCRICAO;VL_SALDO_INICIAL;VL_SALDO_FINAL\n"
+
+
+def _run(source: Path, passthrough: bool) -> pd.DataFrame:
+    output = io.StringIO()
+    assert CsvProcessor(source.with_suffix(".out"), passthrough=passthrough).process_with_stream(source, output, True)
+    output.seek(0)
+    return pd.read_csv(output, sep=";", dtype=str)
+
+
+@pytest.mark.parametrize("rows", [
+    # A short line and a long one: the ';' total of the batch still matches the header
+    ["2025-01-01;2;411;B;1,00\n", "2025-01-01;3;411;C;1,00;2,00;9,00\n"],
+    ["2025-01-01;3;411;C;1,00;2,00;9,00\n", "2025-01-01;2;411;B;1,00\n"],
+    ["2025-01-01;2;411;B\n"],
+])
+def test_passthrough_matches_parsed_output_on_malformed_lines(tmp_path: Path, rows: list[str]) -> None:
+    source = tmp_path / "1T2025.csv"
+    source.write_text(
+        _HEADER
+        + "2025-01-01;1;411;A;1,00;2,00\n"
+        + "".join(rows)
+        + "2025-01-01;4;311;D;1,00;2,00\n"
+        + "2025-01-01;5;412;E;3,00;4,00\n",
+        encoding="utf-8",
+    )
+
+    copied = _run(source, passthrough=True)
+    parsed = _run(source, passthrough=False)
+
+    assert copied["REG_ANS"].tolist() == ["1", "5"]
+    pd.testing.assert_frame_equal(copied[parsed.columns], parsed)
+
+
+def test_passthrough_copies_well_formed_lines_verbatim(tmp_path: Path) -> None:
+    source = tmp_path / "1T2025.csv"
+    lines = ["2025-01-01;1;411;A;1,00;2,00\n", "2025-01-01;5;412;E;3,00;4,00\n"]
+    source.write_text(_HEADER + lines[0] + "2025-01-01;4;311;D;1,00;2,00\n" + lines[1], encoding="utf-8")
+
+    output = io.StringIO()
+    CsvProcessor(source.with_suffix(".out"), passthrough=True).process_with_stream(source, output, True)
+    assert output.getvalue() == _HEADER + "".join(lines)
@@ -0,0 +1,72 @@
+"""
+Row-wise vs vectorized CNPJ validation on synthetic CNPJs.
+Also asserts that both give exactly the same flags.
+
+Usage (from desafio2/):
+    python -m benchmarks.bench_cnpj --rows 3000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.transformation.data_validator import DataValidator
+
+
+def _with_check_digits(base: np.ndarray) -> np.ndarray:
+    """Appends the two official check digits to a (n, 12) digit matrix."""
+    def _digit(block: np.ndarray, weights: list[int]) -> np.ndarray:
+        remainder = (block @ np.array(weights)) % 11
+        return np.where(remainder < 2, 0, 11 - remainder)
+
+    d1 = _digit(base, [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+    with_d1 = np.column_stack([base, d1])
+    d2 = _digit(with_d1, [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+    return np.column_stack([with_d1, d2])
+
+
+def generate_cnpjs(rows: int, seed: int = 42) -> pd.Series:
+    """
+    Mix of valid (raw and formatted), wrong check digits, repeated digits,
+    wrong lengths and missing values.
+    """
+    rng = np.random.default_rng(seed)
+    matrix = _with_check_digits(rng.integers(0, 10, size=(rows, 12)))
+
+    kind = rng.integers(0, 10, size=rows)
+    matrix[kind == 7, 13] = (matrix[kind == 7, 13] + 1) % 10  # wrong check digit
+    matrix[kind == 8] = matrix[kind == 8, :1]                 # all same digit
+
+    raw = pd.Series(["".join(map(str, row)) for row in matrix.tolist()], dtype=object)
+    formatted = raw.str.replace(r"(\d{2})(\d{3})(\d{3})(\d{4})(\d{2})", r"\1.\2.\3/\4-\5", regex=True)
+    cnpjs = raw.where(kind % 2 == 0, formatted)
+    cnpjs[kind == 9] = raw[kind == 9].str[:13]                # too short
+    cnpjs[rng.random(rows) < 0.01] = None
+    return cnpjs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    cnpjs = generate_cnpjs(args.rows)
+    print(f"{args.rows:,} synthetic CNPJs")
+
+    start = time.perf_counter()
+    expected = cnpjs.apply(DataValidator._is_valid_cnpj)
+    row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = DataValidator._valid_cnpj_mask(cnpjs)
+    vector_time = time.perf_counter() - start
+
+    assert actual.equals(expected.astype(bool)), "vectorized validation diverges from _is_valid_cnpj"
+    print(f"apply(_is_valid_cnpj)  {row_time:8.2f}s")
+    print(f"_valid_cnpj_mask       {vector_time:8.2f}s  ({row_time / vector_time:.0f}x)")
+    print(f"valid: {int(actual.sum()):,} / {len(actual):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Row-wise vs vectorized BR money formatting and parsing on synthetic values.
+Also asserts that both formatters agree and that parse → format round-trips,
+and times to_csv on the result for comparison.
+
+Usage (from desafio2/):
+    python -m benchmarks.bench_formatting --rows 3000000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utils.formatting import format_brl, formatar_moeda_br, parse_brl
+
+
+def generate_values(rows: int, seed: int = 42) -> pd.Series:
+    """Expense-like amounts: wide range of magnitudes, some negative or tiny, a few NaN."""
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(mean=10, sigma=3, size=rows).round(2)
+    values[rng.random(rows) < 0.2] *= -1
+    small = rng.random(rows) < 0.05
+    values[small] = rng.normal(0, 1, size=int(small.sum())).round(3)  # sub-cent and near-zero amounts
+    values[rng.random(rows) < 0.01] = np.nan
+    return pd.Series(values)
+
+
+def _timed(label: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{elapsed:8.2f}s")
+    return result, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    values = generate_values(args.rows)
+    print(f"{args.rows:,} synthetic amounts")
+
+    expected, row_time = _timed("apply(formatar_moeda_br)", values.apply, formatar_moeda_br)
+    formatted, vector_time = _timed("format_brl", format_brl, values)
+    assert (formatted.to_numpy() == expected.to_numpy(dtype=object)).all(), "format_brl diverges from formatar_moeda_br"
+    print(f"formatting speedup          {row_time / vector_time:7.0f}x")
+
+    parsed, _ = _timed("parse_brl", parse_brl, formatted)
+    assert format_brl(parsed).equals(formatted), "parse_brl → format_brl does not round-trip"
+    assert parsed.isna().equals(values.isna()), "missing values changed on round-trip"
+
+    # For scale: writing the formatted column, as the final exports do
+    with tempfile.TemporaryDirectory() as tmp:
+        _timed("to_csv (formatted column)", formatted.to_frame("ValorDespesas").to_csv, Path(tmp) / "out.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Peak memory per validation/aggregation stage on a synthetic consolidated dataset.
+Save a run with --save and check later ones against it with --compare;
+the script exits with status 1 when a stage's peak grew past --tolerance.
+
+Usage (from desafio2/):
+    python -m benchmarks.bench_memory --rows 2000000 --save memory_baseline.json
+    python -m benchmarks.bench_memory --rows 2000000 --compare memory_baseline.json
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.aggregation.expense_aggregator import ExpenseAggregator
+from src.transformation.data_validator import DataValidator
+
+from .bench_cnpj import generate_cnpjs
+from .memory_probe import MemoryProbe
+
+
+def generate_enrichment_inputs(rows: int, seed: int = 42) -> tuple[pd.DataFrame, pd.Series]:
+    """A consolidated frame like desafio1's output, plus a CNPJ → UF lookup."""
+    rng = np.random.default_rng(seed)
+    cnpjs = generate_cnpjs(rows, seed)
+    df = pd.DataFrame({
+        "CNPJ": cnpjs,
+        "RazaoSocial": rng.choice(["OPERADORA A LTDA", "OPERADORA B SA", "", "NAO_ENCONTRADO"], size=rows),
+        "Trimestre": rng.integers(1, 5, size=rows),
+        "Ano": 2025,
+        "ValorDespesas": rng.normal(10**6, 10**6, size=rows).round(2),
+    })
+    uf = pd.Series(rng.choice(["SP", "RJ", "MG", "RS"], size=rows), index=cnpjs)
+    return df, uf
+
+
+def run_stages(df: pd.DataFrame, uf: pd.Series, output_dir: Path) -> MemoryProbe:
+    probe = MemoryProbe()
+    validator = DataValidator()
+    aggregator = ExpenseAggregator()
+
+    with probe.stage("validate_cnpj"):
+        df = validator._validate_cnpj(df)
+    with probe.stage("validate_razao_social"):
+        df = validator._validate_razao_social(df)
+    with probe.stage("validate_despesa"):
+        df = validator._validate_despesa(df)
+    # Stand-in for the CADOP join, which is not under test here
+    df["UF"] = uf.to_numpy()
+    with probe.stage("aggregate"):
+        agg_df = aggregator.aggregate(df)
+    with probe.stage("export (BR formatting)"):
+        aggregator.export(agg_df, output_dir / "despesas_agregadas.csv")
+    return probe
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--save", type=Path, help="write this run's peaks as JSON")
+    parser.add_argument("--compare", type=Path, help="fail if peaks grew over this saved run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    df, uf = generate_enrichment_inputs(args.rows)
+    print(f"Synthetic dataset: {args.rows:,} rows")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        probe = run_stages(df, uf, Path(tmp_dir))
+    del df, uf
+
+    probe.report()
+    if args.save:
+        probe.save(args.save)
+    if args.compare:
+        failures = probe.regressions(args.compare, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
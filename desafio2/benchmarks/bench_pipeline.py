@@ -0,0 +1,40 @@
+"""
+Runs ExpenseAnalysisPipeline on the given inputs with a RunReport and saves the
+report as JSON. desafio1's end-to-end benchmark runs it in a subprocess (both
+projects are rooted at a 'src' package, so they cannot share one interpreter);
+it also works on its own.
+
+Usage (from desafio2/):
+    python -m benchmarks.bench_pipeline --input ../desafio1/output/consolidado_despesas.parquet \
+        --cadop ../desafio1/raw/Relatorio_cadop.csv --output-dir /tmp/desafio2 --report /tmp/desafio2/run_report.json
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from src.transformation.pipeline import ExpenseAnalysisPipeline
+from src.utils.instrumentation import RunReport
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, required=True, help="desafio1 output (.csv or .parquet)")
+    parser.add_argument("--cadop", type=Path, required=True)
+    parser.add_argument("--output-dir", type=Path, required=True)
+    parser.add_argument("--report", type=Path, required=True)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+    report = RunReport("desafio2")
+    try:
+        ExpenseAnalysisPipeline(report=report).run(
+            input_file=args.input,
+            cadop_file=args.cadop,
+            output_file=args.output_dir / "despesas_agregadas.csv",
+        )
+    finally:
+        report.save_json(args.report)
+
+
+if __name__ == "__main__":
+    main()
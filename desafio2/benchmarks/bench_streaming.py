@@ -0,0 +1,67 @@
+"""
+In-memory vs chunked ExpenseAggregator on a synthetic consolidado_enriquecido.csv.
+Both aggregate the same file into despesas_agregadas.csv; the outputs must be
+identical byte for byte, and the chunked peak should stay flat as --rows grows.
+Times include tracemalloc's overhead; compare them with each other only.
+
+Usage (from desafio2/):
+    python -m benchmarks.bench_streaming --rows 1000000 --groups 20000
+"""
+import argparse
+import filecmp
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.aggregation.expense_aggregator import ExpenseAggregator
+from src.utils.formatting import format_brl
+
+from .memory_probe import MemoryProbe
+
+
+def write_enriched(path: Path, rows: int, groups: int, seed: int = 42) -> None:
+    """An enriched expense file like the pipeline's debug output, with BR-formatted values."""
+    rng = np.random.default_rng(seed)
+    operators = rng.integers(0, groups, size=rows)
+    df = pd.DataFrame({
+        "RazaoSocial": pd.Series(operators).map(lambda operator: f"OPERADORA {operator:06d} LTDA"),
+        "UF": rng.choice(["SP", "RJ", "MG", "RS", "XX"], size=rows),
+        "Trimestre": rng.integers(1, 5, size=rows),
+        "Ano": 2025,
+        "ValorDespesas": format_brl(pd.Series(rng.lognormal(12, 2, size=rows).round(2) * rng.choice([1, -1], size=rows))),
+        "RegistroCNPJValido": rng.random(rows) < 0.9,
+    })
+    df.to_csv(path, sep=";", index=False, encoding="utf-8-sig")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=20_000, help="distinct operators")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ans_streaming_") as tmp:
+        work_dir = Path(tmp)
+        enriched_file = work_dir / "consolidado_enriquecido.csv"
+        write_enriched(enriched_file, args.rows, args.groups)
+        print(f"Synthetic enriched file: {args.rows:,} rows, {args.groups:,} operators, "
+              f"{enriched_file.stat().st_size / 1024**2:.0f} MB")
+
+        probe = MemoryProbe()
+        outputs = {}
+        for name, chunksize in (("in memory", None), (f"chunks of {args.chunksize:,}", args.chunksize)):
+            outputs[name] = work_dir / name.replace(" ", "_") / "despesas_agregadas.csv"
+            with probe.stage(f"aggregate ({name})"):
+                ExpenseAggregator(chunksize=chunksize).aggregate_expenses(enriched_file, outputs[name])
+
+        probe.report()
+        in_memory, chunked = outputs.values()
+        assert filecmp.cmp(in_memory, chunked, shallow=False), "chunked aggregation differs from in-memory"
+        print("Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Per-stage peak memory for the memory benchmarks.
+
+Two views are recorded for every stage, both relative to its start:
+- traced: peak of tracemalloc (Python objects and NumPy buffers)
+- rss: peak resident set size, which also covers Arrow-backed strings.
+  It is read from VmHWM after resetting it through /proc/self/clear_refs,
+  so it is only available on Linux.
+"""
+import gc
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+_STATUS_FILE = Path("/proc/self/status")
+_CLEAR_REFS_FILE = Path("/proc/self/clear_refs")
+
+
+@dataclass
+class StageMemory:
+    stage: str
+    seconds: float
+    traced_mb: float
+    rss_mb: float | None
+
+
+def _status_kb(field: str) -> int | None:
+    try:
+        for line in _STATUS_FILE.read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_rss_peak() -> bool:
+    try:
+        _CLEAR_REFS_FILE.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+class MemoryProbe:
+    def __init__(self) -> None:
+        self.results: list[StageMemory] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        gc.collect()
+        rss_start = _status_kb("VmRSS") if _reset_rss_peak() else None
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rss_peak = _status_kb("VmHWM") if rss_start is not None else None
+            # Either reading may be missing (no /proc, or no VmHWM line): no RSS figure then
+            rss_mb = (rss_peak - rss_start) / 1024 if rss_start is not None and rss_peak is not None else None
+            self.results.append(StageMemory(
+                stage=name,
+                seconds=seconds,
+                traced_mb=traced_peak / 1024**2,
+                rss_mb=rss_mb,
+            ))
+
+    def report(self) -> None:
+        print(f"{'stage':<28}{'time':>9}{'traced peak':>14}{'RSS peak':>12}")
+        for result in self.results:
+            rss = f"{result.rss_mb:9.1f} MB" if result.rss_mb is not None else "      n/a"
+            print(f"{result.stage:<28}{result.seconds:8.2f}s{result.traced_mb:11.1f} MB{rss}")
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps([asdict(result) for result in self.results], indent=2))
+
+    def regressions(self, baseline_file: Path, tolerance: float) -> list[str]:
+        """Stages whose traced or RSS peak grew more than tolerance over a saved run."""
+        baseline = {entry["stage"]: entry for entry in json.loads(baseline_file.read_text())}
+        failures = []
+        for result in self.results:
+            previous = baseline.get(result.stage)
+            if previous is None:
+                continue
+            for metric in ("traced_mb", "rss_mb"):
+                before, now = previous.get(metric), getattr(result, metric)
+                # Ignore metrics that are unavailable or too small to compare meaningfully
+                if before is None or now is None or max(before, now) < 1:
+                    continue
+                if now > before * (1 + tolerance):
+                    failures.append(f"{result.stage}: {metric} {before:.1f} → {now:.1f} MB")
+        return failures
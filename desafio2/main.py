@@ -1,14 +1,29 @@
 import logging
 from pathlib import Path
-from src.transformation.data_validator import DataValidator
-from src.enrichment.cadop_enricher import CadopEnricher
-from src.aggregation.expense_aggregator import ExpenseAggregator
+from src.transformation.pipeline import ExpenseAnalysisPipeline
+from src.utils.frame_io import PARQUET_AVAILABLE
+from src.utils.instrumentation import RunReport
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
+# Typed Parquet between stages when pyarrow is installed; only the final export is BR-formatted CSV
+INTERMEDIATE_SUFFIX = ".parquet" if PARQUET_AVAILABLE else ".csv"
+# Validated/enriched datasets are only written to disk when debugging
+WRITE_DEBUG_OUTPUTS = False
+# Rows per chunk to stream validation → enrichment → aggregation with bounded memory;
+# None keeps the whole dataset in memory (required for the debug outputs)
+STREAMING_CHUNKSIZE: int | None = None
+# Per-stage timings, row counts, bytes and peak RSS of every run
+RUN_REPORT_FILE = Path("output/run_report.json")
+# Optional Prometheus text-format copy, e.g. in a node_exporter textfile collector directory
+PROMETHEUS_FILE: Path | None = None
+
 
 def main():
     desafio1_output = Path("../desafio1/output/consolidado_despesas.csv")
+    desafio1_typed_output = desafio1_output.with_suffix(".parquet")
+    if PARQUET_AVAILABLE and desafio1_typed_output.exists():
+        desafio1_output = desafio1_typed_output
     desafio1_cadop = Path("../desafio1/raw/Relatorio_cadop.csv")
     
     missing_files = []
@@ -26,27 +41,21 @@ def main():
         )
         return
 
-    
-    validator = DataValidator()
-    validated_file = Path("output/consolidado_validado.csv")
-    validator.validate_and_enrich(
-        input_file=desafio1_output,
-        output_file=validated_file
-    )
-
-    enricher = CadopEnricher()
-    enriched_file = Path("output/consolidado_enriquecido.csv")
-    enricher.enrich_with_cadop(
-        validated_file=validated_file,
-        cadop_file=desafio1_cadop,
-        output_file=enriched_file
-    )
-
-    aggregator = ExpenseAggregator()
-    aggregator.aggregate_expenses(
-        enriched_file=enriched_file,
-        output_file=Path("output/despesas_agregadas.csv")
-    )
+    report = RunReport("desafio2")
+    pipeline = ExpenseAnalysisPipeline(report=report, chunksize=STREAMING_CHUNKSIZE)
+    try:
+        pipeline.run(
+            input_file=desafio1_output,
+            cadop_file=desafio1_cadop,
+            output_file=Path("output/despesas_agregadas.csv"),
+            debug_dir=Path("output") if WRITE_DEBUG_OUTPUTS else None,
+            debug_suffix=INTERMEDIATE_SUFFIX
+        )
+    finally:
+        report.log_summary()
+        report.save_json(RUN_REPORT_FILE)
+        if PROMETHEUS_FILE is not None:
+            report.save_prometheus(PROMETHEUS_FILE)
 
 if __name__ == "__main__":
     main()
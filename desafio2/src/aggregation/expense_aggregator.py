@@ -2,10 +2,16 @@ import pandas as pd
 from pathlib import Path
 import logging
 import zipfile
-from src.utils.formatting import formatar_moeda_br
+from typing import Iterable
+from src.aggregation.running_stats import GroupedRunningStats
+from src.utils.formatting import format_brl, parse_brl
+from src.utils.frame_io import is_parquet, iter_frames, read_frame
+from src.utils.schema import CONSOLIDATED_DTYPES
 
 logger = logging.getLogger(__name__)
 
+_GROUP_KEYS = ["RazaoSocial", "UF", "RegistroCNPJValido"]
+
 
 class ExpenseAggregator:
     """
@@ -16,36 +22,65 @@ class ExpenseAggregator:
     - Average expenses per quarter
     - Standard deviation of expenses
     - CNPJ validity flag
+
+    With a chunksize, the enriched file is read in chunks of that many rows and
+    aggregated with mergeable running statistics (see aggregate_chunks), so memory
+    is bounded by the number of operator/UF groups instead of the number of rows.
     """
 
+    def __init__(self, chunksize: int | None = None) -> None:
+        if chunksize is not None and chunksize <= 0:
+            raise ValueError("chunksize must be a positive number of rows")
+        self.chunksize = chunksize
+
     def aggregate_expenses(self, enriched_file: Path, output_file: Path) -> pd.DataFrame:
         logger.info("Starting expense aggregation...")
 
-        df = pd.read_csv(
-            enriched_file,
-            sep=";",
-            encoding="utf-8-sig"
-        )
-
-        df["ValorDespesas"] = (
-            df["ValorDespesas"]
-            .str.replace(".", "", regex=False)  
-            .str.replace(",", ".", regex=False)  
-            .astype(float)
-        )
-
-        df["Trimestre"] = pd.to_numeric(df["Trimestre"], errors="coerce")
-        df["RegistroCNPJValido"] = df["RegistroCNPJValido"].astype(bool)
-
-        valid_expenses = df["ValorDespesas"].notna()
-        logger.info(f"Processing {valid_expenses.sum():,} valid expense records")
-        df = df[valid_expenses].copy()
-
-        grouped = df.groupby(["RazaoSocial", "UF", "RegistroCNPJValido"], dropna=False)
+        if self.chunksize is not None:
+            chunks = iter_frames(enriched_file, self.chunksize, dtype=CONSOLIDATED_DTYPES)
+            if not is_parquet(enriched_file):
+                chunks = (chunk.assign(ValorDespesas=parse_brl(chunk["ValorDespesas"])) for chunk in chunks)
+            return self.export(self.aggregate_chunks(chunks), output_file)
+
+        df = read_frame(enriched_file, dtype=CONSOLIDATED_DTYPES)
+
+        if not is_parquet(enriched_file):
+            df["ValorDespesas"] = parse_brl(df["ValorDespesas"])
+
+        agg_df = self.aggregate(df)
+        return self.export(agg_df, output_file)
+
+    def aggregate_chunks(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Same metrics as aggregate(), from chunks of numeric ValorDespesas (e.g. read from
+        disk or straight out of the enrichment); only the per-group statistics are kept.
+        """
+        stats = GroupedRunningStats(_GROUP_KEYS, "ValorDespesas", "Trimestre")
+        valid_rows = 0
+        for chunk in chunks:
+            chunk = self._valid_expenses(chunk)
+            valid_rows += len(chunk)
+            stats.update(chunk)
+        logger.info(f"Processed {valid_rows:,} valid expense records in chunks")
+
+        agg_df = stats.result().rename(columns={
+            "Total": "TotalDespesas",
+            "Media": "MediaDespesasTrimestral",
+            "DesvioPadrao": "DesvioPadraoDespesas",
+            "Contagem": "NumeroTrimestres",
+        })
+        return self._finalize(agg_df)
+
+    def aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """In-memory aggregation over numeric ValorDespesas; returns unformatted metrics."""
+        df = self._valid_expenses(df)
+        logger.info(f"Processing {len(df):,} valid expense records")
+
+        grouped = df.groupby(_GROUP_KEYS, dropna=False, observed=True)
         agg_df = grouped.agg({
             "ValorDespesas": ["sum", "mean", "std"],
             "Trimestre": "count"
-        }).round(2)
+        })
 
         agg_df.columns = [
             "TotalDespesas",
@@ -53,12 +88,29 @@ class ExpenseAggregator:
             "DesvioPadraoDespesas",
             "NumeroTrimestres"
         ]
-        agg_df = agg_df.reset_index()
+        return self._finalize(agg_df.reset_index())
+
+    @staticmethod
+    def _valid_expenses(df: pd.DataFrame) -> pd.DataFrame:
+        """Rows with a ValorDespesas, with a numeric Trimestre and a boolean CNPJ flag."""
+        df = df.assign(
+            Trimestre=pd.to_numeric(df["Trimestre"], errors="coerce"),
+            RegistroCNPJValido=df["RegistroCNPJValido"].astype(bool)
+        )
+        return df[df["ValorDespesas"].notna()]
+
+    @staticmethod
+    def _finalize(agg_df: pd.DataFrame) -> pd.DataFrame:
+        agg_df = agg_df.round({"TotalDespesas": 2, "MediaDespesasTrimestral": 2, "DesvioPadraoDespesas": 2})
         agg_df["DesvioPadraoDespesas"] = agg_df["DesvioPadraoDespesas"].fillna(0.0)
+        return agg_df
 
-        from src.utils.formatting import formatar_moeda_br
-        for col in ["TotalDespesas", "MediaDespesasTrimestral", "DesvioPadraoDespesas"]:
-            agg_df[col] = agg_df[col].apply(formatar_moeda_br)
+    def export(self, agg_df: pd.DataFrame, output_file: Path) -> pd.DataFrame:
+        """Writes the BR-formatted final CSV (and its ZIP); returns the formatted frame."""
+        agg_df = agg_df.assign(**{
+            col: format_brl(agg_df[col])
+            for col in ["TotalDespesas", "MediaDespesasTrimestral", "DesvioPadraoDespesas"]
+        })
 
         final_columns = [
             "RazaoSocial", "UF", "RegistroCNPJValido", 
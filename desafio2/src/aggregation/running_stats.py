@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Below this many groups still taking part, a chunk's remaining rows are summed value by value
+_VECTOR_GROUPS = 64
+
+
+class GroupedRunningStats:
+    """
+    Online count / sum / mean / sample std per group, fed one chunk at a time; memory
+    grows with the number of groups, not with the number of rows.
+    Sums are Kahan-compensated and carried across chunks in row order, like pandas'
+    groupby sum/mean, so totals and means match aggregating the whole frame at once,
+    ties at half a cent included. For the std, each chunk's count, mean and M2 (sum of
+    squared deviations from the mean) per group are computed at once, then merged into
+    the running ones with Chan et al.'s pairwise update.
+    A separate non-null count of count_column is kept as well (e.g. the number of quarters).
+    """
+
+    def __init__(self, keys: list[str], value_column: str, count_column: str) -> None:
+        self.keys = keys
+        self.value_column = value_column
+        self.count_column = count_column
+        self._groups: pd.Index | None = None
+        self._count = np.zeros(0, dtype=np.int64)
+        self._non_null = np.zeros(0, dtype=np.int64)
+        self._sum = np.zeros(0)
+        self._compensation = np.zeros(0)
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Adds the rows of one chunk; rows with a missing value must be filtered out first."""
+        if df.empty:
+            return
+        group_ids = self._group_ids(df)
+        size = len(self._count)
+        values = df[self.value_column].to_numpy(dtype=np.float64)
+
+        self._non_null += np.bincount(
+            group_ids, weights=df[self.count_column].notna().to_numpy(), minlength=size
+        ).astype(np.int64)
+        self._add_to_sums(group_ids, values)
+
+        # Statistics of this chunk alone (two passes: mean, then squared deviations)
+        count = np.bincount(group_ids, minlength=size)
+        present = count > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.bincount(group_ids, weights=values, minlength=size) / count
+        m2 = np.bincount(group_ids, weights=(values - mean[group_ids]) ** 2, minlength=size)
+
+        # Chan's merge with the running statistics
+        old_count = self._count[present].astype(np.float64)
+        new_count = old_count + count[present]
+        delta = mean[present] - self._mean[present]
+        self._mean[present] += delta * count[present] / new_count
+        self._m2[present] += m2[present] + delta * delta * old_count * count[present] / new_count
+        self._count += count
+
+    def result(self) -> pd.DataFrame:
+        """
+        One row per group, sorted by the keys like a groupby: Total, Media, DesvioPadrao
+        (NaN for single-row groups, like pandas' std) and Contagem.
+        """
+        if self._groups is None:
+            return pd.DataFrame(columns=[*self.keys, "Total", "Media", "DesvioPadrao", "Contagem"])
+        groups = self._groups.to_frame(index=False).infer_objects()
+        count = self._count.astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.where(self._count > 1, np.sqrt(self._m2 / (count - 1)), np.nan)
+        result = groups.assign(
+            Total=self._sum,
+            Media=self._sum / count,
+            DesvioPadrao=std,
+            Contagem=self._non_null,
+        )
+        return result.sort_values(self.keys, kind="stable", ignore_index=True)
+
+    def _group_ids(self, df: pd.DataFrame) -> np.ndarray:
+        """Global id of each row's group; groups first seen in this chunk get new ids."""
+        grouped = df.groupby(self.keys, dropna=False, observed=True, sort=False)
+        local_ids = grouped.ngroup().to_numpy()
+        # Plain object keys, so categoricals with different categories per chunk still match
+        chunk_groups = pd.MultiIndex.from_frame(grouped.size().index.to_frame(index=False).astype(object))
+
+        if self._groups is None:
+            groups = chunk_groups
+        else:
+            groups = self._groups.append(chunk_groups[self._groups.get_indexer(chunk_groups) == -1])
+        self._groups = groups
+        self._grow(len(groups))
+        return groups.get_indexer(chunk_groups)[local_ids]
+
+    def _grow(self, size: int) -> None:
+        """Extends the per-group state arrays with zeros up to size groups."""
+        for name in ("_count", "_non_null", "_sum", "_compensation", "_mean", "_m2"):
+            array = getattr(self, name)
+            if len(array) < size:
+                setattr(self, name, np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)]))
+
+    def _add_to_sums(self, group_ids: np.ndarray, values: np.ndarray) -> None:
+        """
+        Adds each group's values to its Kahan sum in row order. Round r adds the r-th value
+        of every group at once while many groups take part; the rows left in the few
+        remaining (larger) groups are then added one by one.
+        """
+        order = np.argsort(group_ids, kind="stable")
+        groups, starts, sizes = np.unique(group_ids[order], return_index=True, return_counts=True)
+        values = values[order]
+
+        rank = 0
+        active = np.arange(len(groups))
+        while len(active) >= _VECTOR_GROUPS:
+            self._kahan_step(groups[active], values[starts[active] + rank])
+            rank += 1
+            active = active[sizes[active] > rank]
+
+        for index in active:
+            group = groups[index]
+            total, compensation = float(self._sum[group]), float(self._compensation[group])
+            for value in values[starts[index] + rank:starts[index] + sizes[index]].tolist():
+                adjusted = value - compensation
+                new_total = total + adjusted
+                compensation = (new_total - total) - adjusted
+                if compensation != compensation:
+                    compensation = 0.0
+                total = new_total
+            self._sum[group], self._compensation[group] = total, compensation
+
+    def _kahan_step(self, groups: np.ndarray, values: np.ndarray) -> None:
+        """Adds one value to each of the (distinct) groups, as pandas' group_sum does."""
+        total = self._sum[groups]
+        adjusted = values - self._compensation[groups]
+        new_total = total + adjusted
+        compensation = (new_total - total) - adjusted
+        self._compensation[groups] = np.where(np.isnan(compensation), 0.0, compensation)
+        self._sum[groups] = new_total
@@ -1,6 +1,10 @@
 import pandas as pd
 from pathlib import Path
 import logging
+from typing import Iterable
+from src.utils.cadop_registry import CadopRegistry
+from src.utils.frame_io import read_frame, write_frame
+from src.utils.schema import CONSOLIDATED_DTYPES, compact_cadop, with_category
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +20,26 @@ class CadopEnricher:
     def enrich_with_cadop(self, validated_file: Path, cadop_file: Path, output_file: Path):
         logger.info("Starting CADOP enrichment...")
 
-        df_validated = pd.read_csv(
-            validated_file,
-            sep=";",
-            encoding="utf-8-sig"
-        )
+        df_validated = read_frame(validated_file, dtype=CONSOLIDATED_DTYPES)
+        df_cadop = self.load_cadop(cadop_file)
+        df_enriched = self.enrich(df_validated, df_cadop)
+
+        write_frame(df_enriched, output_file)
+
+        logger.info(f"CADOP enrichment completed. Output saved to: {output_file}")
+        return df_enriched
 
-        df_cadop = self._load_and_prepare_cadop(cadop_file)
+    def enrich(self, df_validated: pd.DataFrame, df_cadop: pd.DataFrame) -> pd.DataFrame:
+        """In-memory enrichment: left join on CNPJ, unmatched UF becomes 'XX'."""
+        df_cadop = df_cadop[["CNPJ", "UF"]]
+        cnpj_dtype = df_validated["CNPJ"].dtype
+        if isinstance(cnpj_dtype, pd.CategoricalDtype):
+            # Same categories on both sides lets the join run on the integer codes;
+            # CADOP CNPJs absent from the expenses can never match and are dropped
+            df_cadop = df_cadop.assign(CNPJ=df_cadop["CNPJ"].astype(str).astype(cnpj_dtype)).dropna(subset=["CNPJ"])
 
         df_enriched = df_validated.merge(
-            df_cadop[["CNPJ", "UF"]],
+            df_cadop,
             on="CNPJ",
             how="left"
         )
@@ -33,6 +47,7 @@ class CadopEnricher:
         no_match_mask = df_enriched["UF"].isna()
         if no_match_mask.any():
             logger.warning(f"CNPJs without CADOP match: {no_match_mask.sum()}")
+            df_enriched["UF"] = with_category(df_enriched["UF"], "XX")
             df_enriched.loc[no_match_mask, "UF"] = "XX"
 
         essential_columns = [
@@ -43,34 +58,21 @@ class CadopEnricher:
             "ValorDespesas", 
             "RegistroCNPJValido"
         ]
-        df_enriched = df_enriched[essential_columns]
+        return df_enriched[essential_columns]
 
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        df_enriched.to_csv(
-            output_file,
-            sep=";",
-            index=False,
-            encoding="utf-8-sig"
-        )
-
-        logger.info(f"CADOP enrichment completed. Output saved to: {output_file}")
-        return df_enriched
-    
-    def _load_and_prepare_cadop(self, cadop_file: Path):
-        """Loads and prepares CADOP data for enrichment."""
-        df = pd.read_csv(
-            cadop_file,
-            sep=";",
-            encoding="utf-8-sig",
-            dtype=str,
-            on_bad_lines="skip",
-            skip_blank_lines=True
-        )
+    def load_cadop(self, cadop_file: Path, cnpjs: Iterable | None = None):
+        """
+        Loads and prepares CADOP data for enrichment from the shared CADOP registry.
+        With cnpjs, only the records of those CNPJs are fetched (batch lookup).
+        """
+        registry = CadopRegistry(cadop_file)
+        df = registry.records() if cnpjs is None else registry.lookup("CNPJ", cnpjs)
         
         required_cols = ["REGISTRO_OPERADORA", "CNPJ", "Modalidade", "UF"]
         df = df[required_cols].copy()
         
         df["CNPJ"] = df["CNPJ"].astype(str).str.strip()
+        df = compact_cadop(df)
         
         logger.info(f"CADOP loaded: {len(df)} records")
         return df
@@ -1,10 +1,16 @@
 import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import logging
-from src.utils.formatting import formatar_moeda_br
+from src.utils.formatting import format_brl
+from src.utils.frame_io import is_parquet, read_frame, write_frame
+from src.utils.schema import CONSOLIDATED_DTYPES, with_category
 logger = logging.getLogger(__name__)
 
+_CNPJ_WEIGHTS_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+_CNPJ_WEIGHTS_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
 
 class DataValidator:
     """
@@ -14,36 +20,34 @@ class DataValidator:
     - RegistroCNPJValido: bool (True if CNPJ is valid)
     - RazaoSocial: str (ensures no empty values)
     - DespesaPositiva: bool (True if ValorDespesas > 0)
+
+    Parquet input/output keeps ValorDespesas as a float; CSV output is BR-formatted.
     """
 
     def validate_and_enrich(self, input_file: Path, output_file: Path) -> pd.DataFrame:
         logger.info("Starting data validation and enrichment...")
 
-        df = pd.read_csv(
-            input_file,
-            sep=";",
-            encoding="utf-8-sig",
-            thousands=".",
-            decimal=","
-        )
-
-        df = self._validate_cnpj(df)
-        df = self._validate_razao_social(df)
-        df = self._validate_despesa(df)  
+        df = read_frame(input_file, thousands=".", decimal=",", dtype=CONSOLIDATED_DTYPES)
+        df = self.validate(df)
 
-        from src.utils.formatting import formatar_moeda_br
-        df["ValorDespesas"] = df["ValorDespesas"].apply(formatar_moeda_br)
+        if not is_parquet(output_file):
+            df["ValorDespesas"] = format_brl(df["ValorDespesas"])
 
         # ✅ ESCRITA
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(
-            output_file,
-            sep=";",
-            index=False,
-            encoding="utf-8-sig"
-        )
+        write_frame(df, output_file)
+
+        return df
 
-        # Log summary
+    def validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """In-memory validation: adds the quality flags, keeps ValorDespesas numeric."""
+        df = self._validate_cnpj(df)
+        df = self._validate_razao_social(df)
+        df = self._validate_despesa(df)
+        self._log_summary(df)
+        return df
+
+    @staticmethod
+    def _log_summary(df: pd.DataFrame) -> None:
         total = len(df)
         valid_cnpjs = df["RegistroCNPJValido"].sum()
         valid_names = (df["RazaoSocial"] != "NAO_ENCONTRADA").sum()
@@ -57,31 +61,70 @@ class DataValidator:
             f"- Positive expenses: {positive_expenses:,} ({positive_expenses/total:.1%})"
         )
 
-        return df
-
 
     def _validate_cnpj(self, df: pd.DataFrame) -> pd.DataFrame:
         """Adds 'RegistroCNPJValido' column based on CNPJ validation."""
-        df = df.copy()
-        df["RegistroCNPJValido"] = df["CNPJ"].apply(self._is_valid_cnpj)
-        return df
+        return df.assign(RegistroCNPJValido=self._valid_cnpj_mask(df["CNPJ"]))
+
+    @staticmethod
+    def _valid_cnpj_mask(cnpjs: pd.Series) -> pd.Series:
+        """
+        Vectorized equivalent of _is_valid_cnpj for a whole column.
+        The 14-digit values become a NumPy digit matrix and both check digits
+        are computed with weighted dot products for all rows at once.
+        """
+        if isinstance(cnpjs.dtype, pd.CategoricalDtype):
+            # Validate each distinct CNPJ once; code -1 (missing) maps to the trailing False
+            valid = DataValidator._valid_cnpj_mask(pd.Series(cnpjs.cat.categories)).to_numpy()
+            return pd.Series(np.append(valid, False)[cnpjs.cat.codes.to_numpy()], index=cnpjs.index)
+
+        if pd.api.types.is_string_dtype(cnpjs.dtype) and cnpjs.dtype != object:
+            is_str = cnpjs.notna()
+        elif cnpjs.dtype == object:
+            is_str = cnpjs.map(lambda value: isinstance(value, str)).astype(bool)
+        else:
+            return pd.Series(False, index=cnpjs.index)
+
+        # One byte per character: anything outside latin1 becomes '?', which is not a digit anyway
+        values = cnpjs.where(is_str, "").astype(str)
+        lengths = values.str.len().to_numpy()
+        buffer = np.frombuffer("".join(values.tolist()).encode("latin-1", "replace"), dtype=np.uint8)
+
+        # Keep only the digits of rows that have exactly 14 of them, in row order
+        is_digit = (buffer >= ord("0")) & (buffer <= ord("9"))
+        row_ids = np.repeat(np.arange(len(cnpjs), dtype=np.int32), lengths)
+        candidates = np.bincount(row_ids[is_digit], minlength=len(cnpjs)) == 14
+        result = np.zeros(len(cnpjs), dtype=bool)
+        if not candidates.any():
+            return pd.Series(result, index=cnpjs.index)
+
+        keep = is_digit & candidates[row_ids]
+        matrix = (buffer[keep] - ord("0")).reshape(-1, 14).astype(np.int64)
+
+        def _check_digit(weighted_sum: np.ndarray) -> np.ndarray:
+            remainder = weighted_sum % 11
+            return np.where(remainder < 2, 0, 11 - remainder)
+
+        digit1 = _check_digit(matrix[:, :12] @ _CNPJ_WEIGHTS_1)
+        digit2 = _check_digit(matrix[:, :13] @ _CNPJ_WEIGHTS_2)
+        all_same = (matrix == matrix[:, :1]).all(axis=1)
+
+        result[candidates] = (~all_same) & (digit1 == matrix[:, 12]) & (digit2 == matrix[:, 13])
+        return pd.Series(result, index=cnpjs.index)
 
     def _validate_razao_social(self, df: pd.DataFrame) -> pd.DataFrame:
         """Ensures 'RazaoSocial' is never empty."""
-        df = df.copy()
         mask_empty = (
             df["RazaoSocial"].isna() |
             (df["RazaoSocial"].astype(str).str.strip() == "") |
             (df["RazaoSocial"] == "NAO_ENCONTRADO")
         )
-        df.loc[mask_empty, "RazaoSocial"] = "NAO_ENCONTRADA"
-        return df
+        razao_social = with_category(df["RazaoSocial"], "NAO_ENCONTRADA")
+        return df.assign(RazaoSocial=razao_social.mask(mask_empty, "NAO_ENCONTRADA"))
 
     def _validate_despesa(self, df: pd.DataFrame) -> pd.DataFrame:
         """Adds 'DespesaPositiva' flag (True if ValorDespesas > 0)."""
-        df = df.copy()
-        df["DespesaPositiva"] = df["ValorDespesas"] > 0
-        return df
+        return df.assign(DespesaPositiva=df["ValorDespesas"] > 0)
 
     @staticmethod
     def _is_valid_cnpj(cnpj: str) -> bool:
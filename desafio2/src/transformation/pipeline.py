@@ -0,0 +1,100 @@
+import logging
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from src.aggregation.expense_aggregator import ExpenseAggregator
+from src.enrichment.cadop_enricher import CadopEnricher
+from src.transformation.data_validator import DataValidator
+from src.utils.frame_io import iter_frames, read_frame, write_frame
+from src.utils.instrumentation import RunReport, StageRecord
+from src.utils.schema import CONSOLIDATED_DTYPES
+
+logger = logging.getLogger(__name__)
+
+
+class ExpenseAnalysisPipeline:
+    """
+    Runs validation, CADOP enrichment and aggregation on a single in-memory DataFrame.
+    The consolidated input is read once and only the final aggregated CSV is written;
+    the validated and enriched datasets are saved only when a debug_dir is given.
+    With a RunReport, load, validation, enrichment, aggregation and export are
+    recorded as stages, with their row counts.
+    With a chunksize, the input is streamed instead: each chunk is validated, enriched
+    and folded into the aggregator's running statistics, all as one "stream" stage,
+    so memory is bounded by the number of groups; debug outputs are not available then.
+    """
+
+    def __init__(self, report: RunReport | None = None, chunksize: int | None = None) -> None:
+        self.validator = DataValidator()
+        self.enricher = CadopEnricher()
+        self.aggregator = ExpenseAggregator(chunksize=chunksize)
+        self.chunksize = chunksize
+        self.report = report or RunReport(enabled=False)
+
+    def run(
+        self,
+        input_file: Path,
+        cadop_file: Path,
+        output_file: Path,
+        debug_dir: Path | None = None,
+        debug_suffix: str = ".csv",
+    ) -> pd.DataFrame:
+        logger.info("Starting fused validation → enrichment → aggregation...")
+
+        if self.chunksize is not None:
+            if debug_dir is not None:
+                raise ValueError("Debug outputs require the in-memory mode (chunksize=None)")
+            with self.report.stage("stream", file=input_file.name) as record:
+                df_cadop = self.enricher.load_cadop(cadop_file)
+                agg_df = self.aggregator.aggregate_chunks(self._enriched_chunks(input_file, df_cadop, record))
+                record.rows_out = len(agg_df)
+            return self._export(agg_df, output_file)
+
+        with self.report.stage("load", file=input_file.name) as record:
+            df = read_frame(input_file, thousands=".", decimal=",", dtype=CONSOLIDATED_DTYPES)
+            record.rows_out = len(df)
+
+        with self.report.stage("validate") as record:
+            record.rows_in = len(df)
+            df_validated = self.validator.validate(df)
+            record.rows_out = len(df_validated)
+        self._write_debug(df_validated, debug_dir, f"consolidado_validado{debug_suffix}")
+
+        with self.report.stage("enrich", file=cadop_file.name) as record:
+            record.rows_in = len(df_validated)
+            df_cadop = self.enricher.load_cadop(cadop_file, cnpjs=df_validated["CNPJ"].unique())
+            df_enriched = self.enricher.enrich(df_validated, df_cadop)
+            record.rows_out = len(df_enriched)
+        self._write_debug(df_enriched, debug_dir, f"consolidado_enriquecido{debug_suffix}")
+
+        with self.report.stage("aggregate") as record:
+            record.rows_in = len(df_enriched)
+            agg_df = self.aggregator.aggregate(df_enriched)
+            record.rows_out = len(agg_df)
+
+        return self._export(agg_df, output_file)
+
+    def _enriched_chunks(self, input_file: Path, df_cadop: pd.DataFrame, record: StageRecord) -> Iterator[pd.DataFrame]:
+        """Validated and enriched chunks of the input; counts the rows read into record."""
+        assert self.chunksize is not None
+        record.rows_in = 0
+        for chunk in iter_frames(input_file, self.chunksize, thousands=".", decimal=",", dtype=CONSOLIDATED_DTYPES):
+            record.rows_in += len(chunk)
+            yield self.enricher.enrich(self.validator.validate(chunk), df_cadop)
+
+    def _export(self, agg_df: pd.DataFrame, output_file: Path) -> pd.DataFrame:
+        with self.report.stage("export", file=output_file.name) as record:
+            record.rows_in = len(agg_df)
+            result = self.aggregator.export(agg_df, output_file)
+            record.rows_out = len(result)
+        return result
+
+    @staticmethod
+    def _write_debug(df: pd.DataFrame, debug_dir: Path | None, filename: str) -> None:
+        """Saves an intermediate dataset, keeping ValorDespesas numeric."""
+        if debug_dir is None:
+            return
+        write_frame(df, debug_dir / filename)
+        logger.info(f"Debug output saved: {debug_dir / filename}")
@@ -0,0 +1,150 @@
+"""
+CADOP report (Relatorio_cadop.csv) as an indexed SQLite store.
+The CSV is parsed and cleaned once per version of the file; afterwards every
+stage, in either project, reads the store instead of re-parsing the report.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+from .dates import parse_dates
+
+logger = logging.getLogger(__name__)
+
+# Bump when the table layout or the cleaning rules change, in both projects: the store is shared
+STORE_VERSION = "1"
+
+CADOP_COLUMNS = ["REGISTRO_OPERADORA", "CNPJ", "Razao_Social", "Modalidade", "UF", "Data_Registro_ANS"]
+LOOKUP_KEYS = ("REGISTRO_OPERADORA", "CNPJ")
+
+_SCHEMA = """
+CREATE TABLE cadop (
+    row_number INTEGER PRIMARY KEY,
+    REGISTRO_OPERADORA TEXT,
+    CNPJ TEXT,
+    Razao_Social TEXT,
+    Modalidade TEXT,
+    UF TEXT,
+    Data_Registro_ANS TEXT,
+    current_rank INTEGER
+);
+CREATE INDEX cadop_registro ON cadop (REGISTRO_OPERADORA);
+CREATE INDEX cadop_cnpj ON cadop (trim(CNPJ));
+CREATE INDEX cadop_current ON cadop (current_rank) WHERE current_rank IS NOT NULL;
+"""
+
+# Lookups by CNPJ ignore surrounding spaces, like the enrichment join always did
+_KEY_EXPRESSIONS = {"REGISTRO_OPERADORA": "REGISTRO_OPERADORA", "CNPJ": "trim(CNPJ)"}
+
+
+def read_cadop_csv(cadop_file: Path) -> pd.DataFrame:
+    return pd.read_csv(
+        cadop_file,
+        sep=";",
+        encoding="utf-8-sig",
+        dtype=str,
+        on_bad_lines="skip",
+        skip_blank_lines=True
+    )
+
+
+def select_current(df_cadop: pd.DataFrame) -> pd.DataFrame:
+    """
+    One record per CNPJ: the one with the most recent Data_Registro_ANS.
+    Records without a valid registration date are dropped.
+    """
+    df = df_cadop.assign(Data_Registro_ANS=parse_dates(df_cadop["Data_Registro_ANS"]))
+    df = df.dropna(subset=["Data_Registro_ANS"])
+    df = df.sort_values("Data_Registro_ANS", ascending=False)
+    return df.drop_duplicates(subset=["CNPJ"], keep="first")
+
+
+class CadopRegistry:
+    """
+    The store lives next to the CSV by default, so desafio1 and desafio2 share it.
+    Its name carries a fingerprint of the CSV (name, size, mtime): a new download
+    gets a new store, and stale ones are removed when it is built.
+    """
+
+    def __init__(self, cadop_file: Path, store_dir: Path | None = None) -> None:
+        self.cadop_file = cadop_file
+        self.store_dir = store_dir or cadop_file.parent / ".cadop_registry"
+
+    @property
+    def store_file(self) -> Path:
+        stat = self.cadop_file.stat()
+        key = f"{STORE_VERSION}|{self.cadop_file.name}:{stat.st_size}:{stat.st_mtime_ns}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return self.store_dir / f"{self.cadop_file.stem}-{digest}.sqlite"
+
+    def ensure(self) -> Path:
+        """Builds the store for the current CSV if it does not exist yet."""
+        store_file = self.store_file
+        if not store_file.exists():
+            self._build(store_file)
+        return store_file
+
+    def records(self) -> pd.DataFrame:
+        """Every record of the report, in file order."""
+        return self._query("SELECT {columns} FROM cadop ORDER BY row_number")
+
+    def lookup(self, key: str, values: Iterable, current_only: bool = False) -> pd.DataFrame:
+        """
+        Batch lookup of the records whose key (REGISTRO_OPERADORA or CNPJ) is in values,
+        in file order, or newest first (latest record per CNPJ only) with current_only.
+        """
+        if key not in LOOKUP_KEYS:
+            raise ValueError(f"Unknown CADOP lookup key: {key}")
+
+        keys = {str(value).strip() for value in values if pd.notna(value)}
+        order = "current_rank" if current_only else "row_number"
+        where = " AND current_rank IS NOT NULL" if current_only else ""
+        return self._query(
+            "SELECT {columns} FROM cadop "
+            f"WHERE {_KEY_EXPRESSIONS[key]} IN (SELECT value FROM lookup_keys){where} "
+            f"ORDER BY {order}",
+            keys=keys
+        )
+
+    def _query(self, sql: str, keys: set[str] | None = None) -> pd.DataFrame:
+        store_file = self.ensure()
+        with closing(sqlite3.connect(store_file)) as conn:
+            if keys is not None:
+                conn.execute("CREATE TEMP TABLE lookup_keys (value TEXT PRIMARY KEY)")
+                conn.executemany("INSERT INTO lookup_keys VALUES (?)", ((key,) for key in keys))
+            df = pd.read_sql_query(sql.format(columns=", ".join(CADOP_COLUMNS)), conn)
+        df["Data_Registro_ANS"] = pd.to_datetime(df["Data_Registro_ANS"], format="ISO8601")
+        return df
+
+    def _build(self, store_file: Path) -> None:
+        df = read_cadop_csv(self.cadop_file)[CADOP_COLUMNS]
+        current = select_current(df)
+        current_rank = pd.Series(range(len(current)), index=current.index).reindex(df.index)
+        dates = parse_dates(df["Data_Registro_ANS"])
+
+        table = df.assign(
+            Data_Registro_ANS=dates.dt.strftime("%Y-%m-%dT%H:%M:%S"),
+            current_rank=current_rank.astype("Int64"),
+        ).astype(object).where(lambda frame: frame.notna(), None)
+
+        store_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = store_file.with_name(f"{store_file.name}.{os.getpid()}.tmp")
+        with closing(sqlite3.connect(tmp_file)) as conn:
+            conn.executescript(_SCHEMA)
+            conn.executemany(
+                f"INSERT INTO cadop VALUES (?, {', '.join('?' * (len(CADOP_COLUMNS) + 1))})",
+                ((row_number, *row) for row_number, row in enumerate(table.itertuples(index=False)))
+            )
+            conn.commit()
+        os.replace(tmp_file, store_file)
+
+        for stale in self.store_dir.glob(f"{self.cadop_file.stem}-*.sqlite"):
+            if stale != store_file:
+                stale.unlink(missing_ok=True)
+        logger.info(f"CADOP registry built: {store_file} ({len(df)} records, {len(current)} current)")
@@ -1,8 +1,79 @@
+import numpy as np
 import pandas as pd
 
+# Above this many centavos a float64 can no longer hold every cent exactly
+_MAX_EXACT_CENTS = 2 ** 52
+_MAX_DIGITS = len(str(_MAX_EXACT_CENTS // 100))
+# sign + integer digits + thousands dots + ",00" + newline
+_ROW_WIDTH = 1 + _MAX_DIGITS + (_MAX_DIGITS - 1) // 3 + 3 + 1
+
+
 def formatar_moeda_br(valor) -> str:
     if pd.isna(valor) or valor == "":
         return ""
-    sinal = "-" if valor < 0 else ""
-    valor_abs = abs(valor)
-    return sinal + f"{valor_abs:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    texto = f"{abs(valor):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    # No "-0,00": values that round to zero are written unsigned, so parsing round-trips
+    sinal = "-" if valor < 0 and texto != "0,00" else ""
+    return sinal + texto
+
+
+def format_brl(values: pd.Series) -> pd.Series:
+    """
+    Vectorized formatar_moeda_br for a whole column (1351.5 → "1.351,50", NaN → "").
+    Values are rounded to integer centavos and their digits written into a byte matrix;
+    the few values whose rounding is ambiguous in float arithmetic (or too large for
+    exact centavos) go through formatar_moeda_br, so the output is identical.
+    """
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    present = np.isfinite(numbers)
+
+    scaled = np.where(present, np.abs(numbers) * 100, 0.0)
+    cents = np.rint(scaled)
+    # x * 100 may be off by half an ulp: values that close to a half centavo are left to Python
+    fast = present & (scaled < _MAX_EXACT_CENTS) & (np.abs(np.abs(scaled - cents) - 0.5) > 2 * np.spacing(scaled))
+    cents = np.where(fast, cents, 0).astype(np.int64)
+
+    # One fixed-width byte row per value, right-aligned: [sign][digits with dots],[2 digits]\n
+    whole, fraction = np.divmod(cents, 100)
+    rows = np.zeros((len(numbers), _ROW_WIDTH), dtype=np.uint8)
+    rows[:, -1] = ord("\n")
+    rows[:, -2] = np.where(fast, ord("0") + fraction % 10, 0)
+    rows[:, -3] = np.where(fast, ord("0") + fraction // 10, 0)
+    rows[:, -4] = np.where(fast, ord(","), 0)
+
+    sign_column = np.full(len(numbers), _ROW_WIDTH - 5)
+    remaining = whole
+    for k in range(_MAX_DIGITS):
+        has_digit = fast & (remaining > 0) if k else fast
+        if not has_digit.any():
+            break
+        remaining, digit = np.divmod(remaining, 10)
+        column = _ROW_WIDTH - 5 - k - k // 3
+        rows[:, column] = np.where(has_digit, ord("0") + digit, 0)
+        if k and k % 3 == 0:
+            rows[:, column + 1] = np.where(has_digit, ord("."), 0)
+        sign_column = np.where(has_digit, column - 1, sign_column)
+    negative = np.flatnonzero(fast & (numbers < 0) & (cents > 0))
+    rows[negative, sign_column[negative]] = ord("-")
+
+    # Dropping the padding bytes leaves newline-separated strings, split in one call
+    text = rows[rows != 0].tobytes().decode("ascii").split("\n")[:-1]
+
+    result = np.array(text, dtype=object)
+    slow = np.flatnonzero(~np.isnan(numbers) & ~fast)
+    if slow.size:
+        result[slow] = [formatar_moeda_br(value) for value in numbers[slow]]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def parse_brl(values: pd.Series) -> pd.Series:
+    """
+    Inverse of format_brl: "-1.351,50" → -1351.5, empty or invalid → NaN.
+    Numeric columns are returned as float64 without any string handling.
+    """
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.astype(np.float64)
+
+    text = values.astype("str").str.strip()
+    text = text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(text, errors="coerce").astype(np.float64)
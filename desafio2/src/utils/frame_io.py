@@ -0,0 +1,59 @@
+import importlib.util
+from pathlib import Path
+from typing import Any, Iterator
+
+import pandas as pd
+
+# Parquet intermediates need pyarrow; without it every stage falls back to CSV
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def is_parquet(path: Path) -> bool:
+    return path.suffix.lower() == ".parquet"
+
+
+def read_frame(path: Path, **csv_kwargs: Any) -> pd.DataFrame:
+    """
+    Reads an inter-stage file: typed Parquet as is, or the ';'-separated CSV
+    used across the project (csv_kwargs are forwarded to read_csv).
+    """
+    if is_parquet(path):
+        return pd.read_parquet(path)
+    return sort_categories(pd.read_csv(path, sep=";", encoding="utf-8-sig", **csv_kwargs))
+
+
+def iter_frames(path: Path, chunksize: int, **csv_kwargs: Any) -> Iterator[pd.DataFrame]:
+    """Reads an inter-stage file as DataFrames of at most chunksize rows."""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    with pd.read_csv(path, sep=";", encoding="utf-8-sig", chunksize=chunksize, **csv_kwargs) as reader:
+        for chunk in reader:
+            yield sort_categories(chunk)
+
+
+def sort_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Puts the categories of categorical columns in lexical order. read_csv appends the values
+    first seen in its later internal blocks after the others, and groupby/sort_values follow
+    the category order, so without this the output order would depend on the file size.
+    """
+    columns = {
+        col: df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+        for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and not df[col].cat.categories.is_monotonic_increasing
+    }
+    return df.assign(**columns) if columns else df
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    """Writes an inter-stage file, as Parquet or ';'-separated CSV depending on its suffix."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if is_parquet(path):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, sep=";", index=False, encoding="utf-8-sig")
@@ -0,0 +1,209 @@
+"""
+Per-stage run instrumentation: wall and CPU time, rows in/out, bytes read/written
+and peak RSS of every pipeline stage. A run is saved as a JSON
+report and, optionally, as a Prometheus text-format file (e.g. for the
+node_exporter textfile collector).
+"""
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_PROC_SELF = Path("/proc/self")
+
+
+@dataclass
+class StageRecord:
+    """Measurements of one stage; rows and bytes can be filled in by the code it wraps."""
+    stage: str
+    file: str | None = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    bytes_read: int | None = None
+    bytes_written: int | None = None
+    peak_rss_mb: float | None = None
+    failed: bool = False
+
+
+def _process_cpu_seconds() -> float:
+    """User + system time of this process and of its finished children."""
+    children = os.times()
+    return time.process_time() + children.children_user + children.children_system
+
+
+def _io_counters() -> dict[str, int]:
+    """rchar/wchar from /proc/self/io: bytes read/written by syscalls, files and sockets alike."""
+    try:
+        lines = (_PROC_SELF / "io").read_text().splitlines()
+    except OSError:
+        return {}
+    return {key: int(value) for key, value in (line.split(": ") for line in lines)}
+
+
+def _peak_rss_kb() -> int | None:
+    try:
+        for line in (_PROC_SELF / "status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+
+def _reset_peak_rss() -> None:
+    """Restarts VmHWM from the current RSS; without it the peak is the process lifetime peak."""
+    try:
+        (_PROC_SELF / "clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+class RunReport:
+    """
+    Collects a StageRecord per stage of a pipeline run: CPU of the process, I/O
+    counters as bytes read/written (unless the stage sets them), and peak RSS
+    since the stage began. Stages run one after the other, never nested.
+    A disabled report yields records without measuring or keeping them.
+    """
+
+    def __init__(self, pipeline: str = "", enabled: bool = True) -> None:
+        self.pipeline = pipeline
+        self.enabled = enabled
+        self.started_at = datetime.now(timezone.utc)
+        self.records: list[StageRecord] = []
+
+    @contextmanager
+    def stage(self, name: str, file: str | None = None) -> Iterator[StageRecord]:
+        record = StageRecord(stage=name, file=file)
+        if not self.enabled:
+            yield record
+            return
+
+        _reset_peak_rss()
+        io_start = _io_counters()
+        cpu_start = _process_cpu_seconds()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record.failed = True
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - start
+            record.cpu_seconds = _process_cpu_seconds() - cpu_start
+            io_end = _io_counters()
+            if io_start and io_end:
+                if record.bytes_read is None:
+                    record.bytes_read = io_end["rchar"] - io_start["rchar"]
+                if record.bytes_written is None:
+                    record.bytes_written = io_end["wchar"] - io_start["wchar"]
+            peak_kb = _peak_rss_kb()
+            record.peak_rss_mb = peak_kb / 1024 if peak_kb is not None else None
+            self.records.append(record)
+
+    def to_dict(self) -> dict:
+        return {
+            "pipeline": self.pipeline,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": (datetime.now(timezone.utc) - self.started_at).total_seconds(),
+            "stages": [asdict(record) for record in self.records],
+        }
+
+    def save_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        logger.info(f"Run report saved: {path}")
+
+    def save_prometheus(self, path: Path) -> None:
+        """
+        Writes one gauge per metric, labelled by pipeline, stage and file.
+        The file is replaced atomically, so a collector never reads it half-written.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(self._prometheus_text(), encoding="utf-8")
+        os.replace(tmp_file, path)
+        logger.info(f"Prometheus metrics saved: {path}")
+
+    def log_summary(self) -> None:
+        for record in self.records:
+            target = f"{record.stage} [{record.file}]" if record.file else record.stage
+            rows = "" if record.rows_in is None and record.rows_out is None else (
+                f", rows {_count(record.rows_in)} → {_count(record.rows_out)}"
+            )
+            peak = f", peak RSS {record.peak_rss_mb:.0f} MB" if record.peak_rss_mb is not None else ""
+            logger.info(
+                f"⏱️ {target}: {record.wall_seconds:.2f}s wall, {record.cpu_seconds:.2f}s CPU{rows}{peak}"
+                f"{' (failed)' if record.failed else ''}"
+            )
+
+    def _prometheus_text(self) -> str:
+        # Records of the same (stage, file) are merged: labels must be unique per series
+        series: dict[tuple[str, str], dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for record in self.records:
+            values = series[(record.stage, record.file or "")]
+            for field, (metric, scale) in _PROMETHEUS_METRICS.items():
+                value = getattr(record, field)
+                if value is None:
+                    continue
+                if field == "peak_rss_mb":
+                    values[metric] = max(values[metric], value * scale)
+                else:
+                    values[metric] += value * scale
+
+        lines = []
+        for metric, help_text in _PROMETHEUS_HELP.items():
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for (stage, file), values in series.items():
+                if metric in values:
+                    labels = ",".join(
+                        f'{key}="{_escape_label(value)}"'
+                        for key, value in (("pipeline", self.pipeline), ("stage", stage), ("file", file))
+                    )
+                    lines.append(f"{metric}{{{labels}}} {values[metric]:g}")
+        return "\n".join(lines) + "\n"
+
+
+# StageRecord field → (metric name, unit scale)
+_PROMETHEUS_METRICS = {
+    "wall_seconds": ("ans_pipeline_stage_wall_seconds", 1),
+    "cpu_seconds": ("ans_pipeline_stage_cpu_seconds", 1),
+    "rows_in": ("ans_pipeline_stage_rows_in", 1),
+    "rows_out": ("ans_pipeline_stage_rows_out", 1),
+    "bytes_read": ("ans_pipeline_stage_read_bytes", 1),
+    "bytes_written": ("ans_pipeline_stage_written_bytes", 1),
+    "peak_rss_mb": ("ans_pipeline_stage_peak_rss_bytes", 1024**2),
+}
+
+_PROMETHEUS_HELP = {
+    "ans_pipeline_stage_wall_seconds": "Wall-clock time of the stage.",
+    "ans_pipeline_stage_cpu_seconds": "CPU time (user + system) of the stage.",
+    "ans_pipeline_stage_rows_in": "Rows read by the stage.",
+    "ans_pipeline_stage_rows_out": "Rows produced by the stage.",
+    "ans_pipeline_stage_read_bytes": "Bytes read by the stage.",
+    "ans_pipeline_stage_written_bytes": "Bytes written by the stage.",
+    "ans_pipeline_stage_peak_rss_bytes": "Peak resident set size during the stage.",
+}
+
+
+def _count(value: int | None) -> str:
+    return f"{value:,}" if value is not None else "?"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,55 @@
+"""
+Compact in-memory dtypes for the consolidated and CADOP frames.
+Repeated text becomes categorical and ANS registration numbers become Int64 codes.
+"""
+import pandas as pd
+
+# Expense datasets written by the consolidation and the later stages
+CONSOLIDATED_DTYPES = {
+    "CNPJ": "category",
+    "RazaoSocial": "category",
+    "UF": "category",
+}
+
+CADOP_CATEGORIES = ["CNPJ", "Razao_Social", "Modalidade", "UF"]
+
+
+def to_int_codes(values: pd.Series) -> pd.Series:
+    """Registration numbers as Int64; blank or non-numeric values become <NA>."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Convert each distinct value once, then expand through the category codes
+        categories = to_int_codes(pd.Series(values.cat.categories)).array
+        codes = values.cat.codes.to_numpy()
+        return pd.Series(categories.take(codes, allow_fill=True), index=values.index, name=values.name)
+
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.astype("Int64")
+
+    text = values.astype("str").str.strip()
+    try:
+        return text.astype("Int64")
+    except (TypeError, ValueError):
+        numbers = pd.to_numeric(text, errors="coerce")
+        return numbers.where(numbers % 1 == 0).astype("Int64")
+
+
+def compact_cadop(df_cadop: pd.DataFrame) -> pd.DataFrame:
+    """CADOP with Int64 REGISTRO_OPERADORA and categorical text columns."""
+    columns = {
+        col: df_cadop[col].astype("category")
+        for col in CADOP_CATEGORIES
+        if col in df_cadop.columns
+    }
+    if "REGISTRO_OPERADORA" in df_cadop.columns:
+        columns["REGISTRO_OPERADORA"] = to_int_codes(df_cadop["REGISTRO_OPERADORA"])
+    return df_cadop.assign(**columns)
+
+
+def with_category(values: pd.Series, value: str) -> pd.Series:
+    """
+    Lets value be assigned into a categorical column. Categories stay sorted,
+    so groupby and sort keep the same order as on plain strings.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype) or value in values.cat.categories:
+        return values
+    return values.cat.set_categories(sorted([*values.cat.categories, value]))
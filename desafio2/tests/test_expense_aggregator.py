@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregation.expense_aggregator import ExpenseAggregator
+
+_KEYS = ["RazaoSocial", "UF", "RegistroCNPJValido"]
+
+
+def _enriched(rows: int, operators: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # Skewed on purpose: operator 0 holds about half of the rows, the rest share the other half
+    operator = np.where(rng.random(rows) < 0.5, 0, rng.integers(1, operators, size=rows))
+    df = pd.DataFrame({
+        "RazaoSocial": pd.Categorical([f"OPERADORA {number:05d}" for number in operator]),
+        "UF": pd.Categorical(rng.choice(np.array(["SP", "RJ", None], dtype=object), size=rows)),
+        "Trimestre": rng.integers(1, 5, size=rows),
+        # Amounts in cents, so many means fall exactly on half a cent
+        "ValorDespesas": rng.integers(-10**7, 10**8, size=rows) / 100,
+        "RegistroCNPJValido": rng.random(rows) < 0.8,
+    })
+    df.loc[rng.random(rows) < 0.05, "ValorDespesas"] = np.nan
+    return df
+
+
+def _baseline(df: pd.DataFrame) -> pd.DataFrame:
+    """The original in-memory metrics: a pandas groupby, rounded to the cent."""
+    df = df[df["ValorDespesas"].notna()].assign(RegistroCNPJValido=df["RegistroCNPJValido"].astype(bool))
+    agg_df = df.groupby(_KEYS, dropna=False, observed=True).agg(
+        TotalDespesas=("ValorDespesas", "sum"),
+        MediaDespesasTrimestral=("ValorDespesas", "mean"),
+        DesvioPadraoDespesas=("ValorDespesas", "std"),
+        NumeroTrimestres=("Trimestre", "count"),
+    ).reset_index()
+    agg_df = agg_df.round({"TotalDespesas": 2, "MediaDespesasTrimestral": 2, "DesvioPadraoDespesas": 2})
+    return agg_df.fillna({"DesvioPadraoDespesas": 0.0})
+
+
+def _chunks(df: pd.DataFrame, size: int):
+    return (df.iloc[start:start + size] for start in range(0, len(df), size))
+
+
+@pytest.mark.parametrize(("rows", "chunksize"), [(300, 1), (2_000, 7), (60_000, 1_000), (60_000, 60_000)])
+def test_streaming_matches_the_groupby_to_the_cent(rows: int, chunksize: int) -> None:
+    df = _enriched(rows, operators=max(2, rows // 3))
+    expected = _baseline(df)
+
+    streamed = ExpenseAggregator().aggregate_chunks(_chunks(df, chunksize))
+
+    assert streamed[_KEYS].astype(object).equals(expected[_KEYS].astype(object))
+    for column in ["TotalDespesas", "MediaDespesasTrimestral", "DesvioPadraoDespesas", "NumeroTrimestres"]:
+        assert streamed[column].tolist() == expected[column].tolist(), column
+
+
+def test_in_memory_is_the_groupby() -> None:
+    df = _enriched(20_000, operators=5_000)
+    result = ExpenseAggregator().aggregate(df)
+
+    for column in ["TotalDespesas", "MediaDespesasTrimestral", "DesvioPadraoDespesas", "NumeroTrimestres"]:
+        assert result[column].tolist() == _baseline(df)[column].tolist(), column
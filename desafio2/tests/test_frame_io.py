@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils.frame_io import iter_frames, read_frame, sort_categories
+
+
+def test_sort_categories_orders_unsorted_categories() -> None:
+    df = pd.DataFrame({
+        "UF": pd.Categorical(["SP", "RJ", "SP"], categories=["SP", "RJ"]),
+        "Valor": [1.0, 2.0, 3.0],
+    })
+
+    result = sort_categories(df)
+
+    assert result["UF"].cat.categories.tolist() == ["RJ", "SP"]
+    assert result["UF"].tolist() == ["SP", "RJ", "SP"]
+    assert result.groupby("UF", observed=True)["Valor"].sum().index.tolist() == ["RJ", "SP"]
+
+
+def test_csv_reads_return_sorted_categories(tmp_path: Path) -> None:
+    path = tmp_path / "frame.csv"
+    # Enough rows for read_csv to parse in several internal blocks; "AC" only shows up in the last one
+    pd.DataFrame({"UF": ["SP"] * 300_000 + ["RJ"] * 300_000 + ["AC"]}).to_csv(
+        path, sep=";", index=False, encoding="utf-8-sig"
+    )
+
+    assert read_frame(path, dtype={"UF": "category"})["UF"].cat.categories.tolist() == ["AC", "RJ", "SP"]
+    for chunk in iter_frames(path, 250_000, dtype={"UF": "category"}):
+        assert chunk["UF"].cat.categories.is_monotonic_increasing